@@ -1,21 +1,27 @@
 import asyncio
+import importlib
+import sys
 import logging
 import time
 import json
 from datetime import datetime
-from typing import Optional, List, Dict, Any
-from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File
+from typing import Optional, List, Dict, Any, Tuple
+from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, Query, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-import pandas as pd
-import io
-from starlette.responses import JSONResponse
-
-from reconciliation_engine import ReconciliationEngine, MatchStatus
-from predictive_analytics import analytics_engine
-from services.bert_service import get_bert_service, BERTService
-from services.xgboost_service import get_xgboost_service, XGBoostService
+import numpy as np
+from starlette.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+
+from reconciliation_engine import ReconciliationEngine, MatchStatus, ReconciliationResult
+from result_export import EXPORT_FORMATS
+from ingestion import read_transactions_csv
+from dataset_store import DatasetStore
+from job_store import create_job_store
+from request_executor import RequestExecutor, ExecutorBusy
+from micro_batcher import MicroBatcher
+import metrics
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -49,8 +55,78 @@ app.add_middleware(
     allow_headers=["Origin", "X-Requested-With", "Content-Type", "Accept", "Authorization"],
 )
 
-# Initialize the reconciliation engine
-engine = ReconciliationEngine(max_workers=4, batch_size=100)
+# Health samples kept for /health?history=N
+HEALTH_HISTORY_SIZE = int(os.getenv('HEALTH_HISTORY_SIZE', 120))
+
+# Initialize the reconciliation engine; jobs persist to JOB_STORE_URL (postgresql:// or sqlite:///) if set.
+# Models load in the background after startup, from the verified bundle at MODEL_BUNDLE_DIR if set.
+engine = ReconciliationEngine(
+    max_workers=4,
+    batch_size=100,
+    backend=os.getenv('RECONCILIATION_BACKEND', 'thread'),
+    load_models=False,
+    model_bundle_dir=os.getenv('MODEL_BUNDLE_DIR'),
+    health_interval_seconds=float(os.getenv('HEALTH_SAMPLE_INTERVAL_SECONDS', 5)),
+    health_history_size=HEALTH_HISTORY_SIZE,
+    job_store=create_job_store(os.getenv('JOB_STORE_URL', os.getenv('DATABASE_URL')))
+)
+
+# Scoring requests run here instead of on the event loop; each endpoint has its own queue limit
+scoring_executor = RequestExecutor(
+    max_workers=int(os.getenv('PREDICT_WORKERS', 4)),
+    limits={
+        '/predict': int(os.getenv('PREDICT_MAX_PENDING', 64)),
+        '/predict/batch': int(os.getenv('PREDICT_BATCH_MAX_PENDING', 4)),
+        # Retraining replaces the shared model; one fit at a time
+        '/model/train': 1
+    }
+)
+
+# Concurrent /predict calls are scored together, gathered for a few milliseconds or up to a full batch
+predict_batcher = MicroBatcher(
+    engine.predict_pairs,
+    scoring_executor,
+    "/predict",
+    max_batch_size=int(os.getenv('PREDICT_BATCH_SIZE', 64)),
+    max_wait_ms=float(os.getenv('PREDICT_BATCH_WAIT_MS', 3))
+)
+
+# Queue depth, throughput, cache and worker gauges are read from these at scrape time
+metrics.bind(engine, scoring_executor)
+
+def require_models():
+    """Dependency for endpoints that score with the NLP models: 503 until warm-up has finished."""
+    if not engine.is_ready():
+        detail = f"Models are {engine.model_state.replace('_', ' ')}"
+        if engine.model_load_error:
+            detail += f": {engine.model_load_error}"
+        raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": "5"})
+
+async def _lazy_module(module_name: str):
+    """Import a heavy optional module in a worker thread the first time an endpoint needs it."""
+    module = sys.modules.get(module_name)
+    if module is None:
+        module = await asyncio.to_thread(importlib.import_module, module_name)
+    return module
+
+async def get_bert_service():
+    """The BERT service; its module (and torch) is imported on first use."""
+    return await (await _lazy_module('services.bert_service')).get_bert_service()
+
+async def get_xgboost_service():
+    """The XGBoost service; its module is imported on first use."""
+    return await (await _lazy_module('services.xgboost_service')).get_xgboost_service()
+
+def _too_many_requests(e: ExecutorBusy) -> HTTPException:
+    """429 for a request turned away by the scoring executor."""
+    logger.warning(str(e))
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+
+# Uploaded datasets, cached on disk so clients can reference them by ID
+dataset_store = DatasetStore(
+    cache_dir=os.getenv('DATASET_CACHE_DIR', 'data/datasets'),
+    ttl_seconds=float(os.getenv('DATASET_TTL_SECONDS', 24 * 3600))
+)
 
 # Pydantic models
 class TransactionData(BaseModel):
@@ -77,10 +153,19 @@ class BatchPredictionRequest(BaseModel):
     job_id: Optional[str] = None
 
 class ReconciliationJobRequest(BaseModel):
-    reward_transactions: List[TransactionData]
-    pos_transactions: List[TransactionData]
+    reward_transactions: Optional[List[TransactionData]] = None
+    pos_transactions: Optional[List[TransactionData]] = None
+    # Datasets stored by /upload/*, used in place of the inline lists
+    reward_dataset_id: Optional[str] = None
+    pos_dataset_id: Optional[str] = None
     threshold: float = Field(0.95, ge=0.0, le=1.0)
     job_id: Optional[str] = None
+    # Defaults to the engine's mode, or the base job's mode for incremental runs
+    assignment_mode: Optional[str] = Field(None, pattern="^(one_to_one|all)$")
+    # Completed job to extend: only the transactions above are scored and merged into it
+    base_job_id: Optional[str] = None
+    # Jobs of one practice reuse its service/location similarity tables; inherited from the base job
+    practice_id: Optional[str] = None
 
 class TrainingData(BaseModel):
     reward_transaction: TransactionData
@@ -93,7 +178,7 @@ class ModelTrainingRequest(BaseModel):
 
 class ExportRequest(BaseModel):
     job_id: str
-    format: str = Field("json", pattern="^(json|csv)$")
+    format: str = Field("json", pattern="^(json|csv|parquet|arrow)$")
 
 # BERT Service Models
 class SemanticSimilarityRequest(BaseModel):
@@ -137,10 +222,26 @@ class CrossValidationRequest(BaseModel):
     cv_folds: int = Field(5, ge=3, le=10)
 
 # Health and status endpoints
+@app.get("/live")
+async def liveness():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+@app.get("/ready")
+async def readiness():
+    """Readiness probe: 200 once the scoring models are loaded, 503 while loading or after a failed load."""
+    body = {
+        "status": "ready" if engine.is_ready() else "not_ready",
+        "model_state": engine.model_state,
+        "error": engine.model_load_error,
+        "timestamp": datetime.now().isoformat()
+    }
+    return JSONResponse(status_code=200 if engine.is_ready() else 503, content=body)
+
 @app.get("/health")
-async def health_check():
-    """Get system health status."""
-    return engine.get_system_health()
+async def health_check(history: int = Query(0, ge=0, le=HEALTH_HISTORY_SIZE)):
+    """Get system health status from the latest background sample, optionally with recent samples."""
+    return engine.get_system_health(history)
 
 @app.get("/status")
 async def get_status():
@@ -150,10 +251,22 @@ async def get_status():
         "timestamp": datetime.now().isoformat(),
         "version": "2.0.0",
         "model_loaded": engine.is_model_loaded(),
+        "model_state": engine.model_state,
         "active_jobs": len(engine.active_jobs),
+        "scoring_executor": scoring_executor.get_stats(),
+        "predict_batching": predict_batcher.get_stats(),
+        "health_sampler": engine.health_sampler.get_stats(),
+        "lookup_tables": engine.lookup_tables.get_stats(),
         "system_health": engine.get_system_health()
     }
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus scrape endpoint: stage latency histograms and engine gauges."""
+    content, content_type = metrics.render()
+    return Response(content=content, media_type=content_type,
+                    status_code=200 if metrics.PROMETHEUS_AVAILABLE else 503)
+
 @app.get("/model/info")
 async def get_model_info():
     """Get detailed model information."""
@@ -165,15 +278,18 @@ async def get_model_metrics():
     return engine.get_model_metrics()
 
 # Single prediction endpoints
-@app.post("/predict")
+@app.post("/predict", dependencies=[Depends(require_models)])
 async def predict_match(request: PredictionRequest):
     """Predict match between a single pair of transactions."""
     try:
-        result = engine.predict_match(
+        result = await predict_batcher.submit((
             request.reward_transaction.dict(),
             request.pos_transaction.dict(),
             request.threshold
-        )
+        ))
+        if result["result"] == ReconciliationResult.ERROR.value:
+            # Scored alone after its batch failed, and still failed: the pair itself cannot be scored
+            raise HTTPException(status_code=422, detail=f"Could not score transaction pair: {result['error']}")
 
         response = {
             "match_probability": result["confidence"],
@@ -188,27 +304,33 @@ async def predict_match(request: PredictionRequest):
 
         return response
 
+    except HTTPException:
+        raise
+    except ExecutorBusy as e:
+        raise _too_many_requests(e)
     except Exception as e:
         logger.error(f"Prediction failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/predict/batch")
+@app.post("/predict/batch", dependencies=[Depends(require_models)])
 async def batch_predict(request: BatchPredictionRequest):
     """Predict matches for multiple transaction pairs."""
     try:
-        results = []
-        total_time = 0
-
-        for reward_txn in request.reward_transactions:
-            for pos_txn in request.pos_transactions:
-                start_time = time.time()
-                result = engine.predict_match(
-                    reward_txn.dict(),
-                    pos_txn.dict(),
-                    request.threshold
-                )
-                total_time += time.time() - start_time
-                results.append(result)
+        reward_txns = [txn.dict() for txn in request.reward_transactions]
+        pos_txns = [txn.dict() for txn in request.pos_transactions]
+        # Every reward/POS combination, scored in one vectorized pass
+        pair_index = np.indices((len(reward_txns), len(pos_txns))).reshape(2, -1).T
+
+        start_time = time.time()
+        results = await scoring_executor.run(
+            "/predict/batch",
+            engine.predict_batch,
+            reward_txns,
+            pos_txns,
+            pair_index,
+            request.threshold
+        )
+        total_time = time.time() - start_time
 
         return {
             "results": results,
@@ -217,31 +339,64 @@ async def batch_predict(request: BatchPredictionRequest):
             "avg_processing_time_ms": (total_time * 1000) / len(results) if results else 0
         }
 
+    except ExecutorBusy as e:
+        raise _too_many_requests(e)
     except Exception as e:
         logger.error(f"Batch prediction failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _resolve_transactions(side: str, inline: Optional[List[TransactionData]],
+                                dataset_id: Optional[str]) -> List[Dict]:
+    """Transactions for one side of a job, from a stored dataset or the inline list, but not both."""
+    if dataset_id and inline is not None:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Provide either {side}_transactions or {side}_dataset_id, not both"
+        )
+
+    if dataset_id:
+        # Loading and converting a stored dataset is CPU-bound; keep it off the event loop
+        batch = await run_in_threadpool(dataset_store.get, dataset_id)
+        if batch is None:
+            raise HTTPException(status_code=404, detail=f"Dataset {dataset_id} not found or expired")
+        return await run_in_threadpool(batch.to_records)
+
+    # Convert to dictionaries
+    return [txn.dict() for txn in inline or []]
+
 # Job management endpoints
-@app.post("/reconcile/start")
+@app.post("/reconcile/start", dependencies=[Depends(require_models)])
 async def start_reconciliation(request: ReconciliationJobRequest):
     """Start an asynchronous reconciliation job."""
     try:
-        if len(request.reward_transactions) == 0 or len(request.pos_transactions) == 0:
+        reward_txns = await _resolve_transactions('reward', request.reward_transactions, request.reward_dataset_id)
+        pos_txns = await _resolve_transactions('pos', request.pos_transactions, request.pos_dataset_id)
+
+        if request.base_job_id:
+            base_job = engine.get_job(request.base_job_id, load_results=False)
+            if not base_job:
+                raise HTTPException(status_code=404, detail="Base job not found")
+            if base_job.status != MatchStatus.COMPLETED:
+                raise HTTPException(status_code=400, detail="Base job has not completed")
+            if len(reward_txns) == 0 and len(pos_txns) == 0:
+                raise HTTPException(status_code=400, detail="New reward or POS transactions are required")
+        elif len(reward_txns) == 0 or len(pos_txns) == 0:
             raise HTTPException(status_code=400, detail="Both reward and POS transactions are required")
 
-        # Convert to dictionaries
-        reward_txns = [txn.dict() for txn in request.reward_transactions]
-        pos_txns = [txn.dict() for txn in request.pos_transactions]
-
         job_info = await engine.start_reconciliation(
             reward_txns,
             pos_txns,
             request.threshold,
-            request.job_id
+            request.job_id,
+            request.assignment_mode,
+            request.base_job_id,
+            request.practice_id
         )
 
         return job_info
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to start reconciliation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -257,7 +412,7 @@ async def get_active_jobs():
 @app.get("/reconcile/jobs/{job_id}")
 async def get_job_status(job_id: str):
     """Get status of a specific reconciliation job."""
-    job_status = engine.get_job_status(job_id)
+    job_status = await engine.lookup_job_status(job_id)
     if not job_status:
         raise HTTPException(status_code=404, detail="Job not found")
     return job_status
@@ -265,11 +420,65 @@ async def get_job_status(job_id: str):
 @app.get("/reconcile/jobs/{job_id}/results")
 async def get_job_results(job_id: str):
     """Get results of a completed reconciliation job."""
-    results = engine.get_job_results(job_id)
+    results = await engine.lookup_job_results(job_id)
     if not results:
         raise HTTPException(status_code=404, detail="Job not found or not completed")
     return results
 
+# Rows fetched per page while streaming, and how often a followed job is polled
+STREAM_PAGE_SIZE = 500
+STREAM_POLL_SECONDS = 0.5
+
+async def _stream_job_results(job_id: str, cursor: int, limit: Optional[int], follow: bool,
+                              phase: Optional[str]):
+    """Yield a job's results as NDJSON lines, optionally following it until completion."""
+    sent = 0
+    while True:
+        page_size = STREAM_PAGE_SIZE if limit is None else min(STREAM_PAGE_SIZE, limit - sent)
+        page = engine.get_job_results_page(job_id, cursor, page_size, phase)
+        if page is None:
+            break
+        phase = page['phase']
+        
+        for row in page['results']:
+            cursor += 1
+            yield json.dumps({'phase': phase, 'cursor': cursor, 'result': row}, default=str) + "\n"
+        sent += len(page['results'])
+        
+        if limit is not None and sent >= limit:
+            break
+        if page['results']:
+            continue
+        
+        if phase == 'provisional' and page['status'] == MatchStatus.COMPLETED.value and follow:
+            # Provisional candidates are done; continue with the final results
+            yield json.dumps({'event': 'phase_end', 'phase': phase, 'cursor': cursor}) + "\n"
+            phase, cursor = 'final', 0
+            continue
+        if page['exhausted'] or not follow:
+            break
+        await asyncio.sleep(STREAM_POLL_SECONDS)
+    
+    status = engine.get_job_status(job_id)
+    yield json.dumps({
+        'event': 'end',
+        'phase': phase,
+        'next_cursor': cursor,
+        'status': status['status'] if status else None
+    }) + "\n"
+
+@app.get("/reconcile/jobs/{job_id}/results/stream")
+async def stream_job_results(job_id: str, cursor: int = Query(0, ge=0), limit: Optional[int] = Query(None, ge=1),
+                             follow: bool = False, phase: Optional[str] = Query(None, pattern="^(provisional|final)$")):
+    """Stream job results as NDJSON, tailing provisional candidates while the job runs."""
+    if not engine.get_job(job_id, load_results=False):
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return StreamingResponse(
+        _stream_job_results(job_id, cursor, limit, follow, phase),
+        media_type="application/x-ndjson"
+    )
+
 @app.delete("/reconcile/jobs/{job_id}")
 async def cancel_job(job_id: str):
     """Cancel an active reconciliation job."""
@@ -281,90 +490,74 @@ async def cancel_job(job_id: str):
 @app.get("/reconcile/history")
 async def get_job_history(limit: int = 50):
     """Get recent job history."""
+    jobs = await engine.lookup_job_history(limit)
     return {
-        "jobs": engine.get_job_history(limit),
-        "total_returned": min(limit, len(engine.job_history))
+        "jobs": jobs,
+        "total_returned": len(jobs)
     }
 
 # File upload endpoints
+async def _ingest_upload(file: UploadFile, kind: str, include_transactions: bool) -> Dict:
+    """Parse an uploaded transaction CSV and store it as a dataset without blocking the event loop."""
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="Only CSV files are supported")
+
+    # Parse straight from the spooled upload file instead of decoding it into one string
+    batch = await run_in_threadpool(read_transactions_csv, file.file)
+    dataset = await run_in_threadpool(dataset_store.put, batch, kind, file.filename)
+
+    response = {
+        "message": "File uploaded successfully",
+        "filename": file.filename,
+        "dataset_id": dataset['dataset_id'],
+        "expires_at": datetime.fromtimestamp(dataset['expires_at']).isoformat(),
+        "transactions_count": len(batch),
+        "invalid_amounts": batch.invalid_amounts,
+        "missing_columns": batch.missing_columns
+    }
+    if include_transactions:
+        response["transactions"] = batch.to_records()
+    return response
+
 @app.post("/upload/reward-transactions")
-async def upload_reward_transactions(file: UploadFile = File(...)):
+async def upload_reward_transactions(file: UploadFile = File(...), include_transactions: bool = False):
     """Upload reward transactions from CSV file."""
     try:
-        if not file.filename.endswith('.csv'):
-            raise HTTPException(status_code=400, detail="Only CSV files are supported")
-
-        # Read CSV file
-        content = await file.read()
-        df = pd.read_csv(io.StringIO(content.decode('utf-8')))
-
-        # Convert to transaction format
-        transactions = []
-        for _, row in df.iterrows():
-            transaction = {
-                'customer_name': row.get('customer_name', ''),
-                'customer_phone': row.get('customer_phone', ''),
-                'customer_email': row.get('customer_email', ''),
-                'service': row.get('service', ''),
-                'amount': float(row.get('amount', 0)),
-                'date': row.get('date', ''),
-                'provider': row.get('provider', ''),
-                'location': row.get('location', ''),
-                'transaction_id': row.get('transaction_id', '')
-            }
-            transactions.append(transaction)
-
-        return {
-            "message": "File uploaded successfully",
-            "filename": file.filename,
-            "transactions_count": len(transactions),
-            "transactions": transactions
-        }
-
+        return await _ingest_upload(file, 'reward', include_transactions)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"File upload failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/upload/pos-transactions")
-async def upload_pos_transactions(file: UploadFile = File(...)):
+async def upload_pos_transactions(file: UploadFile = File(...), include_transactions: bool = False):
     """Upload POS transactions from CSV file."""
     try:
-        if not file.filename.endswith('.csv'):
-            raise HTTPException(status_code=400, detail="Only CSV files are supported")
-
-        # Read CSV file
-        content = await file.read()
-        df = pd.read_csv(io.StringIO(content.decode('utf-8')))
-
-        # Convert to transaction format
-        transactions = []
-        for _, row in df.iterrows():
-            transaction = {
-                'customer_name': row.get('customer_name', ''),
-                'customer_phone': row.get('customer_phone', ''),
-                'customer_email': row.get('customer_email', ''),
-                'service': row.get('service', ''),
-                'amount': float(row.get('amount', 0)),
-                'date': row.get('date', ''),
-                'provider': row.get('provider', ''),
-                'location': row.get('location', ''),
-                'transaction_id': row.get('transaction_id', '')
-            }
-            transactions.append(transaction)
-
-        return {
-            "message": "File uploaded successfully",
-            "filename": file.filename,
-            "transactions_count": len(transactions),
-            "transactions": transactions
-        }
-
+        return await _ingest_upload(file, 'pos', include_transactions)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"File upload failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/datasets/{dataset_id}")
+async def get_dataset(dataset_id: str):
+    """Get metadata of an uploaded dataset."""
+    dataset = dataset_store.info(dataset_id)
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found or expired")
+    return dataset
+
+@app.delete("/datasets/{dataset_id}")
+async def delete_dataset(dataset_id: str):
+    """Delete an uploaded dataset before its TTL expires."""
+    if not dataset_store.delete(dataset_id):
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    return {"message": "Dataset deleted successfully", "dataset_id": dataset_id}
+
 # Model training endpoints
-@app.post("/model/train")
+@app.post("/model/train", dependencies=[Depends(require_models)])
 async def train_model(request: ModelTrainingRequest):
     """Train the ML model with new data."""
     try:
@@ -380,7 +573,7 @@ async def train_model(request: ModelTrainingRequest):
                 'is_match': item.is_match
             })
 
-        result = engine.retrain_model(training_data)
+        result = await scoring_executor.run("/model/train", engine.retrain_model, training_data)
 
         if result.get('success'):
             return {
@@ -392,6 +585,10 @@ async def train_model(request: ModelTrainingRequest):
         else:
             raise HTTPException(status_code=500, detail=result.get('error', 'Training failed'))
 
+    except HTTPException:
+        raise
+    except ExecutorBusy as e:
+        raise _too_many_requests(e)
     except Exception as e:
         logger.error(f"Model training failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -401,24 +598,20 @@ async def train_model(request: ModelTrainingRequest):
 async def export_results(request: ExportRequest):
     """Export reconciliation results in specified format."""
     try:
-        export_data = engine.export_results(request.job_id, request.format)
+        export_stream = await engine.lookup_export_results(request.job_id, request.format)
 
-        if not export_data:
+        if export_stream is None:
             raise HTTPException(status_code=404, detail="Job not found or not completed")
 
-        if request.format.lower() == 'json':
-            return StreamingResponse(
-                io.StringIO(export_data),
-                media_type="application/json",
-                headers={"Content-Disposition": f"attachment; filename=reconciliation_results_{request.job_id}.json"}
-            )
-        elif request.format.lower() == 'csv':
-            return StreamingResponse(
-                io.StringIO(export_data),
-                media_type="text/csv",
-                headers={"Content-Disposition": f"attachment; filename=reconciliation_results_{request.job_id}.csv"}
-            )
+        media_type, extension = EXPORT_FORMATS[request.format.lower()]
+        return StreamingResponse(
+            export_stream,
+            media_type=media_type,
+            headers={"Content-Disposition": f"attachment; filename=reconciliation_results_{request.job_id}.{extension}"}
+        )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Export failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -457,7 +650,7 @@ async def get_job_analytics(job_id: str):
         if not job_status:
             raise HTTPException(status_code=404, detail="Job not found")
 
-        results = engine.get_job_results(job_id)
+        summary = engine.get_job_summary(job_id)
 
         analytics = {
             "job_info": job_status,
@@ -465,9 +658,9 @@ async def get_job_analytics(job_id: str):
             "progress": job_status.get('progress_percent', 0)
         }
 
-        if results:
-            analytics["results_summary"] = results.get('summary', {})
-            analytics["match_rate"] = results['summary']['matches_found'] / max(results['summary']['total_transactions'], 1)
+        if summary:
+            analytics["results_summary"] = summary
+            analytics["match_rate"] = summary['matches_found'] / max(summary['total_transactions'], 1)
 
         return analytics
 
@@ -479,6 +672,7 @@ async def get_job_analytics(job_id: str):
 async def generate_business_insights(transaction_data: List[Dict]):
     """Generate comprehensive business insights from transaction data."""
     try:
+        analytics_engine = (await _lazy_module('predictive_analytics')).analytics_engine
         insights = analytics_engine.generate_business_insights(transaction_data)
         return insights
     except Exception as e:
@@ -489,6 +683,7 @@ async def generate_business_insights(transaction_data: List[Dict]):
 async def analyze_reconciliation_trends(transaction_data: List[Dict]):
     """Analyze reconciliation trends and provide insights."""
     try:
+        analytics_engine = (await _lazy_module('predictive_analytics')).analytics_engine
         trends = analytics_engine.analyze_reconciliation_trends(transaction_data)
         return trends
     except Exception as e:
@@ -499,6 +694,7 @@ async def analyze_reconciliation_trends(transaction_data: List[Dict]):
 async def identify_revenue_opportunities(transaction_data: List[Dict]):
     """Identify potential revenue recovery opportunities."""
     try:
+        analytics_engine = (await _lazy_module('predictive_analytics')).analytics_engine
         opportunities = analytics_engine.identify_revenue_opportunities(transaction_data)
         return {"opportunities": opportunities}
     except Exception as e:
@@ -509,6 +705,7 @@ async def identify_revenue_opportunities(transaction_data: List[Dict]):
 async def export_analytics_report(transaction_data: List[Dict], format: str = "json"):
     """Export comprehensive analytics report."""
     try:
+        analytics_engine = (await _lazy_module('predictive_analytics')).analytics_engine
         report = analytics_engine.export_analytics_report(transaction_data, format)
         return {"report": report, "format": format}
     except Exception as e:
@@ -812,13 +1009,10 @@ async def save_xgboost_model():
         logger.error(f"Error saving XGBoost model: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-# Startup event
-@app.on_event("startup")
-async def startup_event():
-    """Initialize the system on startup."""
-    logger.info("Starting MedSpa AI Reconciliation API v2.0.0")
-    logger.info(f"Model loaded: {engine.is_model_loaded()}")
-    logger.info(f"System health: {engine.get_system_health()['status']}")
+async def warm_up_models():
+    """Load the scoring models, then the BERT and XGBoost services, without holding up startup."""
+    if await engine.warm_up():
+        logger.info("Reconciliation engine ready")
     
     # Initialize BERT service
     try:
@@ -834,11 +1028,41 @@ async def startup_event():
     except Exception as e:
         logger.warning(f"XGBoost service initialization failed: {e}")
 
+# Startup event
+@app.on_event("startup")
+async def startup_event():
+    """Initialize the system on startup; /ready reports when the models have loaded."""
+    logger.info("Starting MedSpa AI Reconciliation API v2.0.0")
+    
+    # Connect the job store; jobs a previous process left running can no longer finish
+    if engine.job_store is not None:
+        try:
+            await engine.job_store.connect()
+            interrupted = await engine.job_store.mark_interrupted()
+            if interrupted:
+                logger.warning(f"Marked {interrupted} interrupted jobs as failed")
+        except Exception as e:
+            logger.error(f"Job store unavailable, jobs will not be persisted: {e}")
+            engine.job_store = None
+    
+    # Sample CPU, memory and disk in the background so /health never measures inline
+    engine.health_sampler.start()
+    
+    # Endpoints that do not score (/live, /health, job lookups) serve while the models load
+    app.state.model_warm_up = asyncio.create_task(warm_up_models())
+
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("Shutting down MedSpa AI Reconciliation API")
+    warm_up_task = getattr(app.state, 'model_warm_up', None)
+    if warm_up_task is not None and not warm_up_task.done():
+        warm_up_task.cancel()
+    engine.shutdown()
+    scoring_executor.shutdown()
+    if engine.job_store is not None:
+        await engine.job_store.close()
 
 if __name__ == "__main__":
     import uvicorn
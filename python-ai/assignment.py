@@ -0,0 +1,145 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+
+# 'one_to_one' keeps a globally consistent matching, 'all' keeps every scored pair
+ASSIGNMENT_MODES = ('one_to_one', 'all')
+
+
+@dataclass
+class AssignmentResult:
+    """One-to-one matching chosen from the scored candidate pairs."""
+    selected: np.ndarray
+    unmatched_rewards: np.ndarray
+    unmatched_pos: np.ndarray
+    eligible_pairs: int = 0
+    components: int = 0
+    hungarian_components: int = 0
+    greedy_components: int = 0
+    total_confidence: float = 0.0
+
+    def to_metrics(self) -> Dict:
+        """Summarize the assignment for a job's performance metrics."""
+        return {
+            'eligible_pairs': self.eligible_pairs,
+            'assigned_pairs': len(self.selected),
+            'unmatched_rewards': len(self.unmatched_rewards),
+            'unmatched_pos': len(self.unmatched_pos),
+            'components': self.components,
+            'hungarian_components': self.hungarian_components,
+            'greedy_components': self.greedy_components,
+            'total_confidence': self.total_confidence
+        }
+
+
+class OneToOneAssigner:
+    """Pick at most one POS transaction per reward, and vice versa, maximizing total confidence.
+
+    Pairs below ``min_confidence`` are dropped and the remaining sparse score
+    graph is split into connected components. Each component is solved
+    exactly with the Hungarian algorithm unless its dense matrix would exceed
+    ``max_component_cells``, in which case a greedy max-confidence pass is used.
+    """
+
+    def __init__(self, min_confidence: float = 0.7, max_component_cells: int = 250_000):
+        self.logger = logging.getLogger(__name__)
+        self.min_confidence = min_confidence
+        self.max_component_cells = max_component_cells
+
+    def assign(self, pair_index: np.ndarray, confidence: np.ndarray,
+               num_rewards: int, num_pos: int) -> AssignmentResult:
+        """Return positions into ``pair_index`` of the assigned pairs plus unmatched transactions."""
+        pair_index = np.asarray(pair_index, dtype=np.int64).reshape(-1, 2)
+        confidence = np.asarray(confidence, dtype=np.float64)
+
+        eligible = np.flatnonzero(confidence >= self.min_confidence)
+        selected: List[int] = []
+        components = hungarian = greedy = 0
+
+        if len(eligible) > 0:
+            # scipy is imported on first use to keep module import cheap
+            from scipy.sparse import coo_matrix
+            from scipy.sparse.csgraph import connected_components
+
+            reward_idx = pair_index[eligible, 0]
+            pos_idx = pair_index[eligible, 1]
+
+            # Bipartite graph: rewards are nodes 0..R-1, POS transactions R..R+P-1
+            num_nodes = num_rewards + num_pos
+            graph = coo_matrix(
+                (np.ones(len(eligible), dtype=np.int8), (reward_idx, pos_idx + num_rewards)),
+                shape=(num_nodes, num_nodes)
+            )
+            _, labels = connected_components(graph, directed=False)
+
+            edge_labels = labels[reward_idx]
+            order = np.argsort(edge_labels, kind='stable')
+            boundaries = np.flatnonzero(np.diff(edge_labels[order])) + 1
+
+            for edges in np.split(order, boundaries):
+                components += 1
+                if len(edges) == 1:
+                    selected.append(int(eligible[edges[0]]))
+                    continue
+
+                rows, local_rows = np.unique(reward_idx[edges], return_inverse=True)
+                cols, local_cols = np.unique(pos_idx[edges], return_inverse=True)
+
+                if len(rows) * len(cols) <= self.max_component_cells:
+                    hungarian += 1
+                    chosen = self._solve_hungarian(local_rows, local_cols, confidence[eligible[edges]],
+                                                   len(rows), len(cols))
+                else:
+                    greedy += 1
+                    chosen = self._solve_greedy(local_rows, local_cols, confidence[eligible[edges]])
+
+                selected.extend(eligible[edges[chosen]].tolist())
+
+        if greedy:
+            self.logger.info(f"Used greedy assignment for {greedy} oversized components")
+
+        selected_index = np.array(sorted(selected), dtype=np.int64)
+        assigned_rewards = np.zeros(num_rewards, dtype=bool)
+        assigned_pos = np.zeros(num_pos, dtype=bool)
+        assigned_rewards[pair_index[selected_index, 0]] = True
+        assigned_pos[pair_index[selected_index, 1]] = True
+
+        return AssignmentResult(
+            selected=selected_index,
+            unmatched_rewards=np.flatnonzero(~assigned_rewards),
+            unmatched_pos=np.flatnonzero(~assigned_pos),
+            eligible_pairs=len(eligible),
+            components=components,
+            hungarian_components=hungarian,
+            greedy_components=greedy,
+            total_confidence=float(confidence[selected_index].sum())
+        )
+
+    def _solve_hungarian(self, rows: np.ndarray, cols: np.ndarray, scores: np.ndarray,
+                         num_rows: int, num_cols: int) -> np.ndarray:
+        """Exact maximum-confidence matching of one component; returns edge positions."""
+        matrix = np.zeros((num_rows, num_cols))
+        edge_at = np.full((num_rows, num_cols), -1, dtype=np.int64)
+        matrix[rows, cols] = scores
+        edge_at[rows, cols] = np.arange(len(scores))
+
+        from scipy.optimize import linear_sum_assignment
+        assigned_rows, assigned_cols = linear_sum_assignment(matrix, maximize=True)
+        chosen = edge_at[assigned_rows, assigned_cols]
+        # Cells without a scored pair can be picked to complete the matching; drop them
+        return chosen[chosen >= 0]
+
+    def _solve_greedy(self, rows: np.ndarray, cols: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        """Take pairs in descending confidence while both sides are still free."""
+        used_rows, used_cols = set(), set()
+        chosen = []
+        for edge in np.argsort(-scores, kind='stable'):
+            row, col = rows[edge], cols[edge]
+            if row in used_rows or col in used_cols:
+                continue
+            used_rows.add(row)
+            used_cols.add(col)
+            chosen.append(edge)
+        return np.array(chosen, dtype=np.int64)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the thread and process scoring backends
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from reconciliation_engine import ReconciliationEngine
+from test_engine import generate_sample_data
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def generate_scaled_data(scale: int) -> Tuple[List[Dict], List[Dict]]:
+    """Repeat the tester's sample data with distinct customers, dates and amounts."""
+    base_rewards, base_pos = generate_sample_data()
+    reward_transactions, pos_transactions = [], []
+
+    for copy in range(scale):
+        for source, target in ((base_rewards, reward_transactions), (base_pos, pos_transactions)):
+            for txn in source:
+                txn = dict(txn)
+                txn['customer_name'] = f"{txn['customer_name']} {copy}"
+                txn['date'] = (datetime.strptime(txn['date'], '%Y-%m-%d') + timedelta(days=7 * copy)).strftime('%Y-%m-%d')
+                txn['amount'] = txn['amount'] + copy
+                txn['transaction_id'] = f"{txn['transaction_id']}_{copy}"
+                target.append(txn)
+
+    return reward_transactions, pos_transactions
+
+
+async def run_backend(backend: str, reward_transactions: List[Dict], pos_transactions: List[Dict],
+                      max_workers: int, batch_size: int, use_blocking: bool) -> Dict:
+    """Run one reconciliation job on a backend and report its throughput."""
+    engine = ReconciliationEngine(max_workers=max_workers, batch_size=batch_size,
+                                  use_blocking=use_blocking, backend=backend)
+    job_id = f"benchmark_{backend}_{int(time.time())}"
+
+    try:
+        start_time = time.time()
+        await engine.start_reconciliation(reward_transactions, pos_transactions, threshold=0.95, job_id=job_id)
+
+        while True:
+            status = engine.get_job_status(job_id)
+            if status and status['status'] in ('completed', 'failed', 'cancelled'):
+                break
+            await asyncio.sleep(0.05)
+
+        elapsed = time.time() - start_time
+        pairs = status['processed_transactions']
+
+        return {
+            'backend': backend,
+            'status': status['status'],
+            'pairs_scored': pairs,
+            'matches_found': status['matches_found'],
+            'elapsed_seconds': elapsed,
+            'pairs_per_second': pairs / elapsed if elapsed > 0 else 0
+        }
+    finally:
+        engine.shutdown()
+
+
+def main():
+    """Benchmark every scoring backend on the same scaled data set."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=int, default=20, help='copies of the sample data per side')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--no-blocking', action='store_true', help='score the full reward×POS product')
+    args = parser.parse_args()
+
+    reward_transactions, pos_transactions = generate_scaled_data(args.scale)
+    logger.info(f"Benchmarking {len(reward_transactions)} reward × {len(pos_transactions)} POS transactions")
+
+    report = []
+    for backend in ReconciliationEngine.BACKENDS:
+        result = asyncio.run(run_backend(backend, reward_transactions, pos_transactions,
+                                         args.workers, args.batch_size, not args.no_blocking))
+        report.append(result)
+        logger.info(f"{backend}: {result['pairs_scored']} pairs in {result['elapsed_seconds']:.2f}s "
+                    f"({result['pairs_per_second']:.0f} pairs/sec, status {result['status']})")
+
+    logger.info(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
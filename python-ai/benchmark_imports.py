@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for the API's modules
+
+Each module is imported in a fresh interpreter with -X importtime. The
+check fails when a module's cumulative import time exceeds its budget or
+when importing it loads a module that should only load on first use.
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Cumulative seconds for a cold import of each module, including everything it imports
+IMPORT_BUDGETS = {
+    'api_server': 1.0,
+    'reconciliation_engine': 0.5,
+    'job_store': 0.1,
+    'metrics': 0.2
+}
+
+# Heavy packages that must be imported lazily, at first use, rather than when the API starts
+DEFERRED_MODULES = (
+    'pandas', 'scipy', 'sklearn', 'joblib', 'spacy', 'sentence_transformers',
+    'torch', 'transformers', 'textblob', 'pyarrow'
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_importtime(stderr: str) -> List[Tuple[int, str, float]]:
+    """(depth, module, cumulative seconds) for each line of -X importtime output."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((depth, name.strip(), int(cumulative) / 1e6))
+    return entries
+
+
+def measure_import(module: str) -> Dict:
+    """Import module in a fresh interpreter; returns its cumulative time, heaviest imports and loaded packages."""
+    script = f"import {module}, json, sys; print(json.dumps(sorted(sys.modules)))"
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {completed.stderr.strip().splitlines()[-1]}")
+
+    entries = parse_importtime(completed.stderr)
+    total = next(seconds for depth, name, seconds in reversed(entries) if name == module and depth == 0)
+    loaded = set(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    # Lines nest under the module that triggered them; depth 1 are the measured module's direct imports
+    children = [(name, seconds) for depth, name, seconds in entries if depth == 1]
+    return {
+        'module': module,
+        'seconds': total,
+        'heaviest_imports': dict(sorted(children, key=lambda item: -item[1])[:5]),
+        'deferred_loaded': sorted(name for name in DEFERRED_MODULES if name in loaded)
+    }
+
+
+def main():
+    """Measure every budgeted module; exit non-zero if any budget is exceeded."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modules', nargs='*', help='modules to check (default: every budgeted module)')
+    parser.add_argument('--repeat', type=int, default=3, help='cold imports per module; the fastest counts')
+    parser.add_argument('--budget-factor', type=float, default=1.0, help='scale every budget, e.g. for slow CI hosts')
+    args = parser.parse_args()
+
+    report = []
+    failures = []
+    for module in args.modules or list(IMPORT_BUDGETS):
+        result = min((measure_import(module) for _ in range(args.repeat)), key=lambda r: r['seconds'])
+        budget = IMPORT_BUDGETS.get(module)
+        result['budget_seconds'] = budget * args.budget_factor if budget is not None else None
+        report.append(result)
+
+        budget_text = f"{result['budget_seconds']:.3f}s" if budget is not None else 'none'
+        logger.info(f"{module}: {result['seconds']:.3f}s (budget {budget_text}), "
+                    f"heaviest: {', '.join(f'{name} {seconds:.3f}s' for name, seconds in result['heaviest_imports'].items())}")
+        if result['budget_seconds'] is not None and result['seconds'] > result['budget_seconds']:
+            failures.append(f"{module} took {result['seconds']:.3f}s, over its {result['budget_seconds']:.3f}s budget")
+        if result['deferred_loaded']:
+            failures.append(f"{module} imported deferred modules: {', '.join(result['deferred_loaded'])}")
+
+    logger.info(json.dumps(report, indent=2))
+    for failure in failures:
+        logger.error(failure)
+    if failures:
+        sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
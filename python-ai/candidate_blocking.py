@@ -0,0 +1,155 @@
+import logging
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from confidence_scorer import CanonicalTransaction
+
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'),
+    **dict.fromkeys('cgjkqsxz', '2'),
+    **dict.fromkeys('dt', '3'),
+    'l': '4',
+    **dict.fromkeys('mn', '5'),
+    'r': '6',
+}
+
+
+def soundex(word: str) -> str:
+    """American Soundex code for a single word (e.g. 'chen' -> 'C500')."""
+    letters = re.sub(r'[^a-z]', '', (word or '').lower())
+    if not letters:
+        return ''
+
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0], '')
+    for char in letters[1:]:
+        digit = _SOUNDEX_CODES.get(char, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # 'h' and 'w' do not separate letters with the same code
+        if char not in 'hw':
+            previous = digit
+
+    return code.ljust(4, '0')
+
+
+@dataclass
+class BlockingResult:
+    """Candidate pairs produced by the blocking stage."""
+    pair_index: np.ndarray
+    full_product_pairs: int
+    block_hits: Dict[str, int] = field(default_factory=dict)
+    oversized_blocks: int = 0
+
+    @property
+    def candidate_pairs(self) -> int:
+        return len(self.pair_index)
+
+    def to_metrics(self) -> Dict:
+        """Summarize blocking for a job's performance metrics."""
+        return {
+            'full_product_pairs': self.full_product_pairs,
+            'candidate_pairs': self.candidate_pairs,
+            'reduction_ratio': 1 - self.candidate_pairs / self.full_product_pairs if self.full_product_pairs > 0 else 0,
+            'block_hits': self.block_hits,
+            'oversized_blocks': self.oversized_blocks
+        }
+
+
+class CandidateBlocker:
+    """Blocking stage that limits reward×POS scoring to pairs sharing a block key.
+
+    Exact keys are the E.164 phone, the lowercased email and a Soundex key of
+    the customer's surname. Date and amount are range keys: a reward probes
+    every date bucket within ``date_window_days`` combined with the adjacent
+    amount bands, so near-misses on either still land in a shared block.
+    """
+
+    def __init__(self, date_window_days: int = 3, amount_band_width: float = 25.0,
+                 max_block_size: Optional[int] = 1000):
+        self.logger = logging.getLogger(__name__)
+        self.date_window_days = date_window_days
+        self.amount_band_width = amount_band_width
+        self.max_block_size = max_block_size
+
+    def _exact_keys(self, record: CanonicalTransaction) -> List[Tuple]:
+        """Keys that must match exactly between reward and POS transactions."""
+        keys = []
+
+        if len(re.sub(r'[^\d]', '', record.phone)) >= 7:
+            keys.append(('phone', record.phone))
+
+        if record.email_domain:
+            keys.append(('email', record.email))
+
+        if record.name_tokens:
+            surname_code = soundex(record.name_tokens[-1])
+            if surname_code:
+                keys.append(('name', surname_code))
+
+        return keys
+
+    def _date_amount_bucket(self, record: CanonicalTransaction) -> Optional[Tuple[int, int]]:
+        """Day ordinal and amount band of a transaction, if both are known."""
+        if record.date is None or np.isnan(record.amount):
+            return None
+
+        return record.date.toordinal(), int(record.amount // self.amount_band_width)
+
+    def generate_candidates(self, reward_records: List[CanonicalTransaction],
+                            pos_records: List[CanonicalTransaction]) -> BlockingResult:
+        """Return (reward_index, pos_index) pairs that share at least one block."""
+        full_product = len(reward_records) * len(pos_records)
+
+        # Inverted index over POS transactions
+        index: Dict[Tuple, List[int]] = defaultdict(list)
+        for pos_idx, pos_record in enumerate(pos_records):
+            for key in self._exact_keys(pos_record):
+                index[key].append(pos_idx)
+            bucket = self._date_amount_bucket(pos_record)
+            if bucket is not None:
+                index[('date_amount',) + bucket].append(pos_idx)
+
+        oversized = set()
+        if self.max_block_size:
+            oversized = {key for key, members in index.items() if len(members) > self.max_block_size}
+            if oversized:
+                self.logger.warning(f"Skipping {len(oversized)} blocks larger than {self.max_block_size} transactions")
+
+        block_hits: Dict[str, int] = defaultdict(int)
+        pairs: List[Tuple[int, int]] = []
+
+        for reward_idx, reward_record in enumerate(reward_records):
+            probe_keys = self._exact_keys(reward_record)
+            bucket = self._date_amount_bucket(reward_record)
+            if bucket is not None:
+                day, band = bucket
+                for day_offset in range(-self.date_window_days, self.date_window_days + 1):
+                    for band_offset in (-1, 0, 1):
+                        probe_keys.append(('date_amount', day + day_offset, band + band_offset))
+
+            matched: Set[int] = set()
+            for key in probe_keys:
+                members = index.get(key)
+                if not members or key in oversized:
+                    continue
+                block_hits[key[0]] += len(members)
+                matched.update(members)
+
+            pairs.extend((reward_idx, pos_idx) for pos_idx in sorted(matched))
+
+        pair_index = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+
+        return BlockingResult(
+            pair_index=pair_index,
+            full_product_pairs=full_product,
+            block_hits=dict(block_hits),
+            oversized_blocks=len(oversized)
+        )
@@ -0,0 +1,126 @@
+import heapq
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Result labels counted over every scored pair
+RESULT_LABELS = ('match', 'review_required', 'no_match', 'error')
+
+
+class TopKCandidates:
+    """Keep only the best-scoring candidates per reward (and optionally per POS) transaction.
+
+    Scored batches are folded into bounded min-heaps, so memory is
+    O((N + M) * K) rather than one entry per scored pair. Counts of every
+    scored pair by result class are kept exactly alongside the heaps.
+    """
+
+    def __init__(self, reward_k: Optional[int] = 5, pos_k: Optional[int] = None):
+        self.reward_k = reward_k
+        self.pos_k = pos_k
+        self._reward_heaps: Dict[int, List[Tuple]] = defaultdict(list)
+        self._pos_heaps: Dict[int, List[Tuple]] = defaultdict(list)
+        self.counts = dict.fromkeys(RESULT_LABELS, 0)
+        self.scored_pairs = 0
+
+    def add_batch(self, pair_index: np.ndarray, scored: Dict[str, np.ndarray], threshold: float,
+                  review_threshold: float = 0.7):
+        """Count a scored batch and offer its pairs to the per-transaction heaps."""
+        confidence = np.asarray(scored['confidence'], dtype=np.float64)
+        processing_time = np.broadcast_to(np.asarray(scored['processing_time_ms'], dtype=np.float64),
+                                          confidence.shape)
+
+        self.scored_pairs += len(confidence)
+        self.counts['match'] += int(np.count_nonzero(confidence >= threshold))
+        self.counts['review_required'] += int(np.count_nonzero((confidence >= review_threshold) & (confidence < threshold)))
+        self.counts['no_match'] += int(np.count_nonzero(confidence < review_threshold))
+
+        self._offer_pairs(pair_index, confidence, scored['components'], processing_time)
+
+    def merge(self, pair_index: np.ndarray, scored: Dict[str, np.ndarray], counts: Dict[str, int], scored_pairs: int):
+        """Fold in candidates retained by an earlier run together with that run's exact counts."""
+        confidence = np.asarray(scored['confidence'], dtype=np.float64)
+        processing_time = np.broadcast_to(np.asarray(scored['processing_time_ms'], dtype=np.float64),
+                                          confidence.shape)
+
+        self.scored_pairs += scored_pairs
+        for label in RESULT_LABELS:
+            self.counts[label] += counts.get(label, 0)
+
+        self._offer_pairs(pair_index, confidence, scored['components'], processing_time)
+
+    def _offer_pairs(self, pair_index: np.ndarray, confidence: np.ndarray, components: np.ndarray,
+                     processing_time: np.ndarray):
+        """Offer pairs to the reward heaps and, when enabled, the POS heaps."""
+        self._offer(self._reward_heaps, self.reward_k, pair_index[:, 0], pair_index[:, 1],
+                    confidence, components, processing_time)
+        if self.pos_k:
+            self._offer(self._pos_heaps, self.pos_k, pair_index[:, 1], pair_index[:, 0],
+                        confidence, components, processing_time)
+
+    def add_errors(self, num_pairs: int):
+        """Count pairs from a batch that failed to score."""
+        self.scored_pairs += num_pairs
+        self.counts['error'] += num_pairs
+
+    def _offer(self, heaps: Dict[int, List[Tuple]], k: Optional[int], owner_idx: np.ndarray,
+               other_idx: np.ndarray, confidence: np.ndarray, components: np.ndarray,
+               processing_time: np.ndarray):
+        """Push pairs into each owner's heap, pre-trimming the batch to its top-k per owner."""
+        if k:
+            # Rank pairs within each owner by descending confidence and drop everything past k
+            order = np.lexsort((-confidence, owner_idx))
+            sorted_owners = owner_idx[order]
+            group_start = np.r_[0, np.flatnonzero(np.diff(sorted_owners)) + 1]
+            group_sizes = np.diff(np.r_[group_start, len(order)])
+            rank = np.arange(len(order)) - np.repeat(group_start, group_sizes)
+            candidates = order[rank < k]
+        else:
+            candidates = np.arange(len(confidence))
+
+        for i in candidates:
+            # other_idx is unique within an owner's heap, so components are never compared;
+            # the row is copied so a retained pair doesn't keep the whole batch matrix alive
+            entry = (confidence[i], int(other_idx[i]), components[i].copy(), processing_time[i])
+            heap = heaps[int(owner_idx[i])]
+            if not k or len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+    def retained_pairs(self) -> int:
+        """Number of distinct pairs held across the reward and POS heaps."""
+        keys = {(reward_idx, entry[1]) for reward_idx, heap in self._reward_heaps.items() for entry in heap}
+        keys.update((entry[1], pos_idx) for pos_idx, heap in self._pos_heaps.items() for entry in heap)
+        return len(keys)
+
+    def to_arrays(self) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Union of retained pairs as a sorted pair index plus aligned score arrays."""
+        retained: Dict[Tuple[int, int], Tuple] = {}
+        for reward_idx, heap in self._reward_heaps.items():
+            for confidence, pos_idx, components, processing_time in heap:
+                retained[(reward_idx, pos_idx)] = (confidence, components, processing_time)
+        for pos_idx, heap in self._pos_heaps.items():
+            for confidence, reward_idx, components, processing_time in heap:
+                retained[(reward_idx, pos_idx)] = (confidence, components, processing_time)
+
+        keys = sorted(retained)
+        pair_index = np.array(keys, dtype=np.int64).reshape(-1, 2)
+        values = [retained[key] for key in keys]
+
+        return pair_index, {
+            'confidence': np.array([v[0] for v in values], dtype=np.float64),
+            'components': np.array([v[1] for v in values]) if values else np.empty((0, 0)),
+            'processing_time_ms': np.array([v[2] for v in values], dtype=np.float64)
+        }
+
+    def get_stats(self) -> Dict:
+        """Exact counts over every scored pair plus retention totals."""
+        return {
+            'scored_pairs': self.scored_pairs,
+            'retained_pairs': self.retained_pairs(),
+            'reward_k': self.reward_k,
+            'pos_k': self.pos_k,
+            **self.counts
+        }
@@ -1,71 +1,137 @@
 import logging
 import re
+import time
 import phonenumbers
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional
 import numpy as np
-from fuzzywuzzy import fuzz
-from textblob import TextBlob
-import spacy
-from sentence_transformers import SentenceTransformer
-import pandas as pd
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier
-import joblib
 import os
 
+# pandas, spaCy, sentence-transformers, scikit-learn and joblib are imported where
+# first used, so importing this module stays cheap for the API's lightweight paths
+if TYPE_CHECKING:
+    import pandas as pd
+
+from embedding_cache import EmbeddingCache
+from model_bundle import DEFAULT_MODELS, ModelBundle
+from lookup_tables import CODE_FIELDS, FieldLookupTables
+from similarity_matrix import DistinctPairs, score_matrix, similarity
+
+# Version of the feature values a saved classifier was trained on; bump whenever feature values
+# change (2: string similarities from rapidfuzz), so classifiers fitted to older features are retrained
+FEATURE_VERSION = 2
+
+@dataclass(slots=True)
+class CanonicalTransaction:
+    """Normalized view of a transaction, computed once per job and reused for every pair."""
+    name: str = ''
+    name_tokens: Tuple[str, ...] = ()
+    phone: str = ''
+    email: str = ''
+    email_local: Optional[str] = None
+    email_domain: Optional[str] = None
+    service: str = ''
+    location: str = ''
+    provider: Optional[str] = None
+    amount: float = 0.0
+    date: Optional[datetime] = None
+
 class AdvancedConfidenceScorer:
     """Advanced ML-powered confidence scoring for transaction reconciliation."""
 
-    def __init__(self):
+    def __init__(self, embedding_cache_mb: float = 64.0, load_models: bool = True,
+                 model_bundle_dir: Optional[str] = None, similarity_workers: int = -1):
         self.logger = logging.getLogger(__name__)
         self.nlp = None
         self.sentence_model = None
-        self.scaler = StandardScaler()
-        self.classifier = RandomForestClassifier(n_estimators=100, random_state=42)
+        self.name_embeddings = EmbeddingCache(max_memory_mb=embedding_cache_mb)
+        self.service_vectors = EmbeddingCache(max_memory_mb=embedding_cache_mb)
+        # Native threads per batched string-similarity call (-1: all cores)
+        self.similarity_workers = similarity_workers
+        # Created by load_models() along with the NLP models
+        self.scaler = None
+        self.classifier = None
         self.feature_names = [
-            'name_similarity', 'amount_diff', 'date_diff_days', 'phone_similarity',
-            'email_similarity', 'service_similarity', 'location_similarity',
-            'amount_ratio', 'time_diff_hours', 'provider_match'
+            'name_similarity', 'amount_diff', 'date_diff_days', 'time_diff_hours',
+            'phone_similarity', 'email_similarity', 'service_similarity',
+            'location_similarity', 'amount_ratio', 'provider_match'
         ]
-        self._load_models()
+        if load_models:
+            self.load_models(model_bundle_dir)
         
-    def _load_models(self):
-        """Load NLP models and pre-trained classifier."""
-        try:
-            # Load spaCy model for text processing
-            self.nlp = spacy.load("en_core_web_sm")
-            self.logger.info("Loaded spaCy model")
-        except OSError:
-            self.logger.warning("spaCy model not found, installing...")
-            os.system("python -m spacy download en_core_web_sm")
-            self.nlp = spacy.load("en_core_web_sm")
+    def load_models(self, model_bundle_dir: Optional[str] = None):
+        """Load NLP models and pre-trained classifier.
+
+        With model_bundle_dir the models come from that checksum-verified
+        bundle (ModelBundleError if it does not verify); otherwise they are
+        loaded by name from installed packages. Nothing is downloaded.
+        """
+        # The batch feature path needs pandas; importing it here keeps that cost off the first job
+        import pandas
+        import spacy
+        from sentence_transformers import SentenceTransformer
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.preprocessing import StandardScaler
         
-        try:
-            # Load sentence transformer for semantic similarity
-            self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
-            self.logger.info("Loaded sentence transformer model")
-        except Exception as e:
-            self.logger.warning(f"Could not load sentence transformer: {e}")
-            self.sentence_model = None
+        if self.classifier is None:
+            self.scaler = StandardScaler()
+            self.classifier = RandomForestClassifier(n_estimators=100, random_state=42)
+        
+        if model_bundle_dir:
+            bundle = ModelBundle(model_bundle_dir)
+            bundle.verify()
+            spacy_source = bundle.model_path('spacy')
+            sentence_source = bundle.model_path('sentence_transformer')
+        else:
+            spacy_source = DEFAULT_MODELS['spacy']
+            sentence_source = DEFAULT_MODELS['sentence_transformer']
+        
+        if spacy_source:
+            try:
+                # Load spaCy model for text processing
+                self.nlp = spacy.load(spacy_source)
+                self.logger.info(f"Loaded spaCy model from {spacy_source}")
+            except OSError as e:
+                self.logger.warning(f"spaCy model {spacy_source} not available, service vectors disabled: {e}")
+                self.nlp = None
+        
+        if sentence_source:
+            try:
+                # Load sentence transformer for semantic similarity
+                self.sentence_model = SentenceTransformer(sentence_source)
+                self.logger.info(f"Loaded sentence transformer model from {sentence_source}")
+            except Exception as e:
+                self.logger.warning(f"Could not load sentence transformer: {e}")
+                self.sentence_model = None
             
         # Load pre-trained classifier if available
         self._load_classifier()
     
     def _load_classifier(self):
-        """Load pre-trained classifier from disk."""
+        """Load the pre-trained scaler and classifier from disk if they match FEATURE_VERSION."""
         try:
             if os.path.exists('models/transaction_classifier.joblib'):
-                self.classifier = joblib.load('models/transaction_classifier.joblib')
+                import joblib
+                saved = joblib.load('models/transaction_classifier.joblib')
+                if not isinstance(saved, dict) or saved.get('feature_version') != FEATURE_VERSION:
+                    # Fitted to different feature values; rule-based scoring is used until it is retrained
+                    self.logger.warning("Ignoring saved classifier trained on an older feature version; "
+                                        "retrain it with /model/train")
+                    return
+                self.scaler = saved['scaler']
+                self.classifier = saved['classifier']
                 self.logger.info("Loaded pre-trained classifier")
         except Exception as e:
             self.logger.warning(f"Could not load classifier: {e}")
     
     def _save_classifier(self):
-        """Save trained classifier to disk."""
+        """Save the trained scaler and classifier to disk with the feature version they were fitted on."""
         try:
+            import joblib
             os.makedirs('models', exist_ok=True)
-            joblib.dump(self.classifier, 'models/transaction_classifier.joblib')
+            joblib.dump({'feature_version': FEATURE_VERSION, 'scaler': self.scaler, 'classifier': self.classifier},
+                        'models/transaction_classifier.joblib')
             self.logger.info("Saved classifier model")
         except Exception as e:
             self.logger.error(f"Could not save classifier: {e}")
@@ -96,26 +162,25 @@ class AdvancedConfidenceScorer:
         if not name1 or not name2:
             return 0.0
         
-        norm_name1 = self._normalize_name(name1)
-        norm_name2 = self._normalize_name(name2)
-        
+        return self._name_similarity(self._normalize_name(name1), self._normalize_name(name2))
+
+    def _name_similarity(self, norm_name1: str, norm_name2: str) -> float:
+        """Name similarity between two already normalized names."""
         if not norm_name1 or not norm_name2:
             return 0.0
         
         # Multiple similarity metrics
         exact_match = 1.0 if norm_name1 == norm_name2 else 0.0
-        token_sort_ratio = fuzz.token_sort_ratio(norm_name1, norm_name2) / 100.0
-        token_set_ratio = fuzz.token_set_ratio(norm_name1, norm_name2) / 100.0
-        partial_ratio = fuzz.partial_ratio(norm_name1, norm_name2) / 100.0
+        token_sort_ratio = similarity('token_sort_ratio', norm_name1, norm_name2)
+        token_set_ratio = similarity('token_set_ratio', norm_name1, norm_name2)
+        partial_ratio = similarity('partial_ratio', norm_name1, norm_name2)
         
-        # Semantic similarity using sentence transformers
+        # Semantic similarity using cached sentence transformer embeddings
         semantic_similarity = 0.0
         if self.sentence_model:
             try:
-                embeddings = self.sentence_model.encode([norm_name1, norm_name2])
-                semantic_similarity = np.dot(embeddings[0], embeddings[1]) / (
-                    np.linalg.norm(embeddings[0]) * np.linalg.norm(embeddings[1])
-                )
+                embeddings = self._get_name_embeddings([norm_name1, norm_name2])
+                semantic_similarity = float(np.dot(embeddings[norm_name1], embeddings[norm_name2]))
             except Exception as e:
                 self.logger.warning(f"Semantic similarity failed: {e}")
         
@@ -125,6 +190,43 @@ class AdvancedConfidenceScorer:
         
         return sum(w * s for w, s in zip(weights, similarities))
 
+    def _encode_names(self, names: List[str]) -> np.ndarray:
+        """Encode names in one batched call, returning unit-normalized vectors."""
+        return np.asarray(
+            self.sentence_model.encode(names, batch_size=64, normalize_embeddings=True, show_progress_bar=False),
+            dtype=np.float32
+        )
+
+    def _get_name_embeddings(self, norm_names: List[str]) -> Dict[str, np.ndarray]:
+        """Get embeddings for normalized names, encoding only the cache misses."""
+        embeddings, missing = self.name_embeddings.get_many(norm_names)
+        if missing:
+            vectors = self._encode_names(missing)
+            self.name_embeddings.put_many(missing, vectors)
+            embeddings.update(zip(missing, vectors))
+        return embeddings
+
+    def warm_name_embeddings(self, norm_names: List[str]) -> int:
+        """Encode every distinct, not yet cached normalized name in a single batched call."""
+        if not self.sentence_model:
+            return 0
+        
+        distinct = set(norm_names)
+        missing = [name for name in distinct if name and name not in self.name_embeddings]
+        if not missing:
+            return 0
+        
+        try:
+            self.name_embeddings.put_many(missing, self._encode_names(missing))
+        except Exception as e:
+            self.logger.warning(f"Embedding warm-up failed: {e}")
+            return 0
+        
+        if len(self.name_embeddings) < len(distinct):
+            self.logger.warning("Embedding cache is smaller than the job's distinct names; raise embedding_cache_mb")
+        
+        return len(missing)
+
     def _normalize_phone(self, phone: str) -> str:
         """Normalize phone numbers for comparison."""
         if not phone:
@@ -143,9 +245,10 @@ class AdvancedConfidenceScorer:
         if not phone1 or not phone2:
             return 0.0
         
-        norm_phone1 = self._normalize_phone(phone1)
-        norm_phone2 = self._normalize_phone(phone2)
-        
+        return self._phone_similarity(self._normalize_phone(phone1), self._normalize_phone(phone2))
+
+    def _phone_similarity(self, norm_phone1: str, norm_phone2: str) -> float:
+        """Phone similarity between two already normalized numbers."""
         if not norm_phone1 or not norm_phone2:
             return 0.0
         
@@ -159,7 +262,7 @@ class AdvancedConfidenceScorer:
                 return 0.8
         
         # Fuzzy match
-        return fuzz.ratio(norm_phone1, norm_phone2) / 100.0
+        return similarity('ratio', norm_phone1, norm_phone2)
 
     def _normalize_email(self, email: str) -> str:
         """Normalize email addresses for comparison."""
@@ -176,20 +279,33 @@ class AdvancedConfidenceScorer:
         norm_email1 = self._normalize_email(email1)
         norm_email2 = self._normalize_email(email2)
         
-        if norm_email1 == norm_email2:
+        return self._email_similarity(norm_email1, *self._split_email(norm_email1),
+                                      norm_email2, *self._split_email(norm_email2))
+
+    def _split_email(self, norm_email: str) -> Tuple[Optional[str], Optional[str]]:
+        """Split a normalized email into local part and domain, if well formed."""
+        parts = norm_email.split('@')
+        if len(parts) != 2:
+            return None, None
+        return parts[0], parts[1]
+
+    def _email_similarity(self, email1: str, local1: Optional[str], domain1: Optional[str],
+                          email2: str, local2: Optional[str], domain2: Optional[str]) -> float:
+        """Email similarity from normalized emails and their pre-split parts."""
+        if not email1 or not email2:
+            return 0.0
+        
+        if email1 == email2:
             return 1.0
         
         # Compare local part and domain separately
-        try:
-            local1, domain1 = norm_email1.split('@')
-            local2, domain2 = norm_email2.split('@')
-            
-            local_similarity = fuzz.ratio(local1, local2) / 100.0
-            domain_similarity = 1.0 if domain1 == domain2 else 0.0
-            
-            return (local_similarity * 0.7 + domain_similarity * 0.3)
-        except:
-            return fuzz.ratio(norm_email1, norm_email2) / 100.0
+        if domain1 is None or domain2 is None:
+            return similarity('ratio', email1, email2)
+        
+        local_similarity = similarity('ratio', local1, local2)
+        domain_similarity = 1.0 if domain1 == domain2 else 0.0
+        
+        return (local_similarity * 0.7 + domain_similarity * 0.3)
 
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """Parse date string to datetime object."""
@@ -215,6 +331,7 @@ class AdvancedConfidenceScorer:
                     continue
             
             # Try pandas parsing as fallback
+            import pandas as pd
             return pd.to_datetime(date_str)
         except:
             return None
@@ -228,9 +345,8 @@ class AdvancedConfidenceScorer:
             return 0.0, float('inf')
         
         # Calculate time difference
-        time_diff = abs((dt1 - dt2).total_seconds())
-        hours_diff = time_diff / 3600
-        days_diff = time_diff / (24 * 3600)
+        hours_diff = self._hours_between(dt1, dt2)
+        days_diff = hours_diff / 24
         
         # Date similarity (higher for closer dates)
         if days_diff <= 1:
@@ -244,97 +360,502 @@ class AdvancedConfidenceScorer:
         
         return date_similarity, hours_diff
 
+    def _hours_between(self, dt1: Optional[datetime], dt2: Optional[datetime]) -> float:
+        """Absolute time difference in hours; infinite when either date is unknown."""
+        if not dt1 or not dt2:
+            return float('inf')
+        
+        return abs((dt1 - dt2).total_seconds()) / 3600
+
     def _calculate_service_similarity(self, service1: str, service2: str) -> float:
         """Calculate service similarity using NLP."""
         if not service1 or not service2:
             return 0.0
         
         # Normalize service names
-        service1_norm = service1.strip().lower()
-        service2_norm = service2.strip().lower()
+        return self._service_similarity(service1.strip().lower(), service2.strip().lower())
+
+    def _service_similarity(self, service1_norm: str, service2_norm: str) -> float:
+        """Service similarity between two already normalized service names."""
+        if not service1_norm or not service2_norm:
+            return 0.0
         
         if service1_norm == service2_norm:
             return 1.0
         
         # Token-based similarity
-        token_similarity = fuzz.token_sort_ratio(service1_norm, service2_norm) / 100.0
+        token_similarity = similarity('token_sort_ratio', service1_norm, service2_norm)
         
-        # Semantic similarity using spaCy
+        # Semantic similarity using cached spaCy Doc vectors
         semantic_similarity = 0.0
         if self.nlp:
             try:
-                doc1 = self.nlp(service1_norm)
-                doc2 = self.nlp(service2_norm)
-                semantic_similarity = doc1.similarity(doc2)
+                vectors = self._get_service_vectors([service1_norm, service2_norm])
+                semantic_similarity = float(np.dot(vectors[service1_norm], vectors[service2_norm]))
             except Exception as e:
                 self.logger.warning(f"spaCy similarity failed: {e}")
         
         # Weighted combination
         return token_similarity * 0.6 + semantic_similarity * 0.4
 
+    def _vector_pipe_disabled(self) -> List[str]:
+        """Pipeline components that are not needed to compute Doc vectors."""
+        # Static word vectors need no components; otherwise vectors come from the tok2vec tensor
+        needed = set() if len(self.nlp.vocab.vectors) > 0 else {'tok2vec'}
+        return [name for name in self.nlp.pipe_names if name not in needed]
+
+    def _encode_services(self, services: List[str]) -> np.ndarray:
+        """Compute unit-normalized Doc vectors for services with a single nlp.pipe pass."""
+        vectors = []
+        for doc in self.nlp.pipe(services, disable=self._vector_pipe_disabled(), batch_size=256):
+            vector = np.asarray(doc.vector, dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            vectors.append(vector / norm if norm > 0 else vector)
+        return np.array(vectors, dtype=np.float32)
+
+    def _get_service_vectors(self, services: List[str]) -> Dict[str, np.ndarray]:
+        """Get Doc vectors for normalized services, computing only the cache misses."""
+        vectors, missing = self.service_vectors.get_many(services)
+        if missing:
+            encoded = self._encode_services(missing)
+            self.service_vectors.put_many(missing, encoded)
+            vectors.update(zip(missing, encoded))
+        return vectors
+
+    def _service_similarity_batch(self, reward_services: List[str], pos_services: List[str],
+                                  reward_idx: np.ndarray, pos_idx: np.ndarray) -> np.ndarray:
+        """Service similarity for many pairs of normalized services, computed once per distinct pair."""
+        import pandas as pd
+        codes, uniques = pd.factorize(pd.Series(reward_services + pos_services, dtype=object))
+        num_services = len(uniques)
+        if num_services == 0:
+            return np.zeros(len(reward_idx), dtype=np.float64)
+        
+        # Cosine similarity between every distinct service, from cached Doc vectors
+        semantic = np.zeros((num_services, num_services), dtype=np.float32)
+        positions = [position for position, service in enumerate(uniques) if service]
+        if self.nlp and positions:
+            try:
+                vectors = self._get_service_vectors([uniques[position] for position in positions])
+                matrix = np.array([vectors[uniques[position]] for position in positions])
+                semantic[np.ix_(positions, positions)] = matrix @ matrix.T
+            except Exception as e:
+                self.logger.warning(f"spaCy similarity failed: {e}")
+        
+        pair_codes = codes[:len(reward_services)][reward_idx] * num_services + codes[len(reward_services):][pos_idx]
+        unique_pairs, inverse = np.unique(pair_codes, return_inverse=True)
+        
+        values = np.zeros(len(unique_pairs), dtype=np.float64)
+        for n, pair_code in enumerate(unique_pairs):
+            a, b = divmod(int(pair_code), num_services)
+            service1, service2 = uniques[a], uniques[b]
+            if not service1 or not service2:
+                continue
+            if service1 == service2:
+                values[n] = 1.0
+                continue
+            token_similarity = similarity('token_sort_ratio', service1, service2)
+            values[n] = token_similarity * 0.6 + float(semantic[a, b]) * 0.4
+        
+        return values[inverse.reshape(-1)]
+
+    def _service_similarity_matrix(self, left: List[str], right: List[str]) -> np.ndarray:
+        """_service_similarity between every left and every right normalized service."""
+        values = score_matrix('token_sort_ratio', left, right, self.similarity_workers) * 0.6
+        
+        if self.nlp:
+            try:
+                vectors = self._get_service_vectors([service for service in set(left) | set(right) if service])
+                dimension = len(next(iter(vectors.values()))) if vectors else 0
+                empty = np.zeros(dimension, dtype=np.float32)
+                left_vectors = np.array([vectors.get(service, empty) for service in left], dtype=np.float32)
+                right_vectors = np.array([vectors.get(service, empty) for service in right], dtype=np.float32)
+                values += (left_vectors @ right_vectors.T).astype(np.float64) * 0.4
+            except Exception as e:
+                self.logger.warning(f"spaCy similarity failed: {e}")
+        
+        left_values = np.asarray(left, dtype=object)[:, None]
+        right_values = np.asarray(right, dtype=object)[None, :]
+        values[left_values == right_values] = 1.0
+        values[(left_values == '') | (right_values == '')] = 0.0
+        return values
+
+    def lookup_score_fns(self) -> Dict:
+        """Similarity-matrix builders for the lookup table fields, matching the per-pair features."""
+        return {
+            'service': self._service_similarity_matrix,
+            'location': lambda left, right: score_matrix('ratio', left, right, self.similarity_workers)
+        }
+
+    def lookup_signature(self) -> Tuple:
+        """What lookup table matrices depend on besides the values: whether service vectors are available."""
+        return (self.nlp is not None,)
+
+    def prepare_lookup(self, tables: FieldLookupTables, reward_df: 'pd.DataFrame',
+                       pos_df: 'pd.DataFrame') -> Dict[str, np.ndarray]:
+        """Intern service, location and provider into the tables' integer codes.
+
+        Adds a '<field>_code' column to both canonical frames and returns the
+        similarity matrices those codes index, for extract_features_batch.
+        """
+        for field in CODE_FIELDS:
+            codes = tables.intern(field, reward_df[field].tolist() + pos_df[field].tolist())
+            reward_df[f'{field}_code'] = codes[:len(reward_df)]
+            pos_df[f'{field}_code'] = codes[len(reward_df):]
+        return tables.matrices()
+
+    def prepare_job(self, reward_records: List[CanonicalTransaction], pos_records: List[CanonicalTransaction]):
+        """Precompute per-job caches: name embeddings and service Doc vectors."""
+        records = reward_records + pos_records
+        self.warm_name_embeddings([record.name for record in records])
+        self.warm_service_vectors([record.service for record in records])
+
+    def warm_service_vectors(self, norm_services: List[str]) -> int:
+        """Compute Doc vectors for every distinct, not yet cached normalized service."""
+        if not self.nlp:
+            return 0
+        
+        distinct = set(norm_services)
+        missing = [service for service in distinct if service and service not in self.service_vectors]
+        if not missing:
+            return 0
+        
+        try:
+            self.service_vectors.put_many(missing, self._encode_services(missing))
+        except Exception as e:
+            self.logger.warning(f"Service vector warm-up failed: {e}")
+            return 0
+        
+        return len(missing)
+
+    def _text(self, value) -> str:
+        """Coerce a possibly missing field (None, NaN) to a string."""
+        return value if isinstance(value, str) else ''
+
+    def _to_amount(self, value) -> float:
+        """Coerce a possibly missing amount to float."""
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            return 0.0
+        return float(value)
+
+    def canonicalize(self, txn: Dict) -> CanonicalTransaction:
+        """Normalize a transaction once so it can be compared against many others."""
+        name = self._normalize_name(self._text(txn.get('customer_name')))
+        email = self._normalize_email(self._text(txn.get('customer_email')))
+        email_local, email_domain = self._split_email(email)
+        provider = txn.get('provider')
+        
+        return CanonicalTransaction(
+            name=name,
+            name_tokens=tuple(name.split()),
+            phone=self._normalize_phone(self._text(txn.get('customer_phone'))),
+            email=email,
+            email_local=email_local,
+            email_domain=email_domain,
+            service=self._text(txn.get('service')).strip().lower(),
+            location=self._text(txn.get('location')).lower(),
+            provider=None if provider is None or (isinstance(provider, float) and np.isnan(provider)) else provider,
+            amount=self._to_amount(txn.get('amount', 0)),
+            date=self._parse_date(txn.get('date', ''))
+        )
+
+    def canonicalize_many(self, transactions: List[Dict]) -> List[CanonicalTransaction]:
+        """Canonicalize a list of transactions, one pass per transaction."""
+        return [self.canonicalize(txn) for txn in transactions]
+
+    def canonical_frame(self, records: List[CanonicalTransaction]) -> 'pd.DataFrame':
+        """Columnar view of canonical records consumed by the batch feature path."""
+        import pandas as pd
+        epoch = datetime(1970, 1, 1)
+        timestamps = [
+            (record.date.replace(tzinfo=None) - epoch).total_seconds() if record.date is not None else np.nan
+            for record in records
+        ]
+        
+        frame = pd.DataFrame({
+            'name': [record.name for record in records],
+            'phone': [record.phone for record in records],
+            'email': [record.email for record in records],
+            'email_local': [record.email_local for record in records],
+            'email_domain': [record.email_domain for record in records],
+            'service': [record.service for record in records],
+            'location': [record.location for record in records],
+            'provider': pd.Series([record.provider for record in records], dtype=object),
+            'amount': np.array([record.amount for record in records], dtype=np.float64),
+            'timestamp': np.array(timestamps, dtype=np.float64)
+        })
+        frame.attrs['canonical'] = True
+        return frame
+
+    def canonicalize_frame(self, df: 'pd.DataFrame') -> 'pd.DataFrame':
+        """Return a canonical frame, canonicalizing a raw transaction frame if needed."""
+        if df.attrs.get('canonical'):
+            return df
+        return self.canonical_frame(self.canonicalize_many(df.to_dict('records')))
+
     def _extract_features(self, reward_txn: Dict, pos_txn: Dict) -> List[float]:
         """Extract comprehensive features for ML classification."""
+        return self._extract_canonical_features(self.canonicalize(reward_txn), self.canonicalize(pos_txn))
+
+    def _extract_canonical_features(self, reward: CanonicalTransaction, pos: CanonicalTransaction) -> List[float]:
+        """Extract features from two canonicalized transactions."""
         features = []
         
         # Name similarity
-        name_sim = self._calculate_name_similarity(
-            reward_txn.get('customer_name', ''),
-            pos_txn.get('customer_name', '')
-        )
-        features.append(name_sim)
+        features.append(self._name_similarity(reward.name, pos.name))
         
         # Amount difference
-        amount1 = float(reward_txn.get('amount', 0))
-        amount2 = float(pos_txn.get('amount', 0))
-        amount_diff = abs(amount1 - amount2)
+        amount_diff = abs(reward.amount - pos.amount)
         features.append(amount_diff)
         
-        # Date similarity and time difference
-        date_sim, hours_diff = self._calculate_date_similarity(
-            reward_txn.get('date', ''),
-            pos_txn.get('date', '')
-        )
+        # Time difference
+        hours_diff = self._hours_between(reward.date, pos.date)
         features.append(hours_diff / 24)  # Convert to days
         features.append(hours_diff)
         
         # Phone similarity
-        phone_sim = self._calculate_phone_similarity(
-            reward_txn.get('customer_phone', ''),
-            pos_txn.get('customer_phone', '')
-        )
-        features.append(phone_sim)
+        features.append(self._phone_similarity(reward.phone, pos.phone))
         
         # Email similarity
-        email_sim = self._calculate_email_similarity(
-            reward_txn.get('customer_email', ''),
-            pos_txn.get('customer_email', '')
-        )
-        features.append(email_sim)
+        features.append(self._email_similarity(
+            reward.email, reward.email_local, reward.email_domain,
+            pos.email, pos.email_local, pos.email_domain
+        ))
         
         # Service similarity
-        service_sim = self._calculate_service_similarity(
-            reward_txn.get('service', ''),
-            pos_txn.get('service', '')
-        )
-        features.append(service_sim)
+        features.append(self._service_similarity(reward.service, pos.service))
         
         # Location similarity
-        location_sim = fuzz.ratio(
-            reward_txn.get('location', '').lower(),
-            pos_txn.get('location', '').lower()
-        ) / 100.0
-        features.append(location_sim)
+        features.append(similarity('ratio', reward.location, pos.location))
         
         # Amount ratio
-        amount_ratio = min(amount1, amount2) / max(amount1, amount2) if max(amount1, amount2) > 0 else 0
-        features.append(amount_ratio)
+        larger = max(reward.amount, pos.amount)
+        features.append(min(reward.amount, pos.amount) / larger if larger > 0 else 0)
         
         # Provider match
-        provider_match = 1.0 if reward_txn.get('provider') == pos_txn.get('provider') else 0.0
-        features.append(provider_match)
+        features.append(1.0 if reward.provider == pos.provider else 0.0)
         
         return features
 
+    def extract_features_batch(self, reward_df: 'pd.DataFrame', pos_df: 'pd.DataFrame',
+                               pair_index: np.ndarray, timings: Optional[Dict[str, float]] = None,
+                               lookup: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        """Extract the feature matrix for many (reward_row, pos_row) pairs at once.
+
+        ``reward_df``/``pos_df`` are canonical frames from ``canonical_frame``
+        (raw transaction frames are canonicalized first). ``pair_index`` is an
+        (n, 2) integer array of positional row indices. Numeric features are
+        computed as column operations; columns follow ``self.feature_names``.
+        When ``timings`` is given, seconds spent per feature group are added to it.
+        With ``lookup`` from prepare_lookup, service and location similarity
+        are gathered from its matrices through the frames' code columns.
+        """
+        pair_index = np.asarray(pair_index, dtype=np.int64).reshape(-1, 2)
+        reward_idx = pair_index[:, 0]
+        pos_idx = pair_index[:, 1]
+        features = np.zeros((len(pair_index), len(self.feature_names)), dtype=np.float64)
+
+        if len(pair_index) == 0:
+            return features
+
+        reward_df = self.canonicalize_frame(reward_df)
+        pos_df = self.canonicalize_frame(pos_df)
+        clock = time.perf_counter()
+
+        # Amount difference and ratio
+        amount1 = reward_df['amount'].to_numpy()[reward_idx]
+        amount2 = pos_df['amount'].to_numpy()[pos_idx]
+        larger = np.maximum(amount1, amount2)
+        features[:, 1] = np.abs(amount1 - amount2)
+        features[:, 8] = np.divide(np.minimum(amount1, amount2), larger,
+                                   out=np.zeros_like(larger), where=larger > 0)
+
+        # Date deltas; unparseable dates count as infinitely far apart
+        hours_diff = np.abs(reward_df['timestamp'].to_numpy()[reward_idx] - pos_df['timestamp'].to_numpy()[pos_idx]) / 3600
+        hours_diff = np.where(np.isnan(hours_diff), np.inf, hours_diff)
+        features[:, 2] = hours_diff / 24
+        features[:, 3] = hours_diff
+
+        # Provider equality through shared integer codes
+        if 'provider_code' in reward_df and 'provider_code' in pos_df:
+            reward_codes = reward_df['provider_code'].to_numpy()
+            pos_codes = pos_df['provider_code'].to_numpy()
+        else:
+            import pandas as pd
+            providers = pd.concat([reward_df['provider'], pos_df['provider']], ignore_index=True)
+            codes, _ = pd.factorize(providers, use_na_sentinel=False)
+            reward_codes = codes[:len(reward_df)]
+            pos_codes = codes[len(reward_df):]
+        features[:, 9] = (reward_codes[reward_idx] == pos_codes[pos_idx]).astype(np.float64)
+        clock = self._lap(timings, 'numeric', clock)
+
+        # Service similarity from the lookup table, or once per distinct service pair
+        service = self._lookup_similarity(lookup, 'service', reward_df, pos_df, reward_idx, pos_idx)
+        if service is None:
+            service = self._service_similarity_batch(
+                reward_df['service'].tolist(), pos_df['service'].tolist(), reward_idx, pos_idx
+            )
+        features[:, 6] = service
+        clock = self._lap(timings, 'service', clock)
+
+        # Encode any names this batch needs in one call (a no-op once prepare_job ran)
+        self.warm_name_embeddings(
+            reward_df['name'].to_numpy()[np.unique(reward_idx)].tolist()
+            + pos_df['name'].to_numpy()[np.unique(pos_idx)].tolist()
+        )
+        clock = self._lap(timings, 'name_embeddings', clock)
+
+        # Text similarities, each string comparison made once per distinct value pair in native batches
+        features[:, 0] = self._name_similarity_batch(self._text_pairs(reward_df, pos_df, 'name', reward_idx, pos_idx))
+        features[:, 4] = self._phone_similarity_batch(self._text_pairs(reward_df, pos_df, 'phone', reward_idx, pos_idx))
+        features[:, 5] = self._email_similarity_batch(self._text_pairs(reward_df, pos_df, 'email', reward_idx, pos_idx))
+        location = self._lookup_similarity(lookup, 'location', reward_df, pos_df, reward_idx, pos_idx)
+        if location is None:
+            locations = self._text_pairs(reward_df, pos_df, 'location', reward_idx, pos_idx)
+            location = locations.expand(locations.scores('ratio'))
+        features[:, 7] = location
+        self._lap(timings, 'text_similarity', clock)
+
+        return features
+
+    @staticmethod
+    def _lookup_similarity(lookup: Optional[Dict[str, np.ndarray]], field: str, reward_df: 'pd.DataFrame',
+                           pos_df: 'pd.DataFrame', reward_idx: np.ndarray, pos_idx: np.ndarray) -> Optional[np.ndarray]:
+        """A field's similarity for every pair gathered from its lookup matrix, or None without one."""
+        column = f'{field}_code'
+        if not lookup or field not in lookup or column not in reward_df or column not in pos_df:
+            return None
+        return lookup[field][reward_df[column].to_numpy()[reward_idx], pos_df[column].to_numpy()[pos_idx]]
+
+    def _text_pairs(self, reward_df: 'pd.DataFrame', pos_df: 'pd.DataFrame', column: str,
+                    reward_idx: np.ndarray, pos_idx: np.ndarray) -> DistinctPairs:
+        """Distinct value pairs of one canonical text column across the batch's pairs."""
+        return DistinctPairs.build(reward_df[column].tolist(), pos_df[column].tolist(),
+                                   reward_idx, pos_idx, self.similarity_workers)
+
+    def _name_similarity_batch(self, pairs: DistinctPairs) -> np.ndarray:
+        """_name_similarity for every pair, from per-distinct-pair fuzzy scores and cached embeddings."""
+        left, right = pairs.left_values(), pairs.right_values()
+        
+        semantic = np.zeros(len(pairs), dtype=np.float64)
+        if self.sentence_model and len(pairs):
+            try:
+                embeddings = self._get_name_embeddings([name for name in set(pairs.left) | set(pairs.right) if name])
+                dimension = len(next(iter(embeddings.values()))) if embeddings else 0
+                empty = np.zeros(dimension, dtype=np.float32)
+                left_vectors = np.array([embeddings.get(name, empty) for name in pairs.left], dtype=np.float32)
+                right_vectors = np.array([embeddings.get(name, empty) for name in pairs.right], dtype=np.float32)
+                semantic = np.einsum('ij,ij->i', left_vectors[pairs.left_codes],
+                                     right_vectors[pairs.right_codes]).astype(np.float64)
+            except Exception as e:
+                self.logger.warning(f"Semantic similarity failed: {e}")
+        
+        # Same weights and summation order as _name_similarity
+        values = (0.3 * (left == right).astype(np.float64) + 0.2 * pairs.scores('token_sort_ratio')
+                  + 0.2 * pairs.scores('token_set_ratio') + 0.15 * pairs.scores('partial_ratio') + 0.15 * semantic)
+        values[(left == '') | (right == '')] = 0.0
+        return pairs.expand(values)
+
+    def _phone_similarity_batch(self, pairs: DistinctPairs) -> np.ndarray:
+        """_phone_similarity for every pair."""
+        left, right = pairs.left_values(), pairs.right_values()
+        left_tail = np.asarray([phone[-7:] if len(phone) >= 7 else None for phone in pairs.left], dtype=object)
+        right_tail = np.asarray([phone[-7:] if len(phone) >= 7 else None for phone in pairs.right], dtype=object)
+        left_tail, right_tail = left_tail[pairs.left_codes], right_tail[pairs.right_codes]
+        
+        values = pairs.scores('ratio')
+        values[(left_tail != None) & (right_tail != None) & (left_tail == right_tail)] = 0.8
+        values[left == right] = 1.0
+        values[(left == '') | (right == '')] = 0.0
+        return pairs.expand(values)
+
+    def _email_similarity_batch(self, pairs: DistinctPairs) -> np.ndarray:
+        """_email_similarity for every pair; local parts are compared once per distinct local pair."""
+        left, right = pairs.left_values(), pairs.right_values()
+        left_split = [self._split_email(email) for email in pairs.left]
+        right_split = [self._split_email(email) for email in pairs.right]
+        left_domain = np.asarray([domain for _, domain in left_split], dtype=object)[pairs.left_codes]
+        right_domain = np.asarray([domain for _, domain in right_split], dtype=object)[pairs.right_codes]
+        
+        local_parts = DistinctPairs.build([local or '' for local, _ in left_split],
+                                          [local or '' for local, _ in right_split],
+                                          pairs.left_codes, pairs.right_codes, pairs.workers)
+        local_similarity = local_parts.expand(local_parts.scores('ratio'))
+        domain_similarity = (left_domain == right_domain).astype(np.float64)
+        
+        split = (left_domain != None) & (right_domain != None)
+        values = np.where(split, local_similarity * 0.7 + domain_similarity * 0.3, pairs.scores('ratio'))
+        values[left == right] = 1.0
+        values[(left == '') | (right == '')] = 0.0
+        return pairs.expand(values)
+
+    @staticmethod
+    def _lap(timings: Optional[Dict[str, float]], name: str, since: float) -> float:
+        """Add the time since ``since`` to timings[name]; returns the current clock."""
+        now = time.perf_counter()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + now - since
+        return now
+
+    def calculate_confidence_batch(self, reward_df: 'pd.DataFrame', pos_df: 'pd.DataFrame',
+                                   pair_index: np.ndarray,
+                                   lookup: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """Score many pairs with one feature pass and a single model call.
+
+        The result's 'timings' maps feature groups and 'model_inference' to seconds.
+        """
+        timings: Dict[str, float] = {}
+        features = self.extract_features_batch(reward_df, pos_df, pair_index, timings, lookup)
+
+        clock = time.perf_counter()
+        if len(features) == 0:
+            confidence = np.zeros(0, dtype=np.float64)
+        elif self._model_ready():
+            features_scaled = self.scaler.transform(self._model_matrix(features))
+            confidence = self.classifier.predict_proba(features_scaled)[:, 1]
+        else:
+            confidence = self._rule_based_scoring_batch(features)
+        self._lap(timings, 'model_inference', clock)
+
+        return {
+            'confidence': confidence,
+            'features': features,
+            'timings': timings
+        }
+
+    def _model_ready(self) -> bool:
+        """Check whether both the scaler and the classifier have been fitted."""
+        return hasattr(self.classifier, 'feature_importances_') and hasattr(self.scaler, 'mean_')
+
+    def _model_matrix(self, features) -> np.ndarray:
+        """Replace infinite date gaps with a finite value the scaler can handle."""
+        return np.nan_to_num(np.asarray(features, dtype=np.float64), nan=0.0, posinf=1e6)
+
+    # Component scores reported to clients, in component_matrix column order
+    COMPONENT_NAMES = (
+        'name_match', 'amount_diff', 'date_similarity', 'phone_similarity', 'email_similarity',
+        'service_similarity', 'location_similarity', 'amount_ratio', 'provider_match'
+    )
+
+    def component_matrix(self, features: np.ndarray) -> np.ndarray:
+        """Map an (n, 10) feature matrix to component scores, one column per COMPONENT_NAMES entry."""
+        features = np.asarray(features, dtype=np.float64).reshape(-1, len(self.feature_names))
+        return np.column_stack([
+            features[:, 0],
+            features[:, 1],
+            1.0 - np.minimum(features[:, 2], 1.0),  # Convert days diff to similarity
+            features[:, 4],
+            features[:, 5],
+            features[:, 6],
+            features[:, 7],
+            features[:, 8],
+            features[:, 9]
+        ])
+
+    def component_scores(self, features) -> Dict[str, float]:
+        """Map a feature vector to the component scores reported to clients."""
+        return dict(zip(self.COMPONENT_NAMES, self.component_matrix(features)[0].tolist()))
+
     def calculate_comprehensive_confidence(self, reward_txn: Dict, pos_txn: Dict) -> Dict:
         """Calculate comprehensive confidence score using ML features."""
         start_time = datetime.now()
@@ -344,9 +865,9 @@ class AdvancedConfidenceScorer:
             features = self._extract_features(reward_txn, pos_txn)
             
             # Use ML classifier for prediction
-            if hasattr(self.classifier, 'predict_proba'):
+            if self._model_ready():
                 # Get probability from trained classifier
-                features_scaled = self.scaler.transform([features])
+                features_scaled = self.scaler.transform(self._model_matrix([features]))
                 match_probability = self.classifier.predict_proba(features_scaled)[0][1]
             else:
                 # Fallback to rule-based scoring
@@ -360,17 +881,7 @@ class AdvancedConfidenceScorer:
             recommendation = self._get_recommendation(match_probability)
             
             # Component scores for transparency
-            component_scores = {
-                'name_match': features[0],
-                'amount_diff': features[1],
-                'date_similarity': 1.0 - min(features[2], 1.0),  # Convert days diff to similarity
-                'phone_similarity': features[3],
-                'email_similarity': features[4],
-                'service_similarity': features[5],
-                'location_similarity': features[6],
-                'amount_ratio': features[7],
-                'provider_match': features[8]
-            }
+            component_scores = self.component_scores(features)
             
             return {
                 'overall_confidence': match_probability,
@@ -428,6 +939,23 @@ class AdvancedConfidenceScorer:
         
         return min(score, 1.0)
 
+    def _rule_based_scoring_batch(self, features: np.ndarray) -> np.ndarray:
+        """Vectorized equivalent of _rule_based_scoring over a feature matrix."""
+        name_sim = features[:, 0]
+        amount_diff = features[:, 1]
+        days_diff = features[:, 2]
+        phone_sim = features[:, 4]
+        email_sim = features[:, 5]
+        service_sim = features[:, 6]
+        
+        score = name_sim * 0.3
+        score = score + np.select([amount_diff < 0.01, amount_diff < 1.0, amount_diff < 5.0], [0.25, 0.2, 0.1], 0.0)
+        score = score + np.select([days_diff <= 1, days_diff <= 7, days_diff <= 30], [0.2, 0.15, 0.1], 0.0)
+        score = score + np.maximum(phone_sim, email_sim) * 0.15
+        score = score + service_sim * 0.1
+        
+        return np.minimum(score, 1.0)
+
     def _get_confidence_level(self, probability: float) -> str:
         """Convert probability to confidence level."""
         if probability >= 0.95:
@@ -467,14 +995,20 @@ class AdvancedConfidenceScorer:
                 return {'error': 'Insufficient training data (need at least 10 samples)'}
             
             # Convert to numpy arrays
-            X = np.array(X)
+            X = self._model_matrix(X)
             y = np.array(y)
             
+            # Fit copies; scoring threads keep using the current models until training has finished
+            from sklearn.base import clone
+            scaler = clone(self.scaler)
+            classifier = clone(self.classifier)
+            
             # Scale features
-            X_scaled = self.scaler.fit_transform(X)
+            X_scaled = scaler.fit_transform(X)
             
             # Train classifier
-            self.classifier.fit(X_scaled, y)
+            classifier.fit(X_scaled, y)
+            self.scaler, self.classifier = scaler, classifier
             
             # Save model
             self._save_classifier()
@@ -501,6 +1035,9 @@ class AdvancedConfidenceScorer:
             'features': self.feature_names,
             'is_trained': hasattr(self.classifier, 'feature_importances_'),
             'version': '1.0.0',
+            'feature_version': FEATURE_VERSION,
+            'embedding_cache': self.name_embeddings.get_stats(),
+            'service_vector_cache': self.service_vectors.get_stats(),
             'nlp_models_loaded': {
                 'spacy': self.nlp is not None,
                 'sentence_transformer': self.sentence_model is not None
@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from ingestion import TransactionBatch
+
+# Dataset IDs are uuid4 hex strings; anything else never touches the filesystem
+_DATASET_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class DatasetStore:
+    """On-disk cache of uploaded transaction datasets, addressed by ID and evicted after a TTL."""
+
+    def __init__(self, cache_dir: str = 'data/datasets', ttl_seconds: float = 24 * 3600):
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._metadata: Dict[str, Dict] = {}
+        self._load_index()
+
+    def _paths(self, dataset_id: str) -> Dict[str, str]:
+        base = os.path.join(self.cache_dir, dataset_id)
+        return {'data': base + '.pkl', 'meta': base + '.json'}
+
+    def _load_index(self):
+        """Pick up datasets cached by a previous process."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for filename in os.listdir(self.cache_dir):
+                dataset_id, extension = os.path.splitext(filename)
+                if extension != '.json' or not _DATASET_ID.match(dataset_id):
+                    continue
+                with open(os.path.join(self.cache_dir, filename), 'r') as f:
+                    self._metadata[dataset_id] = json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Could not load dataset cache index: {e}")
+
+        self.evict_expired()
+
+    def put(self, batch: TransactionBatch, kind: str, filename: Optional[str] = None) -> Dict:
+        """Persist a parsed upload and return its metadata, including the new dataset_id."""
+        dataset_id = uuid.uuid4().hex
+        now = time.time()
+        metadata = {
+            'dataset_id': dataset_id,
+            'kind': kind,
+            'filename': filename,
+            'rows': len(batch),
+            'rows_read': batch.rows_read,
+            'invalid_amounts': batch.invalid_amounts,
+            'missing_columns': batch.missing_columns,
+            'created_at': now,
+            'expires_at': now + self.ttl_seconds
+        }
+
+        paths = self._paths(dataset_id)
+        batch.to_frame().to_pickle(paths['data'])
+        with open(paths['meta'], 'w') as f:
+            json.dump(metadata, f)
+
+        with self._lock:
+            self._metadata[dataset_id] = metadata
+
+        self.evict_expired()
+        return metadata
+
+    def info(self, dataset_id: str) -> Optional[Dict]:
+        """Metadata of a live dataset, or None if it is unknown or expired."""
+        if not _DATASET_ID.match(dataset_id or ''):
+            return None
+
+        with self._lock:
+            metadata = self._metadata.get(dataset_id)
+
+        if metadata is None:
+            return None
+        if metadata['expires_at'] <= time.time():
+            self.delete(dataset_id)
+            return None
+        return metadata
+
+    def get(self, dataset_id: str) -> Optional[TransactionBatch]:
+        """Load a live dataset back into a TransactionBatch."""
+        metadata = self.info(dataset_id)
+        if metadata is None:
+            return None
+
+        try:
+            import pandas as pd
+            frame = pd.read_pickle(self._paths(dataset_id)['data'])
+        except FileNotFoundError:
+            self.logger.warning(f"Dataset {dataset_id} is missing from the cache directory")
+            self.delete(dataset_id)
+            return None
+
+        return TransactionBatch.from_frame(
+            frame,
+            rows_read=metadata['rows_read'],
+            invalid_amounts=metadata['invalid_amounts'],
+            missing_columns=metadata['missing_columns']
+        )
+
+    def delete(self, dataset_id: str) -> bool:
+        """Remove a dataset from the index and the cache directory."""
+        if not _DATASET_ID.match(dataset_id or ''):
+            return False
+
+        with self._lock:
+            existed = self._metadata.pop(dataset_id, None) is not None
+
+        for path in self._paths(dataset_id).values():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return existed
+
+    def evict_expired(self) -> int:
+        """Delete every dataset past its TTL."""
+        now = time.time()
+        with self._lock:
+            expired = [dataset_id for dataset_id, metadata in self._metadata.items() if metadata['expires_at'] <= now]
+
+        for dataset_id in expired:
+            self.delete(dataset_id)
+        if expired:
+            self.logger.info(f"Evicted {len(expired)} expired datasets")
+        return len(expired)
+
+    def list_datasets(self) -> List[Dict]:
+        """Metadata of all live datasets."""
+        self.evict_expired()
+        with self._lock:
+            return list(self._metadata.values())
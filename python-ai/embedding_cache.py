@@ -0,0 +1,96 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """Bounded LRU cache of unit-normalized vectors keyed by normalized text."""
+
+    def __init__(self, max_memory_mb: float = 64.0):
+        self.logger = logging.getLogger(__name__)
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return the cached vector for key, counting a hit or a miss."""
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def get_many(self, keys: Iterable[str]) -> Tuple[Dict[str, np.ndarray], List[str]]:
+        """Look up several keys at once, returning found vectors and missing keys."""
+        found: Dict[str, np.ndarray] = {}
+        missing: List[str] = []
+        for key in dict.fromkeys(keys):
+            vector = self.get(key)
+            if vector is None:
+                missing.append(key)
+            else:
+                found[key] = vector
+        return found, missing
+
+    def put(self, key: str, vector: np.ndarray):
+        """Store a vector, evicting least recently used entries past the memory cap."""
+        # Always copy: a row view would keep its whole batch alive while counting only its own bytes
+        vector = np.array(vector, dtype=np.float32, copy=True)
+        if vector.nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+
+            self._entries[key] = vector
+            self._bytes += vector.nbytes
+
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        """Store one vector per key."""
+        for key, vector in zip(keys, vectors):
+            self.put(key, vector)
+
+    def clear(self):
+        """Drop all cached vectors and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def get_stats(self) -> Dict:
+        """Get cache occupancy and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'memory_mb': self._bytes / (1024 * 1024),
+            'max_memory_mb': self.max_bytes / (1024 * 1024),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups > 0 else 0.0
+        }
@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import psutil
+
+
+class SystemHealthSampler:
+    """Background sampler of CPU, memory, disk and model status, kept in a ring buffer.
+
+    A daemon thread takes a sample every ``interval_seconds`` and keeps the
+    last ``history_size`` of them, so health endpoints read the newest
+    snapshot instead of measuring on the request path. CPU usage is the
+    average since the previous sample (psutil's non-blocking mode).
+    """
+
+    def __init__(self, model_status: Callable[[], Dict], interval_seconds: float = 5.0,
+                 history_size: int = 120, disk_path: str = '/'):
+        self.logger = logging.getLogger(__name__)
+        self.model_status = model_status
+        self.interval_seconds = interval_seconds
+        self.disk_path = disk_path
+        self._samples: deque = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> Dict:
+        """Take a first sample and start the sampling thread if it is not running; returns the newest sample."""
+        with self._lock:
+            if self._thread is None:
+                # The first non-blocking reading only sets psutil's reference point
+                psutil.cpu_percent(interval=None)
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='health-sampler', daemon=True)
+                self._thread.start()
+                first = self.sample()
+            else:
+                first = None
+        return first or self.latest()
+
+    def stop(self):
+        """Stop the sampling thread; the collected samples remain readable."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout=self.interval_seconds + 1)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.sample()
+            except Exception as e:
+                self.logger.error(f"Health sampling failed: {e}")
+
+    def sample(self) -> Dict:
+        """Measure now and append the snapshot to the buffer."""
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        snapshot = {
+            'timestamp': datetime.now().isoformat(),
+            'sampled_at': time.monotonic(),
+            'system_metrics': {
+                'cpu_percent': psutil.cpu_percent(interval=None),
+                'memory_percent': memory.percent,
+                'memory_available_gb': memory.available / (1024**3),
+                'disk_percent': disk.percent,
+                'disk_free_gb': disk.free / (1024**3)
+            },
+            'model_status': self.model_status()
+        }
+        self._samples.append(snapshot)
+        return snapshot
+
+    def latest(self) -> Optional[Dict]:
+        """Newest snapshot, or None before the first sample."""
+        try:
+            return self._samples[-1]
+        except IndexError:
+            return None
+
+    def series(self, limit: Optional[int] = None) -> List[Dict]:
+        """Up to limit most recent system metrics, oldest first, each with its timestamp."""
+        samples = list(self._samples)
+        if limit is not None:
+            samples = samples[-limit:] if limit > 0 else []
+        return [{'timestamp': sample['timestamp'], **sample['system_metrics']} for sample in samples]
+
+    def get_stats(self) -> Dict:
+        """Sampler settings and buffer fill."""
+        latest = self.latest()
+        return {
+            'running': self._thread is not None,
+            'interval_seconds': self.interval_seconds,
+            'samples': len(self._samples),
+            'history_size': self._samples.maxlen,
+            'last_sample_age_seconds': time.monotonic() - latest['sampled_at'] if latest else None
+        }
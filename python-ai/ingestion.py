@@ -0,0 +1,122 @@
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, BinaryIO, Dict, List, Union
+
+import numpy as np
+
+# pandas is imported on first parse so the API can start without it
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Transaction fields read from uploaded CSV files, in output order
+TRANSACTION_COLUMNS = (
+    'customer_name', 'customer_phone', 'customer_email', 'service', 'amount',
+    'date', 'provider', 'location', 'transaction_id'
+)
+TEXT_COLUMNS = tuple(column for column in TRANSACTION_COLUMNS if column != 'amount')
+
+# Rows parsed per pandas chunk; bounds peak memory while reading large exports
+DEFAULT_CHUNK_ROWS = 50_000
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TransactionBatch:
+    """Columnar transactions parsed from a CSV upload.
+
+    Text fields are stored as pandas Categoricals, so repeated values such as
+    provider, location, service and date are held once; amounts are float64.
+    """
+    columns: Dict[str, Union['pd.Categorical', np.ndarray]]
+    rows_read: int = 0
+    invalid_amounts: int = 0
+    missing_columns: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.columns['amount'])
+
+    def to_records(self) -> List[Dict]:
+        """Transaction dicts in the format the reconciliation endpoints accept."""
+        values = [np.asarray(self.columns[column]).tolist() for column in TRANSACTION_COLUMNS]
+        return [dict(zip(TRANSACTION_COLUMNS, row)) for row in zip(*values)]
+
+    def to_frame(self) -> 'pd.DataFrame':
+        """The batch as a DataFrame, one column per transaction field."""
+        import pandas as pd
+        return pd.DataFrame(self.columns, columns=list(TRANSACTION_COLUMNS))
+
+    @classmethod
+    def from_frame(cls, frame: 'pd.DataFrame', **kwargs) -> 'TransactionBatch':
+        """Rebuild a batch from a frame produced by to_frame()."""
+        columns = {column: frame[column].array for column in TEXT_COLUMNS}
+        columns['amount'] = frame['amount'].to_numpy(dtype=np.float64)
+        return cls(columns=columns, **kwargs)
+
+
+def _normalize_chunk(chunk: 'pd.DataFrame') -> Dict[str, Union['pd.Categorical', np.ndarray]]:
+    """Vectorized cleanup of one parsed chunk."""
+    import pandas as pd
+    columns = {}
+    for column in TEXT_COLUMNS:
+        if column in chunk:
+            columns[column] = pd.Categorical(chunk[column].str.strip())
+        else:
+            columns[column] = pd.Categorical.from_codes(np.zeros(len(chunk), dtype=np.int8), categories=[''])
+
+    if 'amount' in chunk:
+        # Accept "$1,250.00"-style amounts from POS exports
+        cleaned = chunk['amount'].str.replace(r'[$,\s]', '', regex=True)
+        columns['amount'] = pd.to_numeric(cleaned, errors='coerce').to_numpy(dtype=np.float64)
+    else:
+        columns['amount'] = np.full(len(chunk), np.nan)
+
+    return columns
+
+
+def read_transactions_csv(source: Union[str, BinaryIO], chunk_rows: int = DEFAULT_CHUNK_ROWS) -> TransactionBatch:
+    """Parse a transaction CSV in chunks into a TransactionBatch.
+
+    Only known transaction columns are read, all as strings, so pandas never
+    has to infer types. Missing amounts and amounts that do not parse become
+    0.0 and are counted in ``invalid_amounts``.
+    """
+    import pandas as pd
+    from pandas.api.types import union_categoricals
+
+    reader = pd.read_csv(
+        source,
+        usecols=lambda column: column in TRANSACTION_COLUMNS,
+        dtype={column: str for column in TRANSACTION_COLUMNS},
+        keep_default_na=False,
+        encoding='utf-8',
+        chunksize=chunk_rows
+    )
+
+    parts: Dict[str, List] = {column: [] for column in TRANSACTION_COLUMNS}
+    missing_columns: List[str] = []
+    rows_read = 0
+
+    for chunk in reader:
+        if rows_read == 0:
+            missing_columns = [column for column in TRANSACTION_COLUMNS if column not in chunk]
+        rows_read += len(chunk)
+        for column, values in _normalize_chunk(chunk).items():
+            parts[column].append(values)
+
+    columns = {column: union_categoricals(parts[column]) if parts[column] else pd.Categorical([])
+               for column in TEXT_COLUMNS}
+    columns['amount'] = np.concatenate(parts['amount']) if parts['amount'] else np.empty(0, dtype=np.float64)
+
+    invalid = np.isnan(columns['amount'])
+    invalid_amounts = int(invalid.sum())
+    columns['amount'][invalid] = 0.0
+    if invalid_amounts:
+        logger.warning(f"{invalid_amounts} rows had a missing or invalid amount")
+
+    return TransactionBatch(
+        columns=columns,
+        rows_read=rows_read,
+        invalid_amounts=invalid_amounts,
+        missing_columns=missing_columns
+    )
@@ -0,0 +1,183 @@
+import logging
+import os
+import pickle
+import sys
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from result_store import ResultStore
+
+# Job attributes holding columnar results, spilled as .npz files
+RESULT_FIELDS = ('results', 'candidates', 'provisional')
+# Job attributes holding the input transactions and their canonical records, spilled as one pickle
+PAYLOAD_FIELDS = ('reward_transactions', 'pos_transactions', 'reward_records', 'pos_records')
+# Items measured per payload list; the rest are assumed to be of the same average size
+PAYLOAD_SAMPLE = 64
+
+
+def _object_bytes(item) -> int:
+    """Approximate size of a transaction dict or canonical record, including its values."""
+    if isinstance(item, dict):
+        # Keys are shared by every row, so only values count
+        return sys.getsizeof(item) + sum(sys.getsizeof(value) for value in item.values())
+    slots = getattr(type(item), '__slots__', ())
+    return sys.getsizeof(item) + sum(sys.getsizeof(getattr(item, name, None)) for name in slots)
+
+
+def _payload_bytes(items: Optional[List]) -> int:
+    """Approximate size of a payload list, from a sample of its items."""
+    if not items:
+        return 0
+    step = max(len(items) // PAYLOAD_SAMPLE, 1)
+    sample = items[::step][:PAYLOAD_SAMPLE]
+    return sys.getsizeof(items) + sum(_object_bytes(item) for item in sample) * len(items) // len(sample)
+
+
+class JobHistory:
+    """Finished jobs by job_id, bounded by job count and by in-memory result bytes.
+
+    Jobs are kept in completion order. Past ``max_jobs`` the oldest jobs are
+    dropped entirely. Result bytes count a job's result stores plus its
+    transactions and canonical records; past ``max_result_bytes`` the oldest
+    jobs still in memory have both spilled to ``spill_dir`` and read back on
+    the next get().
+    """
+
+    def __init__(self, max_jobs: int = 1000, max_result_bytes: int = 512 * 1024 * 1024,
+                 spill_dir: str = 'data/job_spill'):
+        self.logger = logging.getLogger(__name__)
+        self.max_jobs = max_jobs
+        self.max_result_bytes = max_result_bytes
+        self.spill_dir = spill_dir
+        self._jobs: 'OrderedDict[str, Any]' = OrderedDict()
+        # job_id -> spill file prefix, for jobs whose results have been written to disk
+        self._spilled: Dict[str, str] = {}
+        # job_id -> result bytes, for jobs whose results are in memory
+        self._resident: 'OrderedDict[str, int]' = OrderedDict()
+        self.result_bytes = 0
+        self.evicted_jobs = 0
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    @staticmethod
+    def _result_bytes(job) -> int:
+        stores = sum(getattr(job, field).nbytes for field in RESULT_FIELDS if getattr(job, field) is not None)
+        return stores + sum(_payload_bytes(getattr(job, field)) for field in PAYLOAD_FIELDS)
+
+    def add(self, job):
+        """Record a finished job, then enforce the job and byte limits."""
+        if job.job_id in self._jobs:
+            self._discard(job.job_id)
+
+        self._jobs[job.job_id] = job
+        self._resident[job.job_id] = self._result_bytes(job)
+        self.result_bytes += self._resident[job.job_id]
+        self._enforce_limits()
+
+    def get(self, job_id: str, load_results: bool = True):
+        """A finished job, reading spilled results back into memory when load_results is set."""
+        job = self._jobs.get(job_id)
+        if job is not None and load_results and job_id not in self._resident:
+            try:
+                self._load(job)
+            except Exception as e:
+                self.logger.error(f"Could not read spilled results of job {job_id}: {e}")
+                self._discard(job_id)
+                return None
+            self._enforce_limits(keep=job_id)
+        return job
+
+    def recent(self, limit: int = 50) -> List:
+        """Most recently finished jobs first, without loading their results."""
+        jobs = []
+        for job_id in reversed(self._jobs):
+            if len(jobs) >= limit:
+                break
+            jobs.append(self._jobs[job_id])
+        return jobs
+
+    def _enforce_limits(self, keep: Optional[str] = None):
+        while len(self._jobs) > self.max_jobs:
+            job_id = next(iter(self._jobs))
+            self._discard(job_id)
+            self.evicted_jobs += 1
+
+        for job_id in list(self._resident):
+            if self.result_bytes <= self.max_result_bytes:
+                break
+            if job_id != keep:
+                self._spill(self._jobs[job_id])
+
+    def _spill(self, job):
+        """Move a job's result stores and transactions to disk and drop them from memory."""
+        prefix = self._spilled.get(job.job_id)
+        try:
+            if prefix is None:
+                # job_id is client-supplied, so spill files get their own names
+                os.makedirs(self.spill_dir, exist_ok=True)
+                prefix = os.path.join(self.spill_dir, uuid.uuid4().hex)
+                for field in RESULT_FIELDS:
+                    getattr(job, field).save(f"{prefix}.{field}.npz")
+                with open(f"{prefix}.payload.pkl", 'wb') as f:
+                    pickle.dump({field: getattr(job, field) for field in PAYLOAD_FIELDS}, f,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            self.logger.error(f"Could not spill results of job {job.job_id}: {e}")
+            self._remove_files(prefix)
+            return
+
+        for field in RESULT_FIELDS + PAYLOAD_FIELDS:
+            setattr(job, field, None)
+        self._spilled[job.job_id] = prefix
+        self.result_bytes -= self._resident.pop(job.job_id)
+
+    def _load(self, job):
+        """Read a spilled job's result stores and transactions back; the files stay so a later spill is free."""
+        prefix = self._spilled[job.job_id]
+        for field in RESULT_FIELDS:
+            setattr(job, field, ResultStore.load(f"{prefix}.{field}.npz"))
+        # Written by this process to its own spill directory
+        with open(f"{prefix}.payload.pkl", 'rb') as f:
+            for field, value in pickle.load(f).items():
+                setattr(job, field, value)
+        self._resident[job.job_id] = self._result_bytes(job)
+        self.result_bytes += self._resident[job.job_id]
+
+    def _discard(self, job_id: str):
+        """Forget a job and delete any spill files it has."""
+        self._jobs.pop(job_id)
+        self.result_bytes -= self._resident.pop(job_id, 0)
+        self._remove_files(self._spilled.pop(job_id, None))
+
+    def _remove_files(self, prefix: Optional[str]):
+        if prefix is None:
+            return
+        for path in [f"{prefix}.{field}.npz" for field in RESULT_FIELDS] + [f"{prefix}.payload.pkl"]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def clear_spill(self):
+        """Delete every spill file written by this history."""
+        for prefix in self._spilled.values():
+            self._remove_files(prefix)
+        self._spilled.clear()
+
+    def get_stats(self) -> Dict:
+        """Job counts and memory held by retained results and transactions."""
+        return {
+            'jobs': len(self._jobs),
+            'in_memory_jobs': len(self._resident),
+            'spilled_jobs': len(self._jobs) - len(self._resident),
+            'evicted_jobs': self.evicted_jobs,
+            'result_bytes': self.result_bytes,
+            'result_mb': self.result_bytes / (1024 * 1024),
+            'max_jobs': self.max_jobs,
+            'max_result_bytes': self.max_result_bytes
+        }
@@ -0,0 +1,494 @@
+import abc
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# reconciliation_jobs columns written by save_job (see database/init.sql)
+JOB_COLUMNS = (
+    'job_id', 'status', 'reward_transactions_count', 'pos_transactions_count', 'total_transactions',
+    'processed_transactions', 'matches_found', 'threshold', 'created_at', 'started_at', 'completed_at',
+    'error_message', 'performance_metrics'
+)
+# transactions columns filled from a job's input transactions
+TRANSACTION_FIELDS = (
+    'customer_name', 'customer_phone', 'customer_email', 'service', 'amount', 'date', 'provider',
+    'location', 'transaction_id'
+)
+TRANSACTION_COLUMNS = (
+    'id', 'job_id', 'transaction_type', 'customer_name', 'customer_phone', 'customer_email', 'service',
+    'amount', 'transaction_date', 'provider', 'location', 'transaction_id'
+)
+# reconciliation_results columns written by save_results
+RESULT_COLUMNS = (
+    'id', 'job_id', 'reward_transaction_id', 'pos_transaction_id', 'result', 'confidence', 'confidence_level',
+    'recommendation', 'component_scores', 'processing_time_ms', 'threshold_used'
+)
+
+# Job states that cannot survive a restart of the process running them
+UNFINISHED_STATUSES = ('pending', 'processing')
+
+# A result row as produced by the engine:
+# (reward_index, pos_index, result, confidence, confidence_level, recommendation,
+#  component_scores, processing_time_ms); -1 marks an absent side
+ResultRow = Tuple[int, int, str, float, str, str, Optional[Dict[str, float]], float]
+# A job's stored reward transactions, POS transactions and result rows indexing into them
+StoredResults = Tuple[List[Dict], List[Dict], List[ResultRow]]
+
+
+def _parse_date(value) -> Optional[date]:
+    """Transaction dates arrive as ISO strings; anything unparseable is stored as NULL."""
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+class JobStore(abc.ABC):
+    """Persistence for reconciliation jobs in the init.sql reconciliation tables.
+
+    Job rows are upserted on job_id, which is UNIQUE and therefore indexed,
+    so status lookups are a single index probe. Results are written in bulk
+    batches of ``copy_batch_rows`` together with the job's transactions,
+    which the result rows reference.
+    """
+
+    copy_batch_rows = 10_000
+
+    @abc.abstractmethod
+    async def connect(self):
+        """Open connections and make sure the schema exists."""
+
+    @abc.abstractmethod
+    async def close(self):
+        """Release connections."""
+
+    @abc.abstractmethod
+    async def save_job(self, job: Dict):
+        """Insert or update a job row; job holds JOB_COLUMNS values."""
+
+    @abc.abstractmethod
+    async def save_results(self, job_id: str, reward_transactions: List[Dict], pos_transactions: List[Dict],
+                           result_chunks: Iterable[List[ResultRow]], threshold: float) -> int:
+        """Replace a job's stored transactions and results; returns the number of result rows written."""
+
+    @abc.abstractmethod
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        """A job row by job_id, or None."""
+
+    @abc.abstractmethod
+    async def load_results(self, job_id: str) -> Optional[StoredResults]:
+        """A job's transactions and result rows as written by save_results, or None for an unknown job."""
+
+    @abc.abstractmethod
+    async def list_jobs(self, limit: int = 50) -> List[Dict]:
+        """Most recently created job rows."""
+
+    @abc.abstractmethod
+    async def mark_interrupted(self) -> int:
+        """Fail jobs left pending or processing by a previous process; returns how many."""
+
+    def _transaction_rows(self, job_uuid, transaction_type: str, transactions: List[Dict]) -> Tuple[List, List[Tuple]]:
+        """Fresh transaction ids plus rows in TRANSACTION_COLUMNS order."""
+        ids = [uuid.uuid4() for _ in transactions]
+        rows = [
+            (transaction_id, job_uuid, transaction_type,
+             *(self._transaction_value(field, txn.get(field)) for field in TRANSACTION_FIELDS))
+            for transaction_id, txn in zip(ids, transactions)
+        ]
+        return ids, rows
+
+    def _transaction_value(self, field: str, value):
+        if field == 'amount':
+            return float(value or 0.0)
+        if field == 'date':
+            return _parse_date(value)
+        return value
+
+    @staticmethod
+    def _stored_results(transactions: Iterable, results: Iterable) -> StoredResults:
+        """Transaction and result rows read back from the tables, with transaction ids mapped to indices.
+
+        Transactions keep their storage order, so indices refer to the
+        returned lists rather than to the job's original input order.
+        """
+        sides = {'reward': [], 'pos': []}
+        positions = {}
+        for row in transactions:
+            side = sides[row['transaction_type']]
+            positions[row['id']] = len(side)
+            txn = {field: row[column] for field, column in zip(TRANSACTION_FIELDS, TRANSACTION_COLUMNS[3:])}
+            txn['amount'] = float(txn['amount'])
+            txn['date'] = txn['date'].isoformat() if isinstance(txn['date'], date) else txn['date']
+            side.append(txn)
+
+        rows = []
+        for row in results:
+            components = row['component_scores']
+            rows.append((
+                positions[row['reward_transaction_id']] if row['reward_transaction_id'] is not None else -1,
+                positions[row['pos_transaction_id']] if row['pos_transaction_id'] is not None else -1,
+                row['result'], float(row['confidence']), row['confidence_level'], row['recommendation'],
+                json.loads(components) if isinstance(components, str) else components,
+                float(row['processing_time_ms'] or 0)
+            ))
+        return sides['reward'], sides['pos'], rows
+
+    @staticmethod
+    def _result_row(job_uuid, reward_ids: List, pos_ids: List, row: ResultRow, threshold: float) -> Tuple:
+        """A result row in RESULT_COLUMNS order, with indices mapped to transaction ids."""
+        reward_idx, pos_idx, result, confidence, level, recommendation, components, time_ms = row
+        return (
+            uuid.uuid4(), job_uuid,
+            reward_ids[reward_idx] if reward_idx >= 0 else None,
+            pos_ids[pos_idx] if pos_idx >= 0 else None,
+            result, confidence, level, recommendation,
+            json.dumps(components) if components is not None else None,
+            int(round(time_ms)), threshold
+        )
+
+
+class SQLiteJobStore(JobStore):
+    """Local stand-in for PostgresJobStore with the same tables, for tests and single-node use."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS reconciliation_jobs (
+            id TEXT PRIMARY KEY,
+            job_id TEXT UNIQUE NOT NULL,
+            user_id TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            reward_transactions_count INTEGER DEFAULT 0,
+            pos_transactions_count INTEGER DEFAULT 0,
+            total_transactions INTEGER DEFAULT 0,
+            processed_transactions INTEGER DEFAULT 0,
+            matches_found INTEGER DEFAULT 0,
+            threshold REAL DEFAULT 0.95,
+            created_at TEXT,
+            started_at TEXT,
+            completed_at TEXT,
+            error_message TEXT,
+            performance_metrics TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_reconciliation_jobs_status ON reconciliation_jobs(status);
+        CREATE INDEX IF NOT EXISTS idx_reconciliation_jobs_created_at ON reconciliation_jobs(created_at);
+        CREATE TABLE IF NOT EXISTS transactions (
+            id TEXT PRIMARY KEY,
+            job_id TEXT REFERENCES reconciliation_jobs(id),
+            transaction_type TEXT NOT NULL,
+            customer_name TEXT,
+            customer_phone TEXT,
+            customer_email TEXT,
+            service TEXT,
+            amount REAL NOT NULL,
+            transaction_date TEXT,
+            provider TEXT,
+            location TEXT,
+            transaction_id TEXT,
+            raw_data TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_transactions_job_id ON transactions(job_id);
+        CREATE TABLE IF NOT EXISTS reconciliation_results (
+            id TEXT PRIMARY KEY,
+            job_id TEXT REFERENCES reconciliation_jobs(id),
+            reward_transaction_id TEXT REFERENCES transactions(id),
+            pos_transaction_id TEXT REFERENCES transactions(id),
+            result TEXT NOT NULL,
+            confidence REAL NOT NULL,
+            confidence_level TEXT NOT NULL,
+            recommendation TEXT NOT NULL,
+            component_scores TEXT,
+            processing_time_ms INTEGER,
+            threshold_used REAL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_reconciliation_results_job_id ON reconciliation_results(job_id);
+    """
+
+    def __init__(self, path: str = 'data/jobs.sqlite3'):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    async def _run(self, function, *args):
+        """Run a blocking sqlite call off the event loop, one at a time."""
+        def locked():
+            with self._lock:
+                return function(*args)
+        return await asyncio.to_thread(locked)
+
+    async def connect(self):
+        def open_connection():
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.executescript(self.SCHEMA)
+            return connection
+
+        if self._connection is None:
+            self._connection = await self._run(open_connection)
+
+    async def close(self):
+        if self._connection is not None:
+            await self._run(self._connection.close)
+            self._connection = None
+
+    @staticmethod
+    def _to_sql(value):
+        if isinstance(value, uuid.UUID):
+            return value.hex
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, dict):
+            return json.dumps(value, default=str)
+        return value
+
+    def _job_from_row(self, row: sqlite3.Row) -> Dict:
+        job = {column: row[column] for column in JOB_COLUMNS}
+        for column in ('created_at', 'started_at', 'completed_at'):
+            job[column] = datetime.fromisoformat(job[column]) if job[column] else None
+        job['performance_metrics'] = json.loads(job['performance_metrics']) if job['performance_metrics'] else {}
+        return job
+
+    async def save_job(self, job: Dict):
+        values = [self._to_sql(job.get(column)) for column in JOB_COLUMNS]
+        updates = ', '.join(f'{column} = excluded.{column}' for column in JOB_COLUMNS[1:])
+
+        def upsert():
+            with self._connection:
+                self._connection.execute(
+                    f"INSERT INTO reconciliation_jobs (id, {', '.join(JOB_COLUMNS)}) "
+                    f"VALUES (?, {', '.join('?' * len(JOB_COLUMNS))}) "
+                    f"ON CONFLICT (job_id) DO UPDATE SET {updates}",
+                    [uuid.uuid4().hex, *values]
+                )
+
+        await self._run(upsert)
+
+    async def save_results(self, job_id: str, reward_transactions: List[Dict], pos_transactions: List[Dict],
+                           result_chunks: Iterable[List[ResultRow]], threshold: float) -> int:
+        def write() -> int:
+            with self._connection:
+                found = self._connection.execute(
+                    'SELECT id FROM reconciliation_jobs WHERE job_id = ?', (job_id,)
+                ).fetchone()
+                if found is None:
+                    raise KeyError(f"Job {job_id} has not been saved")
+                job_uuid = found['id']
+
+                self._connection.execute('DELETE FROM reconciliation_results WHERE job_id = ?', (job_uuid,))
+                self._connection.execute('DELETE FROM transactions WHERE job_id = ?', (job_uuid,))
+
+                transaction_sql = (f"INSERT INTO transactions ({', '.join(TRANSACTION_COLUMNS)}) "
+                                   f"VALUES ({', '.join('?' * len(TRANSACTION_COLUMNS))})")
+                side_ids = {}
+                for side, transactions in (('reward', reward_transactions), ('pos', pos_transactions)):
+                    ids, rows = self._transaction_rows(job_uuid, side, transactions)
+                    side_ids[side] = ids
+                    self._connection.executemany(transaction_sql, ([self._to_sql(v) for v in row] for row in rows))
+
+                result_sql = (f"INSERT INTO reconciliation_results ({', '.join(RESULT_COLUMNS)}) "
+                              f"VALUES ({', '.join('?' * len(RESULT_COLUMNS))})")
+                written = 0
+                for chunk in result_chunks:
+                    self._connection.executemany(result_sql, (
+                        [self._to_sql(v) for v in
+                         self._result_row(job_uuid, side_ids['reward'], side_ids['pos'], row, threshold)]
+                        for row in chunk
+                    ))
+                    written += len(chunk)
+                return written
+
+        return await self._run(write)
+
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        def fetch():
+            return self._connection.execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM reconciliation_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+
+        row = await self._run(fetch)
+        return self._job_from_row(row) if row else None
+
+    async def load_results(self, job_id: str) -> Optional[StoredResults]:
+        def fetch():
+            found = self._connection.execute(
+                'SELECT id FROM reconciliation_jobs WHERE job_id = ?', (job_id,)
+            ).fetchone()
+            if found is None:
+                return None
+            # rowid follows insertion order, so rows come back in the order save_results wrote them
+            transactions = self._connection.execute(
+                f"SELECT {', '.join(TRANSACTION_COLUMNS)} FROM transactions WHERE job_id = ? ORDER BY rowid",
+                (found['id'],)
+            ).fetchall()
+            results = self._connection.execute(
+                f"SELECT {', '.join(RESULT_COLUMNS)} FROM reconciliation_results WHERE job_id = ? ORDER BY rowid",
+                (found['id'],)
+            ).fetchall()
+            return self._stored_results(transactions, results)
+
+        return await self._run(fetch)
+
+    async def list_jobs(self, limit: int = 50) -> List[Dict]:
+        def fetch():
+            return self._connection.execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM reconciliation_jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+        return [self._job_from_row(row) for row in await self._run(fetch)]
+
+    async def mark_interrupted(self) -> int:
+        def update() -> int:
+            with self._connection:
+                return self._connection.execute(
+                    f"UPDATE reconciliation_jobs SET status = 'failed', error_message = ? "
+                    f"WHERE status IN ({', '.join('?' * len(UNFINISHED_STATUSES))})",
+                    ('Interrupted by a service restart', *UNFINISHED_STATUSES)
+                ).rowcount
+
+        return await self._run(update)
+
+
+class PostgresJobStore(JobStore):
+    """Job store on the Postgres schema from database/init.sql, through an asyncpg connection pool."""
+
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 10):
+        self.logger = logging.getLogger(__name__)
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pool = None
+
+    async def connect(self):
+        try:
+            import asyncpg
+        except ImportError as e:
+            raise RuntimeError("The Postgres job store requires the asyncpg package") from e
+
+        if self._pool is None:
+            self._pool = await asyncpg.create_pool(self.dsn, min_size=self.min_size, max_size=self.max_size)
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    @staticmethod
+    def _decimal(value: Optional[float], places: int) -> Optional[Decimal]:
+        return None if value is None else Decimal(f'{value:.{places}f}')
+
+    def _transaction_value(self, field: str, value):
+        if field == 'amount':
+            return self._decimal(float(value or 0.0), 2)
+        return super()._transaction_value(field, value)
+
+    def _job_from_record(self, record) -> Dict:
+        job = dict(record)
+        job['threshold'] = float(job['threshold']) if job['threshold'] is not None else None
+        job['performance_metrics'] = json.loads(job['performance_metrics']) if job['performance_metrics'] else {}
+        return job
+
+    async def save_job(self, job: Dict):
+        values = [job.get(column) for column in JOB_COLUMNS]
+        values[JOB_COLUMNS.index('threshold')] = self._decimal(job.get('threshold'), 2)
+        values[JOB_COLUMNS.index('performance_metrics')] = json.dumps(job.get('performance_metrics') or {}, default=str)
+        updates = ', '.join(f'{column} = EXCLUDED.{column}' for column in JOB_COLUMNS[1:])
+
+        async with self._pool.acquire() as connection:
+            await connection.execute(
+                f"INSERT INTO reconciliation_jobs ({', '.join(JOB_COLUMNS)}) "
+                f"VALUES ({', '.join(f'${i}' for i in range(1, len(JOB_COLUMNS) + 1))}) "
+                f"ON CONFLICT (job_id) DO UPDATE SET {updates}",
+                *values
+            )
+
+    async def save_results(self, job_id: str, reward_transactions: List[Dict], pos_transactions: List[Dict],
+                           result_chunks: Iterable[List[ResultRow]], threshold: float) -> int:
+        threshold_value = self._decimal(threshold, 2)
+        written = 0
+
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                job_uuid = await connection.fetchval('SELECT id FROM reconciliation_jobs WHERE job_id = $1', job_id)
+                if job_uuid is None:
+                    raise KeyError(f"Job {job_id} has not been saved")
+
+                await connection.execute('DELETE FROM reconciliation_results WHERE job_id = $1', job_uuid)
+                await connection.execute('DELETE FROM transactions WHERE job_id = $1', job_uuid)
+
+                side_ids = {}
+                for side, transactions in (('reward', reward_transactions), ('pos', pos_transactions)):
+                    ids, rows = self._transaction_rows(job_uuid, side, transactions)
+                    side_ids[side] = ids
+                    for start in range(0, len(rows), self.copy_batch_rows):
+                        await connection.copy_records_to_table(
+                            'transactions', records=rows[start:start + self.copy_batch_rows],
+                            columns=TRANSACTION_COLUMNS
+                        )
+
+                for chunk in result_chunks:
+                    records = []
+                    for row in chunk:
+                        record = list(self._result_row(job_uuid, side_ids['reward'], side_ids['pos'], row, threshold_value))
+                        record[RESULT_COLUMNS.index('confidence')] = self._decimal(record[RESULT_COLUMNS.index('confidence')], 4)
+                        records.append(record)
+                    await connection.copy_records_to_table('reconciliation_results', records=records,
+                                                           columns=RESULT_COLUMNS)
+                    written += len(records)
+
+        return written
+
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        async with self._pool.acquire() as connection:
+            record = await connection.fetchrow(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM reconciliation_jobs WHERE job_id = $1", job_id
+            )
+        return self._job_from_record(record) if record else None
+
+    async def load_results(self, job_id: str) -> Optional[StoredResults]:
+        async with self._pool.acquire() as connection:
+            job_uuid = await connection.fetchval('SELECT id FROM reconciliation_jobs WHERE job_id = $1', job_id)
+            if job_uuid is None:
+                return None
+            transactions = await connection.fetch(
+                f"SELECT {', '.join(TRANSACTION_COLUMNS)} FROM transactions WHERE job_id = $1", job_uuid
+            )
+            results = await connection.fetch(
+                f"SELECT {', '.join(RESULT_COLUMNS)} FROM reconciliation_results WHERE job_id = $1", job_uuid
+            )
+        return await asyncio.to_thread(self._stored_results, transactions, results)
+
+    async def list_jobs(self, limit: int = 50) -> List[Dict]:
+        async with self._pool.acquire() as connection:
+            records = await connection.fetch(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM reconciliation_jobs ORDER BY created_at DESC LIMIT $1", limit
+            )
+        return [self._job_from_record(record) for record in records]
+
+    async def mark_interrupted(self) -> int:
+        async with self._pool.acquire() as connection:
+            status = await connection.execute(
+                "UPDATE reconciliation_jobs SET status = 'failed', error_message = $1 WHERE status = ANY($2::varchar[])",
+                'Interrupted by a service restart', list(UNFINISHED_STATUSES)
+            )
+        return int(status.split()[-1])
+
+
+def create_job_store(url: Optional[str]) -> Optional[JobStore]:
+    """Job store for a postgresql:// DSN or a sqlite:///path URL; None when no URL is configured."""
+    if not url:
+        return None
+    if url.startswith(('postgresql://', 'postgres://')):
+        return PostgresJobStore(url)
+    if url.startswith('sqlite:///'):
+        return SQLiteJobStore(url[len('sqlite:///'):])
+    raise ValueError(f"Unsupported job store URL: {url}")
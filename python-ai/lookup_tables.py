@@ -0,0 +1,154 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+# Fields whose similarity is read from a table; provider only needs its codes compared
+TABLE_FIELDS = ('service', 'location')
+CODE_FIELDS = ('service', 'location', 'provider')
+
+ScoreFn = Callable[[List, List], np.ndarray]
+
+
+class LookupTable:
+    """Distinct values of one field, their integer codes and, optionally, a dense similarity matrix.
+
+    Values get codes in first-seen order and keep them for the table's
+    lifetime, so codes from earlier jobs stay valid. Interning new values
+    scores only the new rows and columns; the matrix is replaced rather
+    than mutated, so a snapshot taken by a running job never changes.
+    Past ``max_values`` the matrix is dropped and only codes are kept.
+    """
+
+    def __init__(self, score_fn: Optional[ScoreFn] = None, max_values: int = 512):
+        self.score_fn = score_fn
+        self.max_values = max_values
+        self.values: List = []
+        self.codes: Dict[Hashable, int] = {}
+        self.matrix: Optional[np.ndarray] = np.zeros((0, 0), dtype=np.float64) if score_fn else None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def intern(self, values: Sequence) -> np.ndarray:
+        """Integer code of every value, adding unseen values (and their similarities) to the table."""
+        with self._lock:
+            new_values = [value for value in dict.fromkeys(values) if value not in self.codes]
+            if new_values:
+                self._extend(new_values)
+            return np.fromiter((self.codes[value] for value in values), dtype=np.int32, count=len(values))
+
+    def _extend(self, new_values: List):
+        old_values = self.values
+        for value in new_values:
+            self.codes[value] = len(self.codes)
+        self.values = old_values + new_values
+
+        if self.matrix is None:
+            return
+        if len(self.values) > self.max_values:
+            logging.getLogger(__name__).info(
+                f"Lookup table past {self.max_values} values; similarities fall back to per-batch scoring"
+            )
+            self.matrix = None
+            return
+
+        count = len(old_values)
+        matrix = np.zeros((len(self.values), len(self.values)), dtype=np.float64)
+        matrix[:count, :count] = self.matrix
+        matrix[count:, :] = self.score_fn(new_values, self.values)
+        if count:
+            matrix[:count, count:] = self.score_fn(old_values, new_values)
+        self.matrix = matrix
+
+    def get_stats(self) -> Dict:
+        """Table size and memory."""
+        return {
+            'values': len(self.values),
+            'has_matrix': self.matrix is not None,
+            'matrix_kb': self.matrix.nbytes / 1024 if self.matrix is not None else 0.0
+        }
+
+
+class FieldLookupTables:
+    """The lookup tables of one practice: service and location with similarity matrices, provider codes only.
+
+    ``signature`` identifies the models the matrices were scored with
+    (service similarity depends on the spaCy vectors); the cache rebuilds
+    the tables when it changes.
+    """
+
+    def __init__(self, score_fns: Dict[str, ScoreFn], signature: Hashable = None, max_values: int = 512):
+        self.signature = signature
+        self.tables = {
+            field: LookupTable(score_fns.get(field) if field in TABLE_FIELDS else None, max_values)
+            for field in CODE_FIELDS
+        }
+
+    def intern(self, field: str, values: Sequence) -> np.ndarray:
+        """Codes of a field's values."""
+        return self.tables[field].intern(values)
+
+    def matrices(self) -> Dict[str, np.ndarray]:
+        """Current similarity matrix per field that still has one, indexed by the fields' codes."""
+        return {field: table.matrix for field, table in self.tables.items() if table.matrix is not None}
+
+    def get_stats(self) -> Dict:
+        """Per-field table stats."""
+        return {field: table.get_stats() for field, table in self.tables.items()}
+
+
+class LookupTableCache:
+    """Lookup tables per practice, kept across jobs in LRU order up to max_practices."""
+
+    def __init__(self, max_practices: int = 256, max_values: int = 512):
+        self.logger = logging.getLogger(__name__)
+        self.max_practices = max_practices
+        self.max_values = max_values
+        self._entries: "OrderedDict[str, FieldLookupTables]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, practice_id: Optional[str], score_fns: Dict[str, ScoreFn],
+            signature: Hashable = None) -> FieldLookupTables:
+        """The practice's tables, created on first use; without a practice_id, fresh tables for one job."""
+        if practice_id is None:
+            return FieldLookupTables(score_fns, signature, self.max_values)
+
+        with self._lock:
+            tables = self._entries.get(practice_id)
+            if tables is not None and tables.signature == signature:
+                self._entries.move_to_end(practice_id)
+                self.hits += 1
+                return tables
+
+            self.misses += 1
+            tables = FieldLookupTables(score_fns, signature, self.max_values)
+            self._entries[practice_id] = tables
+            self._entries.move_to_end(practice_id)
+            while len(self._entries) > self.max_practices:
+                self._entries.popitem(last=False)
+            return tables
+
+    def clear(self):
+        """Drop every practice's tables."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """Cached practices and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            'practices': len(self._entries),
+            'max_practices': self.max_practices,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups > 0 else 0.0
+        }
@@ -0,0 +1,143 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+try:
+    from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    # Metrics calls become no-ops and /metrics reports that the exporter is missing
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Stages run once per job (normalize, blocking, assignment) or once per batch
+# (feature_extraction, model_inference), so buckets span milliseconds to minutes
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+FEATURE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+if PROMETHEUS_AVAILABLE:
+    REGISTRY = CollectorRegistry()
+    STAGE_SECONDS = Histogram(
+        'reconciliation_stage_seconds', 'Time spent in each reconciliation stage', ['stage'],
+        buckets=STAGE_BUCKETS, registry=REGISTRY
+    )
+    FEATURE_SECONDS = Histogram(
+        'reconciliation_feature_seconds', 'Feature extraction time per scored batch, by feature group', ['component'],
+        buckets=FEATURE_BUCKETS, registry=REGISTRY
+    )
+    PAIRS_SCORED = Counter('reconciliation_pairs_scored', 'Candidate pairs scored', registry=REGISTRY)
+    JOBS_FINISHED = Counter('reconciliation_jobs_finished', 'Finished jobs by final status', ['status'],
+                            registry=REGISTRY)
+
+
+def observe_stage(stage: str, seconds: float):
+    """Record one run of a stage."""
+    if PROMETHEUS_AVAILABLE:
+        STAGE_SECONDS.labels(stage).observe(seconds)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Time the enclosed block as one run of a stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def observe_batch(timings: Dict[str, float], pairs: int):
+    """Record a scored batch from the 'timings' its scorer returned."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+
+    feature_seconds = 0.0
+    for component, seconds in timings.items():
+        if component == 'model_inference':
+            STAGE_SECONDS.labels('model_inference').observe(seconds)
+        else:
+            FEATURE_SECONDS.labels(component).observe(seconds)
+            feature_seconds += seconds
+    STAGE_SECONDS.labels('feature_extraction').observe(feature_seconds)
+    PAIRS_SCORED.inc(pairs)
+
+
+def job_finished(status: str):
+    """Count a job reaching a final status."""
+    if PROMETHEUS_AVAILABLE:
+        JOBS_FINISHED.labels(status).inc()
+
+
+class _RuntimeCollector:
+    """Gauges read from the engine and request executor at scrape time, so nothing is updated on hot paths."""
+
+    def __init__(self):
+        self.engine = None
+        self.request_executor = None
+
+    def collect(self):
+        engine = self.engine
+        if engine is None:
+            return
+
+        statuses: Dict[str, int] = {}
+        for job in list(engine.active_jobs.values()):
+            statuses[job.status.value] = statuses.get(job.status.value, 0) + 1
+
+        jobs = GaugeMetricFamily('reconciliation_active_jobs', 'Jobs not yet finished, by status', labels=['status'])
+        for status in ('pending', 'processing'):
+            jobs.add_metric([status], statuses.get(status, 0))
+        yield jobs
+
+        yield GaugeMetricFamily('reconciliation_batches_in_flight', 'Scoring batches queued or running',
+                                value=engine.in_flight_batches)
+        yield GaugeMetricFamily('reconciliation_last_job_pairs_per_second',
+                                'Scoring throughput of the most recently completed job',
+                                value=engine.last_job_pairs_per_second)
+
+        # Thread backends get a pool per processing job; the process backend shares one
+        pools = statuses.get('processing', 0) if engine.backend == 'thread' else 1
+        capacity = engine.max_workers * pools
+        utilization = GaugeMetricFamily('reconciliation_worker_utilization', 'Busy share of scoring workers',
+                                        labels=['pool'])
+        utilization.add_metric(['jobs'], min(engine.in_flight_batches, capacity) / capacity if capacity else 0.0)
+        if self.request_executor is not None:
+            stats = self.request_executor.get_stats()
+            utilization.add_metric(['requests'], stats['busy_workers'] / stats['max_workers'])
+        yield utilization
+
+        hits = CounterMetricFamily('reconciliation_cache_hits', 'Embedding cache hits', labels=['cache'])
+        misses = CounterMetricFamily('reconciliation_cache_misses', 'Embedding cache misses', labels=['cache'])
+        hit_rate = GaugeMetricFamily('reconciliation_cache_hit_rate', 'Embedding cache hit rate', labels=['cache'])
+        scorer = engine.confidence_scorer
+        for name, cache in (('names', scorer.name_embeddings), ('services', scorer.service_vectors)):
+            stats = cache.get_stats()
+            hits.add_metric([name], stats['hits'])
+            misses.add_metric([name], stats['misses'])
+            hit_rate.add_metric([name], stats['hit_rate'])
+        yield hits
+        yield misses
+        yield hit_rate
+
+
+_runtime_collector: Optional[_RuntimeCollector] = None
+
+
+def bind(engine, request_executor=None):
+    """Export gauges for an engine (and optionally the request executor); rebinding replaces them."""
+    global _runtime_collector
+    if not PROMETHEUS_AVAILABLE:
+        return
+    if _runtime_collector is None:
+        _runtime_collector = _RuntimeCollector()
+        REGISTRY.register(_runtime_collector)
+    _runtime_collector.engine = engine
+    _runtime_collector.request_executor = request_executor
+
+
+def render() -> Tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, with their content type."""
+    if not PROMETHEUS_AVAILABLE:
+        return b'# prometheus_client is not installed; no metrics are exported\n', CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
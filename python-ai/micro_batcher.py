@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from request_executor import RequestExecutor
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-item requests into batched calls.
+
+    Items submitted within ``max_wait_ms`` of the first queued item, up to
+    ``max_batch_size`` of them, are handed to ``batch_fn`` as one list on the
+    request executor; batch_fn returns one result per item, in order. Each
+    item holds one of the endpoint's executor slots until its batch ends, so
+    the endpoint's limit still counts requests rather than batches.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], executor: RequestExecutor, endpoint: str,
+                 max_batch_size: int = 64, max_wait_ms: float = 3.0):
+        self.logger = logging.getLogger(__name__)
+        self.batch_fn = batch_fn
+        self.executor = executor
+        self.endpoint = endpoint
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {'batches': 0, 'items': 0, 'max_batch_size_seen': 0}
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item for the next batch and wait for its result; raises ExecutorBusy when full."""
+        self.executor.admit(self.endpoint)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000.0, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Send everything queued so far as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        self.stats['batches'] += 1
+        self.stats['items'] += len(batch)
+        self.stats['max_batch_size_seen'] = max(self.stats['max_batch_size_seen'], len(batch))
+
+        try:
+            scoring = self.executor.submit(self.batch_fn, [item for item, _ in batch])
+        except Exception as e:
+            self._deliver(batch, None, error=e)
+            return
+        scoring.add_done_callback(partial(self._deliver, batch))
+
+    def _deliver(self, batch: List[Tuple[Any, asyncio.Future]], scoring: Optional[asyncio.Future],
+                 error: Optional[BaseException] = None):
+        """Release the batch's slots and fan results (or the batch's error) out to the waiting requests."""
+        for _ in batch:
+            self.executor.release(self.endpoint)
+
+        results = None
+        if error is None:
+            if scoring.cancelled():
+                error = asyncio.CancelledError()
+            else:
+                error = scoring.exception()
+                results = None if error else scoring.result()
+        if error is None and len(results) != len(batch):
+            error = RuntimeError(f"Batch returned {len(results)} results for {len(batch)} items")
+        if error is not None:
+            self.logger.error(f"Micro-batch of {len(batch)} items failed: {error}")
+
+        for position, (_, future) in enumerate(batch):
+            if future.done():
+                # The request was abandoned while its batch ran
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[position])
+
+    def get_stats(self) -> Dict:
+        """Batch counts and the average number of items per batch."""
+        return {
+            **self.stats,
+            'avg_batch_size': self.stats['items'] / self.stats['batches'] if self.stats['batches'] else 0,
+            'queued': len(self._pending),
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms
+        }
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Offline model bundle: NLP models saved to a local directory with a checksum manifest.
+
+Build one where the network is available (e.g. during the image build):
+
+    python model_bundle.py build /app/model_bundle
+
+and point MODEL_BUNDLE_DIR at it so the API loads models without downloading anything.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+MANIFEST_NAME = 'manifest.json'
+DEFAULT_MODELS = {
+    'spacy': 'en_core_web_sm',
+    'sentence_transformer': 'all-MiniLM-L6-v2'
+}
+
+
+class ModelBundleError(Exception):
+    """Raised when a bundle's manifest is missing or its files do not match their checksums."""
+
+
+def _sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelBundle:
+    """A directory of saved models plus a manifest mapping each file to its SHA-256.
+
+    The manifest's ``models`` entry maps a model kind ('spacy',
+    'sentence_transformer') to its subdirectory; ``files`` maps every file
+    path, relative to the bundle, to its checksum.
+    """
+
+    def __init__(self, path: str):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.manifest: Optional[Dict] = None
+
+    def verify(self) -> Dict:
+        """Check every file listed in the manifest; raises ModelBundleError on any mismatch."""
+        manifest_path = os.path.join(self.path, MANIFEST_NAME)
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ModelBundleError(f"Cannot read bundle manifest {manifest_path}: {e}")
+
+        for relative_path, expected in manifest.get('files', {}).items():
+            path = os.path.join(self.path, relative_path)
+            if not os.path.isfile(path):
+                raise ModelBundleError(f"Bundle file missing: {relative_path}")
+            if _sha256(path) != expected:
+                raise ModelBundleError(f"Checksum mismatch for bundle file {relative_path}")
+
+        self.manifest = manifest
+        self.logger.info(f"Verified model bundle {self.path} ({len(manifest.get('files', {}))} files)")
+        return manifest
+
+    def model_path(self, kind: str) -> Optional[str]:
+        """Directory of a verified model kind, or None if the bundle does not include it."""
+        if self.manifest is None:
+            raise ModelBundleError("Bundle has not been verified")
+        relative_path = self.manifest.get('models', {}).get(kind)
+        return os.path.join(self.path, relative_path) if relative_path else None
+
+    @staticmethod
+    def write_manifest(path: str, models: Dict[str, str]) -> Dict:
+        """Checksum every file under path and write the manifest for the given model subdirectories."""
+        files = {}
+        for root, _, names in os.walk(path):
+            for name in names:
+                full_path = os.path.join(root, name)
+                relative_path = os.path.relpath(full_path, path)
+                if relative_path != MANIFEST_NAME:
+                    files[relative_path.replace(os.sep, '/')] = _sha256(full_path)
+
+        manifest = {'models': models, 'files': dict(sorted(files.items()))}
+        with open(os.path.join(path, MANIFEST_NAME), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+def build_bundle(path: str, spacy_model: str = DEFAULT_MODELS['spacy'],
+                 sentence_model: str = DEFAULT_MODELS['sentence_transformer']) -> Dict:
+    """Save the named models under path and write their manifest; needs the models or network access."""
+    import spacy
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(path, exist_ok=True)
+    spacy.load(spacy_model).to_disk(os.path.join(path, 'spacy'))
+    SentenceTransformer(sentence_model).save(os.path.join(path, 'sentence_transformer'))
+    return ModelBundle.write_manifest(path, {'spacy': 'spacy', 'sentence_transformer': 'sentence_transformer'})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='save models into a bundle directory')
+    build.add_argument('path')
+    build.add_argument('--spacy-model', default=DEFAULT_MODELS['spacy'])
+    build.add_argument('--sentence-model', default=DEFAULT_MODELS['sentence_transformer'])
+    verify = commands.add_parser('verify', help='check a bundle against its manifest')
+    verify.add_argument('path')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == 'build':
+        manifest = build_bundle(args.path, args.spacy_model, args.sentence_model)
+        print(f"Wrote {len(manifest['files'])} files to {args.path}")
+    else:
+        ModelBundle(args.path).verify()
+        print(f"{args.path}: OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,35 @@
 import logging
 import asyncio
+import copy
 import time
 import json
 import os
+import random
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
-import pandas as pd
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Any
 import numpy as np
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import contextmanager
 import psutil
 from dataclasses import dataclass
 from enum import Enum
 
-from confidence_scorer import AdvancedConfidenceScorer
+from confidence_scorer import AdvancedConfidenceScorer, CanonicalTransaction
+from candidate_blocking import CandidateBlocker, BlockingResult
+from scoring_backend import init_scoring_worker, pack_batch, score_batch, score_packed_batch
+from assignment import ASSIGNMENT_MODES, AssignmentResult, OneToOneAssigner
+from candidate_retention import TopKCandidates
+from result_store import (ResultStore, RESULT_CODES, UNMATCHED_SIDES, ERROR, NO_MATCH, PAIRED,
+                          UNMATCHED_REWARD, UNMATCHED_POS, result_codes)
+from result_export import EXPORT_FORMATS, iter_arrow_format, iter_csv, iter_json, require_pyarrow
+from job_store import JobStore, ResultRow
+from job_history import JobHistory
+from health_sampler import SystemHealthSampler
+from lookup_tables import LookupTableCache
+import metrics
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 class MatchStatus(Enum):
     PENDING = "pending"
@@ -38,27 +55,86 @@ class ReconciliationJob:
     processed_transactions: int = 0
     matches_found: int = 0
     errors: List[str] = None
-    results: List[Dict] = None
+    results: ResultStore = None
+    candidates: ResultStore = None
+    provisional: ResultStore = None
     performance_metrics: Dict = None
+    assignment_mode: str = 'one_to_one'
+    threshold: float = 0.95
+    reward_transactions: List[Dict] = None
+    pos_transactions: List[Dict] = None
+    # Canonical records kept so incremental jobs only normalize new rows
+    reward_records: List[CanonicalTransaction] = None
+    pos_records: List[CanonicalTransaction] = None
+    base_job_id: Optional[str] = None
+    # Jobs of the same practice share service/location/provider lookup tables
+    practice_id: Optional[str] = None
     
     def __post_init__(self):
         if self.errors is None:
             self.errors = []
         if self.results is None:
-            self.results = []
+            self.results = ResultStore()
+        if self.candidates is None:
+            self.candidates = ResultStore()
+        if self.provisional is None:
+            self.provisional = ResultStore()
+        if self.reward_transactions is None:
+            self.reward_transactions = []
+        if self.pos_transactions is None:
+            self.pos_transactions = []
         if self.performance_metrics is None:
             self.performance_metrics = {}
 
 class ReconciliationEngine:
     """Advanced ML-powered reconciliation engine for transaction matching."""
 
-    def __init__(self, max_workers: int = 4, batch_size: int = 100):
+    BACKENDS = ('thread', 'process')
+
+    def __init__(self, max_workers: int = 4, batch_size: int = 100, use_blocking: bool = True,
+                 recall_sample_size: int = 200, backend: str = 'thread', assignment_mode: str = 'one_to_one',
+                 top_k_per_reward: Optional[int] = 5, top_k_per_pos: Optional[int] = None,
+                 job_store: Optional[JobStore] = None, max_history_jobs: int = 1000,
+                 max_history_result_bytes: int = 512 * 1024 * 1024, spill_dir: str = 'data/job_spill',
+                 max_in_flight_batches: Optional[int] = None, load_models: bool = True,
+                 model_bundle_dir: Optional[str] = None, health_interval_seconds: float = 5.0,
+                 health_history_size: int = 120, max_lookup_practices: int = 256):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unsupported scoring backend: {backend}")
+        if assignment_mode not in ASSIGNMENT_MODES:
+            raise ValueError(f"Unsupported assignment mode: {assignment_mode}")
+        
         self.logger = logging.getLogger(__name__)
-        self.confidence_scorer = AdvancedConfidenceScorer()
+        # With load_models=False the models are loaded later by warm_up(), off the event loop
+        self.model_bundle_dir = model_bundle_dir
+        self.confidence_scorer = AdvancedConfidenceScorer(load_models=load_models, model_bundle_dir=model_bundle_dir)
+        self.model_state = 'ready' if load_models else 'not_loaded'
+        self.model_load_error: Optional[str] = None
         self.max_workers = max_workers
         self.batch_size = batch_size
+        self.backend = backend
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self.use_blocking = use_blocking
+        self.recall_sample_size = recall_sample_size
+        self.blocker = CandidateBlocker()
+        self.assignment_mode = assignment_mode
+        self.assigner = OneToOneAssigner()
+        self.top_k_per_reward = top_k_per_reward
+        self.top_k_per_pos = top_k_per_pos
+        # Batches queued or running per job; bounds memory and how long a cancelled job keeps scoring
+        self.max_in_flight_batches = max_in_flight_batches or 2 * max_workers
+        # Read by the /metrics collector at scrape time
+        self.in_flight_batches = 0
+        self.last_job_pairs_per_second = 0.0
         self.active_jobs: Dict[str, ReconciliationJob] = {}
-        self.job_history: List[ReconciliationJob] = []
+        # Finished jobs by job_id, in completion order, with results spilled past the byte budget
+        self.job_history = JobHistory(max_history_jobs, max_history_result_bytes, spill_dir)
+        # Optional persistence for job status and results across restarts
+        self.job_store = job_store
+        # Resource and model status sampled in the background; started on first use or by the API at startup
+        self.health_sampler = SystemHealthSampler(self._model_status, health_interval_seconds, health_history_size)
+        # Service/location similarity tables per practice, grown and reused across its jobs
+        self.lookup_tables = LookupTableCache(max_practices=max_lookup_practices)
         self.performance_stats = {
             'total_jobs': 0,
             'successful_jobs': 0,
@@ -87,6 +163,30 @@ class ReconciliationEngine:
         except Exception as e:
             self.logger.error(f"Could not save performance stats: {e}")
 
+    async def warm_up(self) -> bool:
+        """Load the scoring models in a worker thread; returns whether the engine is now ready."""
+        self.model_state = 'loading'
+        start_time = time.time()
+        try:
+            await asyncio.to_thread(self.confidence_scorer.load_models, self.model_bundle_dir)
+        except Exception as e:
+            self.logger.error(f"Model warm-up failed: {e}")
+            self.model_state = 'failed'
+            self.model_load_error = str(e)
+            return False
+        
+        self.model_state = 'ready'
+        self.model_load_error = None
+        self.logger.info(f"Models loaded in {time.time() - start_time:.1f}s")
+        if self.health_sampler.latest() is not None:
+            # Refresh the sampled model status rather than waiting for the next interval
+            self.health_sampler.sample()
+        return True
+
+    def is_ready(self) -> bool:
+        """Whether the scoring models have finished loading."""
+        return self.model_state == 'ready'
+
     def is_model_loaded(self) -> bool:
         """Check if ML models are loaded and ready."""
         try:
@@ -96,37 +196,43 @@ class ReconciliationEngine:
             self.logger.error(f"Model check failed: {e}")
             return False
 
-    def get_system_health(self) -> Dict:
-        """Get comprehensive system health information."""
+    def _model_status(self) -> Dict:
+        """Model status for the health sampler."""
+        model_info = self.confidence_scorer.get_model_info()
+        return {
+            'is_loaded': self.is_model_loaded(),
+            'model_info': model_info,
+            'is_trained': model_info.get('is_trained', False)
+        }
+
+    def get_system_health(self, history: int = 0) -> Dict:
+        """Get comprehensive system health information from the latest background sample.
+
+        With history > 0 the response also carries up to that many recent
+        system metric samples, oldest first.
+        """
         try:
-            # CPU and memory usage
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            
-            # Disk usage
-            disk = psutil.disk_usage('/')
-            
-            # Model status
-            model_info = self.confidence_scorer.get_model_info()
+            snapshot = self.health_sampler.latest() or self.health_sampler.start()
+            system_metrics = snapshot['system_metrics']
             
-            return {
-                'status': 'healthy' if cpu_percent < 90 and memory.percent < 90 else 'warning',
-                'timestamp': datetime.now().isoformat(),
-                'system_metrics': {
-                    'cpu_percent': cpu_percent,
-                    'memory_percent': memory.percent,
-                    'memory_available_gb': memory.available / (1024**3),
-                    'disk_percent': disk.percent,
-                    'disk_free_gb': disk.free / (1024**3)
-                },
+            health = {
+                'status': 'healthy' if system_metrics['cpu_percent'] < 90 and system_metrics['memory_percent'] < 90 else 'warning',
+                'timestamp': snapshot['timestamp'],
+                'sample_age_seconds': time.monotonic() - snapshot['sampled_at'],
+                'system_metrics': system_metrics,
                 'model_status': {
-                    'is_loaded': self.is_model_loaded(),
-                    'model_info': model_info,
-                    'is_trained': model_info.get('is_trained', False)
+                    # Warm-up state is read live; the rest comes from the sample
+                    'state': self.model_state,
+                    'load_error': self.model_load_error,
+                    **snapshot['model_status']
                 },
                 'performance_stats': self.performance_stats,
-                'active_jobs': len(self.active_jobs)
+                'active_jobs': len(self.active_jobs),
+                'job_history': self.job_history.get_stats()
             }
+            if history > 0:
+                health['history'] = self.health_sampler.series(history)
+            return health
         except Exception as e:
             self.logger.error(f"Health check failed: {e}")
             return {
@@ -144,12 +250,7 @@ class ReconciliationEngine:
             confidence_result = self.confidence_scorer.calculate_comprehensive_confidence(reward_txn, pos_txn)
             
             # Determine match result
-            if confidence_result['overall_confidence'] >= threshold:
-                result = ReconciliationResult.MATCH
-            elif confidence_result['overall_confidence'] >= 0.7:
-                result = ReconciliationResult.REVIEW_REQUIRED
-            else:
-                result = ReconciliationResult.NO_MATCH
+            result = self._classify_confidence(confidence_result['overall_confidence'], threshold)
             
             processing_time = (time.time() - start_time) * 1000
             
@@ -175,111 +276,612 @@ class ReconciliationEngine:
                 'pos_transaction': pos_txn
             }
 
-    def _create_transaction_pairs(self, reward_transactions: List[Dict], pos_transactions: List[Dict]) -> List[Tuple[Dict, Dict]]:
-        """Create potential transaction pairs for matching."""
-        pairs = []
+    def predict_pairs(self, requests: List[Tuple[Dict, Dict, float]]) -> List[Dict]:
+        """Predict independent (reward_txn, pos_txn, threshold) requests with one feature pass and one model call.
+
+        Results have the predict_match format; processing time is the batch
+        time shared across its pairs. If the batch fails, each request is
+        retried on its own so only the requests that fail alone get an error result.
+        """
+        start_time = time.time()
+        reward_txns = [reward_txn for reward_txn, _, _ in requests]
+        pos_txns = [pos_txn for _, pos_txn, _ in requests]
         
-        # Simple cartesian product for now
-        # In production, this could be optimized with pre-filtering
-        for reward_txn in reward_transactions:
-            for pos_txn in pos_transactions:
-                pairs.append((reward_txn, pos_txn))
+        try:
+            reward_df = self.confidence_scorer.canonical_frame(self.confidence_scorer.canonicalize_many(reward_txns))
+            pos_df = self.confidence_scorer.canonical_frame(self.confidence_scorer.canonicalize_many(pos_txns))
+            pair_index = np.repeat(np.arange(len(requests)), 2).reshape(-1, 2)
+            scored = score_batch(self.confidence_scorer, reward_df, pos_df, pair_index)
+        except Exception as e:
+            if len(requests) > 1:
+                # One bad pair must not fail the requests it was batched with
+                self.logger.warning(f"Batched prediction of {len(requests)} pairs failed, retrying one by one: {e}")
+                return [result for request in requests for result in self.predict_pairs([request])]
+            
+            self.logger.error(f"Prediction failed: {e}")
+            return [{
+                'result': ReconciliationResult.ERROR.value,
+                'error': str(e),
+                'processing_time_ms': (time.time() - start_time) * 1000,
+                'reward_transaction': reward_txns[0],
+                'pos_transaction': pos_txns[0]
+            }]
         
-        return pairs
+        components = self.confidence_scorer.component_matrix(scored['features'])
+        component_names = self.confidence_scorer.COMPONENT_NAMES
+        processing_time = np.broadcast_to(scored['processing_time_ms'], len(requests))
+        return [
+            self._result_dict(float(confidence), dict(zip(component_names, row.tolist())), float(pair_time),
+                              reward_txn, pos_txn, threshold)
+            for (reward_txn, pos_txn, threshold), confidence, row, pair_time in zip(
+                requests, scored['confidence'], components, processing_time
+            )
+        ]
 
-    def _process_batch(self, batch: List[Tuple[Dict, Dict]], threshold: float) -> List[Dict]:
-        """Process a batch of transaction pairs."""
-        results = []
+    def _classify_confidence(self, confidence: float, threshold: float) -> ReconciliationResult:
+        """Map a confidence score to a reconciliation result."""
+        if confidence >= threshold:
+            return ReconciliationResult.MATCH
+        elif confidence >= 0.7:
+            return ReconciliationResult.REVIEW_REQUIRED
+        return ReconciliationResult.NO_MATCH
+
+    def predict_batch(self, reward_transactions: List[Dict], pos_transactions: List[Dict], pair_index: np.ndarray,
+                      threshold: float = 0.95, reward_df: Optional['pd.DataFrame'] = None,
+                      pos_df: Optional['pd.DataFrame'] = None) -> List[Dict]:
+        """Predict matches for many (reward_index, pos_index) pairs in one vectorized pass."""
+        if reward_df is None:
+            reward_df = self.confidence_scorer.canonical_frame(self.confidence_scorer.canonicalize_many(reward_transactions))
+        if pos_df is None:
+            pos_df = self.confidence_scorer.canonical_frame(self.confidence_scorer.canonicalize_many(pos_transactions))
         
-        for reward_txn, pos_txn in batch:
-            try:
-                result = self.predict_match(reward_txn, pos_txn, threshold)
-                results.append(result)
-            except Exception as e:
-                self.logger.error(f"Batch processing error: {e}")
+        scored = score_batch(self.confidence_scorer, reward_df, pos_df, pair_index)
+        return self._build_results(pair_index, scored, reward_transactions, pos_transactions, threshold)
+
+    def _build_results(self, pair_index: np.ndarray, scored: Dict[str, np.ndarray], reward_transactions: List[Dict],
+                       pos_transactions: List[Dict], threshold: float) -> List[Dict]:
+        """Turn scored batch arrays into result dictionaries."""
+        processing_time = np.broadcast_to(scored['processing_time_ms'], len(pair_index))
+        return [
+            self._result_dict(float(confidence), self.confidence_scorer.component_scores(features), float(pair_time),
+                              reward_transactions[reward_idx], pos_transactions[pos_idx], threshold)
+            for (reward_idx, pos_idx), confidence, features, pair_time in zip(
+                pair_index, scored['confidence'], scored['features'], processing_time
+            )
+        ]
+
+    def _result_dict(self, confidence: float, component_scores: Dict[str, float], processing_time_ms: float,
+                     reward_txn: Dict, pos_txn: Dict, threshold: float) -> Dict:
+        """Result dictionary for one scored pair."""
+        return {
+            'result': self._classify_confidence(confidence, threshold).value,
+            'confidence': confidence,
+            'confidence_level': self.confidence_scorer._get_confidence_level(confidence),
+            'recommendation': self.confidence_scorer._get_recommendation(confidence),
+            'component_scores': component_scores,
+            'processing_time_ms': processing_time_ms,
+            'reward_transaction': reward_txn,
+            'pos_transaction': pos_txn,
+            'threshold_used': threshold
+        }
+
+    def _store_to_dicts(self, job: ReconciliationJob, store: ResultStore, start: int = 0,
+                        stop: Optional[int] = None) -> List[Dict]:
+        """Turn rows of a columnar result store into API result dictionaries."""
+        component_names = self.confidence_scorer.COMPONENT_NAMES
+        results = []
+        for row, reward_idx, pos_idx, confidence, result, unmatched, pair_time, components in store.rows(start, stop):
+            if result == ReconciliationResult.ERROR.value:
                 results.append({
-                    'result': ReconciliationResult.ERROR.value,
-                    'error': str(e),
-                    'reward_transaction': reward_txn,
-                    'pos_transaction': pos_txn
+                    'result': result,
+                    'error': store.error_message(row),
+                    'reward_transaction': job.reward_transactions[reward_idx],
+                    'pos_transaction': job.pos_transactions[pos_idx]
                 })
+            elif unmatched:
+                transactions = job.reward_transactions if unmatched == 'reward' else job.pos_transactions
+                results.append({
+                    'result': result,
+                    'unmatched': unmatched,
+                    'confidence': confidence,
+                    f'{unmatched}_transaction': transactions[reward_idx if unmatched == 'reward' else pos_idx],
+                    'threshold_used': job.threshold
+                })
+            else:
+                results.append(self._result_dict(
+                    confidence, dict(zip(component_names, components.tolist())), pair_time,
+                    job.reward_transactions[reward_idx], job.pos_transactions[pos_idx], job.threshold
+                ))
+        
+        return results
+
+    def _provisional_to_dicts(self, job: ReconciliationJob, start: int = 0, stop: Optional[int] = None) -> List[Dict]:
+        """Compact dictionaries for provisional candidates streamed while a job runs."""
+        return [
+            {
+                'result': result,
+                'confidence': confidence,
+                'reward_index': reward_idx,
+                'pos_index': pos_idx,
+                'reward_transaction_id': job.reward_transactions[reward_idx].get('transaction_id'),
+                'pos_transaction_id': job.pos_transactions[pos_idx].get('transaction_id')
+            }
+            for _, reward_idx, pos_idx, confidence, result, _, _, _ in job.provisional.rows(start, stop)
+        ]
+
+    def _record_provisional(self, job: ReconciliationJob, pair_index: np.ndarray, scored: Dict[str, np.ndarray]):
+        """Append a batch's match/review candidates to the job's provisional store."""
+        confidence = np.asarray(scored['confidence'])
+        hits = np.flatnonzero(confidence >= 0.7)
+        job.provisional.append(pair_index[hits, 0], pair_index[hits, 1], confidence[hits],
+                               result_codes(confidence[hits], job.threshold))
+
+    def _assignment_results(self, assignment: AssignmentResult, candidates: ResultStore,
+                            num_rewards: int, num_pos: int) -> ResultStore:
+        """Assigned pairs followed by one no-match row per unassigned reward and POS transaction."""
+        reward_index = candidates.column('reward_index')
+        pos_index = candidates.column('pos_index')
+        confidence = candidates.column('confidence')
         
+        # Best candidate confidence seen by each transaction, for reviewing leftovers
+        best_reward = np.zeros(num_rewards, dtype=np.float32)
+        best_pos = np.zeros(num_pos, dtype=np.float32)
+        np.maximum.at(best_reward, reward_index, confidence)
+        np.maximum.at(best_pos, pos_index, confidence)
+
+        selected = assignment.selected
+        results = ResultStore(candidates.num_components,
+                              capacity=len(selected) + len(assignment.unmatched_rewards) + len(assignment.unmatched_pos))
+        results.append(reward_index[selected], pos_index[selected], confidence[selected],
+                       candidates.column('result')[selected], candidates.column('components')[selected],
+                       candidates.column('processing_time_ms')[selected])
+        results.append(assignment.unmatched_rewards, -1, best_reward[assignment.unmatched_rewards], NO_MATCH,
+                       unmatched=UNMATCHED_REWARD)
+        results.append(-1, assignment.unmatched_pos, best_pos[assignment.unmatched_pos], NO_MATCH,
+                       unmatched=UNMATCHED_POS)
+
         return results
 
+    def _create_transaction_pairs(self, reward_records: List[CanonicalTransaction],
+                                  pos_records: List[CanonicalTransaction]) -> BlockingResult:
+        """Create candidate (reward_index, pos_index) pairs for matching."""
+        if self.use_blocking:
+            blocking = self.blocker.generate_candidates(reward_records, pos_records)
+        else:
+            # Full cartesian product
+            pair_index = np.array(
+                [(i, j) for i in range(len(reward_records)) for j in range(len(pos_records))],
+                dtype=np.int64
+            ).reshape(-1, 2)
+            blocking = BlockingResult(pair_index=pair_index, full_product_pairs=len(pair_index))
+
+        return blocking
+
+    def _create_incremental_pairs(self, reward_records: List[CanonicalTransaction],
+                                  pos_records: List[CanonicalTransaction],
+                                  num_old_rewards: int, num_old_pos: int) -> BlockingResult:
+        """Pairs involving at least one new transaction: new rewards × all POS, plus old rewards × new POS."""
+        new_rewards = self._create_transaction_pairs(reward_records[num_old_rewards:], pos_records)
+        new_rewards.pair_index[:, 0] += num_old_rewards
+        
+        new_pos = self._create_transaction_pairs(reward_records[:num_old_rewards], pos_records[num_old_pos:])
+        new_pos.pair_index[:, 1] += num_old_pos
+        
+        block_hits = dict(new_rewards.block_hits)
+        for key, hits in new_pos.block_hits.items():
+            block_hits[key] = block_hits.get(key, 0) + hits
+        
+        return BlockingResult(
+            pair_index=np.concatenate([new_rewards.pair_index, new_pos.pair_index]),
+            full_product_pairs=new_rewards.full_product_pairs + new_pos.full_product_pairs,
+            block_hits=block_hits,
+            oversized_blocks=new_rewards.oversized_blocks + new_pos.oversized_blocks
+        )
+
+    def _job_records(self, job: ReconciliationJob, side: str) -> List[CanonicalTransaction]:
+        """Canonical records of a job's reward or POS side, normalizing them if they were not kept."""
+        records = job.reward_records if side == 'reward' else job.pos_records
+        if records is None:
+            transactions = job.reward_transactions if side == 'reward' else job.pos_transactions
+            records = self.confidence_scorer.canonicalize_many(transactions)
+        return records
+
+    def _merge_base_candidates(self, retention: TopKCandidates, base: ReconciliationJob) -> int:
+        """Seed retention with a base job's scored candidates and exact counts; returns the candidates merged."""
+        # Fetch again so results spilled from history since the job started are read back
+        candidates = (self.get_job(base.job_id) or base).candidates
+        if candidates is None:
+            raise ValueError(f"Base job {base.job_id} results are no longer available")
+        scored_rows = candidates.column('result') != ERROR
+        pair_index = np.column_stack([
+            candidates.column('reward_index')[scored_rows],
+            candidates.column('pos_index')[scored_rows]
+        ]).astype(np.int64)
+        
+        base_stats = base.performance_metrics.get('retention', {})
+        retention.merge(pair_index, {
+            'confidence': candidates.column('confidence')[scored_rows],
+            'components': candidates.column('components')[scored_rows],
+            'processing_time_ms': candidates.column('processing_time_ms')[scored_rows]
+        }, counts=base_stats, scored_pairs=base_stats.get('scored_pairs', 0))
+        return len(candidates)
+
+    def _estimate_blocking_recall(self, reward_transactions: List[Dict], pos_transactions: List[Dict],
+                                  blocking: BlockingResult, candidate_hits: int, threshold: float,
+                                  reward_df: Optional['pd.DataFrame'] = None,
+                                  pos_df: Optional['pd.DataFrame'] = None) -> Dict:
+        """Estimate matches lost to blocking by scoring a sample of the excluded pairs."""
+        excluded_pairs = blocking.full_product_pairs - blocking.candidate_pairs
+        metrics = blocking.to_metrics()
+
+        if excluded_pairs <= 0 or self.recall_sample_size <= 0:
+            metrics.update({
+                'recall_sample_size': 0,
+                'sampled_excluded_hits': 0,
+                'estimated_missed_matches': 0,
+                'estimated_recall': 1.0,
+                'recall_exact': excluded_pairs <= 0
+            })
+            return metrics
+
+        num_pos = len(pos_transactions)
+        candidate_codes = set((blocking.pair_index[:, 0] * num_pos + blocking.pair_index[:, 1]).tolist())
+
+        if excluded_pairs <= self.recall_sample_size:
+            # Small enough to score every excluded pair
+            sample = [code for code in range(blocking.full_product_pairs) if code not in candidate_codes]
+        else:
+            rng = random.Random(42)
+            sample_codes = set()
+            while len(sample_codes) < self.recall_sample_size:
+                code = rng.randrange(blocking.full_product_pairs)
+                if code not in candidate_codes:
+                    sample_codes.add(code)
+            sample = sorted(sample_codes)
+
+        sample_index = np.array([divmod(code, num_pos) for code in sample], dtype=np.int64).reshape(-1, 2)
+        sample_results = self.predict_batch(reward_transactions, pos_transactions, sample_index, threshold,
+                                            reward_df, pos_df)
+        sampled_hits = sum(
+            1 for r in sample_results
+            if r['result'] in (ReconciliationResult.MATCH.value, ReconciliationResult.REVIEW_REQUIRED.value)
+        )
+
+        estimated_missed = sampled_hits / len(sample) * excluded_pairs
+        total_hits = candidate_hits + estimated_missed
+
+        metrics.update({
+            'recall_sample_size': len(sample),
+            'sampled_excluded_hits': sampled_hits,
+            'estimated_missed_matches': estimated_missed,
+            'estimated_recall': candidate_hits / total_hits if total_hits > 0 else 1.0,
+            'recall_exact': len(sample) == excluded_pairs
+        })
+        return metrics
+
+    def _process_batch(self, batch_index: np.ndarray, reward_df: 'pd.DataFrame', pos_df: 'pd.DataFrame',
+                       lookup: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """Score a batch of (reward_index, pos_index) pairs in this process."""
+        return score_batch(self.confidence_scorer, reward_df, pos_df, batch_index, lookup)
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """Get the shared process pool; each worker loads the models once at start."""
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=init_scoring_worker,
+                                                     initargs=(self.model_bundle_dir,))
+        return self._process_pool
+
+    @contextmanager
+    def _scoring_executor(self):
+        """Executor context for a job: a per-job thread pool or the shared process pool."""
+        if self.backend == 'process':
+            yield self._get_process_pool()
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            yield executor
+        finally:
+            # Batches still running after a cancellation finish on their own without blocking the event loop
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit_batch(self, loop: asyncio.AbstractEventLoop, executor, batch_index: np.ndarray,
+                      reward_df: 'pd.DataFrame', pos_df: 'pd.DataFrame',
+                      lookup: Optional[Dict[str, np.ndarray]] = None) -> asyncio.Future:
+        """Run a batch on the executor; process workers receive packed column arrays."""
+        if self.backend == 'process':
+            return loop.run_in_executor(executor, score_packed_batch,
+                                        *pack_batch(reward_df, pos_df, batch_index, lookup))
+        return loop.run_in_executor(executor, self._process_batch, batch_index, reward_df, pos_df, lookup)
+
+    def shutdown(self):
+        """Release the shared process pool, if one was started, and stop health sampling."""
+        self.health_sampler.stop()
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        self.job_history.clear_spill()
+
     async def start_reconciliation(self, reward_transactions: List[Dict], pos_transactions: List[Dict], 
-                                 threshold: float = 0.95, job_id: Optional[str] = None) -> Dict:
-        """Start an asynchronous reconciliation job."""
+                                 threshold: float = 0.95, job_id: Optional[str] = None,
+                                 assignment_mode: Optional[str] = None, base_job_id: Optional[str] = None,
+                                 practice_id: Optional[str] = None) -> Dict:
+        """Start an asynchronous reconciliation job.
+
+        With base_job_id, only the given new transactions are scored (new rewards
+        against all POS rows, and existing rewards against new POS rows) and the
+        result is merged with the base job's candidates into a new job. The base
+        job's threshold is kept so merged counts stay exact.
+        
+        Jobs with the same practice_id reuse its lookup tables, so only
+        service and location values not seen before are scored.
+        """
         if not job_id:
             job_id = f"reconciliation_{int(time.time())}"
         
+        base = None
+        if base_job_id:
+            base = self.get_job(base_job_id)
+            if not base or base.status != MatchStatus.COMPLETED:
+                raise ValueError(f"Base job {base_job_id} not found or not completed")
+            # A shallow copy keeps the base's transactions, records and candidates for this job,
+            # even if the history spills the base job to disk while it runs
+            base = copy.copy(base)
+            threshold = base.threshold
+            assignment_mode = assignment_mode or base.assignment_mode
+            practice_id = practice_id or base.practice_id
+            total_pairs = (len(reward_transactions) * (len(base.pos_transactions) + len(pos_transactions))
+                           + len(base.reward_transactions) * len(pos_transactions))
+            reward_transactions = base.reward_transactions + reward_transactions
+            pos_transactions = base.pos_transactions + pos_transactions
+        else:
+            total_pairs = len(reward_transactions) * len(pos_transactions)
+        
+        assignment_mode = assignment_mode or self.assignment_mode
+        if assignment_mode not in ASSIGNMENT_MODES:
+            raise ValueError(f"Unsupported assignment mode: {assignment_mode}")
+        
         # Create job
         job = ReconciliationJob(
             job_id=job_id,
             status=MatchStatus.PENDING,
             created_at=datetime.now(),
-            total_transactions=len(reward_transactions) * len(pos_transactions)
+            total_transactions=total_pairs,
+            assignment_mode=assignment_mode,
+            threshold=threshold,
+            reward_transactions=reward_transactions,
+            pos_transactions=pos_transactions,
+            base_job_id=base_job_id,
+            practice_id=practice_id
         )
         
         self.active_jobs[job_id] = job
         self.performance_stats['total_jobs'] += 1
+        await self._persist_job(job)
         
         # Start processing in background
-        asyncio.create_task(self._process_reconciliation_job(job, reward_transactions, pos_transactions, threshold))
+        asyncio.create_task(self._process_reconciliation_job(job, reward_transactions, pos_transactions, threshold, base))
         
         return {
             'job_id': job_id,
             'status': job.status.value,
+            'base_job_id': base_job_id,
+            'practice_id': practice_id,
             'total_transactions': job.total_transactions,
             'estimated_time_seconds': self._estimate_processing_time(job.total_transactions)
         }
 
+    def _normalize_and_block(self, reward_transactions: List[Dict], pos_transactions: List[Dict],
+                             base: Optional[ReconciliationJob] = None
+                             ) -> Tuple[List[CanonicalTransaction], List[CanonicalTransaction], BlockingResult]:
+        """Canonicalize the job's transactions and build its candidate pairs; runs off the event loop."""
+        if base is not None:
+            # Only the rows appended after the base job need normalizing and pairing
+            num_old_rewards, num_old_pos = len(base.reward_transactions), len(base.pos_transactions)
+            with metrics.stage_timer('normalize'):
+                reward_records = self._job_records(base, 'reward') + \
+                    self.confidence_scorer.canonicalize_many(reward_transactions[num_old_rewards:])
+                pos_records = self._job_records(base, 'pos') + \
+                    self.confidence_scorer.canonicalize_many(pos_transactions[num_old_pos:])
+            with metrics.stage_timer('blocking'):
+                blocking = self._create_incremental_pairs(reward_records, pos_records, num_old_rewards, num_old_pos)
+            return reward_records, pos_records, blocking
+        
+        # Normalize every transaction once for the whole job
+        with metrics.stage_timer('normalize'):
+            reward_records = self.confidence_scorer.canonicalize_many(reward_transactions)
+            pos_records = self.confidence_scorer.canonicalize_many(pos_transactions)
+        
+        # Create candidate transaction pairs through the blocking stage
+        with metrics.stage_timer('blocking'):
+            blocking = self._create_transaction_pairs(reward_records, pos_records)
+        return reward_records, pos_records, blocking
+
+    def _prepare_scoring(self, job: ReconciliationJob, reward_records: List[CanonicalTransaction],
+                         pos_records: List[CanonicalTransaction]) -> Tuple['pd.DataFrame', 'pd.DataFrame', Dict]:
+        """Build the job's column frames, encodings and lookup tables; runs off the event loop."""
+        # Build column frames once so batches can be scored vectorially
+        reward_df = self.confidence_scorer.canonical_frame(reward_records)
+        pos_df = self.confidence_scorer.canonical_frame(pos_records)
+        
+        # Encode every distinct customer name and service once for the whole job, and
+        # intern low-cardinality fields into the practice's lookup tables
+        with metrics.stage_timer('encode'):
+            self.confidence_scorer.prepare_job(reward_records, pos_records)
+            tables = self.lookup_tables.get(job.practice_id, self.confidence_scorer.lookup_score_fns(),
+                                            self.confidence_scorer.lookup_signature())
+            lookup = self.confidence_scorer.prepare_lookup(tables, reward_df, pos_df)
+        return reward_df, pos_df, lookup
+
+    def _candidate_store(self, candidate_index: np.ndarray, candidate_scores: Dict[str, np.ndarray],
+                         threshold: float) -> ResultStore:
+        """Retained candidates as a column-wise result store."""
+        candidates = ResultStore(len(self.confidence_scorer.COMPONENT_NAMES), capacity=len(candidate_index))
+        candidates.append(
+            candidate_index[:, 0], candidate_index[:, 1], candidate_scores['confidence'],
+            result_codes(candidate_scores['confidence'], threshold),
+            candidate_scores['components'],
+            candidate_scores['processing_time_ms']
+        )
+        return candidates
+
+    def _assign_candidates(self, candidates: ResultStore, candidate_index: np.ndarray,
+                           candidate_scores: Dict[str, np.ndarray], num_rewards: int,
+                           num_pos: int) -> Tuple[ResultStore, Dict]:
+        """One-to-one assignment over the candidates; returns the assigned results and assignment metrics."""
+        with metrics.stage_timer('assignment'):
+            assignment = self.assigner.assign(candidate_index, candidate_scores['confidence'], num_rewards, num_pos)
+            results = self._assignment_results(assignment, candidates, num_rewards, num_pos)
+        return results, assignment.to_metrics()
+
+    def _finish_cancelled(self, job: ReconciliationJob, retention: Optional[TopKCandidates] = None):
+        """Record a job cancelled while processing; the caller's finally block persists it."""
+        job.completed_at = datetime.now()
+        job.performance_metrics = {
+            'processing_time_seconds': (job.completed_at - job.started_at).total_seconds(),
+            'cancelled_after_pairs': job.processed_transactions,
+            'retention': retention.get_stats() if retention is not None else None
+        }
+        self.performance_stats['cancelled_jobs'] = self.performance_stats.get('cancelled_jobs', 0) + 1
+        self.logger.info(f"Job {job.job_id} cancelled after {job.processed_transactions} pairs")
+
     async def _process_reconciliation_job(self, job: ReconciliationJob, reward_transactions: List[Dict], 
-                                        pos_transactions: List[Dict], threshold: float):
+                                        pos_transactions: List[Dict], threshold: float,
+                                        base: Optional[ReconciliationJob] = None):
         """Process reconciliation job asynchronously."""
+        if job.status == MatchStatus.CANCELLED:
+            # Cancelled before it started
+            self.job_history.add(job)
+            self.active_jobs.pop(job.job_id, None)
+            await self._persist_job(job)
+            return
+        
         job.status = MatchStatus.PROCESSING
         job.started_at = datetime.now()
         
         try:
-            # Create transaction pairs
-            pairs = self._create_transaction_pairs(reward_transactions, pos_transactions)
+            # CPU-heavy stages run in worker threads so the event loop keeps serving requests;
+            # a cancellation takes effect at the next stage boundary
+            reward_records, pos_records, blocking = await asyncio.to_thread(
+                self._normalize_and_block, reward_transactions, pos_transactions, base
+            )
+            job.reward_records = reward_records
+            job.pos_records = pos_records
+            pair_index = blocking.pair_index
+            job.total_transactions = len(pair_index)
+            if job.status == MatchStatus.CANCELLED:
+                self._finish_cancelled(job)
+                return
             
-            # Process in batches
-            results = []
-            matches_found = 0
+            reward_df, pos_df, lookup = await asyncio.to_thread(self._prepare_scoring, job, reward_records, pos_records)
+            if job.status == MatchStatus.CANCELLED:
+                self._finish_cancelled(job)
+                return
             
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                # Split pairs into batches
-                batches = [pairs[i:i + self.batch_size] for i in range(0, len(pairs), self.batch_size)]
-                
-                # Submit batch processing tasks
-                future_to_batch = {
-                    executor.submit(self._process_batch, batch, threshold): batch 
-                    for batch in batches
-                }
-                
-                # Collect results
-                for future in as_completed(future_to_batch):
-                    try:
-                        batch_results = future.result()
-                        results.extend(batch_results)
-                        
-                        # Update progress
-                        job.processed_transactions += len(batch_results)
-                        matches_found += sum(1 for r in batch_results if r['result'] == ReconciliationResult.MATCH.value)
+            # Process in batches, keeping only each transaction's best candidates
+            retention = TopKCandidates(self.top_k_per_reward, self.top_k_per_pos)
+            failed_batches = []
+            merged_candidates = self._merge_base_candidates(retention, base) if base is not None else 0
+            
+            loop = asyncio.get_running_loop()
+            batch_starts = iter(range(0, len(pair_index), self.batch_size))
+            in_flight: Dict[asyncio.Future, np.ndarray] = {}
+            scoring_started = time.perf_counter()
+            
+            with self._scoring_executor() as executor:
+                try:
+                    while True:
+                        # Submit batches as slots free up, unless the job has been cancelled
+                        while len(in_flight) < self.max_in_flight_batches and job.status != MatchStatus.CANCELLED:
+                            start = next(batch_starts, None)
+                            if start is None:
+                                break
+                            batch = pair_index[start:start + self.batch_size]
+                            in_flight[self._submit_batch(loop, executor, batch, reward_df, pos_df, lookup)] = batch
+                            self.in_flight_batches += 1
                         
-                        # Update job progress
-                        job.matches_found = matches_found
+                        if not in_flight:
+                            break
                         
-                        # Small delay to prevent overwhelming
-                        await asyncio.sleep(0.01)
+                        done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                        for future in done:
+                            batch = in_flight.pop(future)
+                            self.in_flight_batches -= 1
+                            if future.cancelled():
+                                continue
+                            try:
+                                scored = future.result()
+                                metrics.observe_batch(scored.get('timings', {}), len(batch))
+                                scored['components'] = self.confidence_scorer.component_matrix(scored['features'])
+                                retention.add_batch(batch, scored, threshold)
+                                self._record_provisional(job, batch, scored)
+                            except Exception as e:
+                                self.logger.error(f"Batch processing failed: {e}")
+                                job.errors.append(str(e))
+                                retention.add_errors(len(batch))
+                                failed_batches.append((batch, str(e)))
+                            
+                            # Update progress
+                            job.processed_transactions += len(batch)
+                            
+                            # Update job progress
+                            job.matches_found = retention.counts['match']
                         
-                    except Exception as e:
-                        self.logger.error(f"Batch processing failed: {e}")
-                        job.errors.append(str(e))
+                        if job.status == MatchStatus.CANCELLED:
+                            # Drop queued batches; at most the batches already running finish
+                            for future in in_flight:
+                                future.cancel()
+                            break
+                finally:
+                    # Batches cancelled or abandoned by a failure no longer count as in flight
+                    self.in_flight_batches -= len(in_flight)
+            scoring_finished = time.perf_counter()
+            
+            if job.status == MatchStatus.CANCELLED:
+                self._finish_cancelled(job, retention)
+                return
+            
+            # Store the retained candidates column-wise; dicts are only built at the API edge
+            candidate_index, candidate_scores = retention.to_arrays()
+            candidates = await asyncio.to_thread(self._candidate_store, candidate_index, candidate_scores, threshold)
+            results = candidates
+            matches_found = retention.counts['match']
+            
+            # Estimate recall lost to blocking against the full product
+            if base is None:
+                candidate_hits = retention.counts['match'] + retention.counts['review_required']
+                blocking_metrics = await asyncio.to_thread(
+                    self._estimate_blocking_recall,
+                    reward_transactions, pos_transactions, blocking, candidate_hits, threshold, reward_df, pos_df
+                )
+            else:
+                # Sampling the full product would re-score the base job's pairs
+                blocking_metrics = blocking.to_metrics()
+            if job.status == MatchStatus.CANCELLED:
+                self._finish_cancelled(job, retention)
+                return
+            
+            # Resolve competing candidates into a one-to-one matching
+            assignment_metrics = None
+            if job.assignment_mode == 'one_to_one':
+                results, assignment_metrics = await asyncio.to_thread(
+                    self._assign_candidates, candidates, candidate_index, candidate_scores,
+                    len(reward_transactions), len(pos_transactions)
+                )
+                matches_found = results.result_counts()['match']
+                if job.status == MatchStatus.CANCELLED:
+                    self._finish_cancelled(job, retention)
+                    return
             
+            # Keep failed batches visible as error rows
+            for store in ([candidates] if results is candidates else [candidates, results]):
+                for batch, error in failed_batches:
+                    store.append(batch[:, 0], batch[:, 1], 0.0, ERROR, error=error)
+
             # Finalize job
             job.status = MatchStatus.COMPLETED
             job.completed_at = datetime.now()
+            job.candidates = candidates
             job.results = results
             job.matches_found = matches_found
             
@@ -289,9 +891,22 @@ class ReconciliationEngine:
                 'processing_time_seconds': processing_time,
                 'transactions_per_second': job.total_transactions / processing_time if processing_time > 0 else 0,
                 'match_rate': matches_found / job.total_transactions if job.total_transactions > 0 else 0,
-                'memory_usage_mb': psutil.Process().memory_info().rss / (1024 * 1024)
+                'memory_usage_mb': psutil.Process().memory_info().rss / (1024 * 1024),
+                'blocking': blocking_metrics,
+                'assignment': assignment_metrics,
+                'retention': retention.get_stats(),
+                'incremental': {
+                    'base_job_id': base.job_id,
+                    'new_reward_transactions': len(reward_transactions) - len(base.reward_transactions),
+                    'new_pos_transactions': len(pos_transactions) - len(base.pos_transactions),
+                    'merged_candidates': merged_candidates
+                } if base is not None else None
             }
             
+            # Scoring throughput alone, excluding normalization, blocking and assignment
+            scoring_seconds = scoring_finished - scoring_started
+            self.last_job_pairs_per_second = job.processed_transactions / scoring_seconds if scoring_seconds > 0 else 0.0
+            
             # Update performance stats
             self.performance_stats['successful_jobs'] += 1
             self.performance_stats['total_transactions_processed'] += job.total_transactions
@@ -313,30 +928,81 @@ class ReconciliationEngine:
             self._save_performance_stats()
         
         finally:
-            # Move job to history
-            self.job_history.append(job)
+            # Persist before the history can spill the job's results, then move it to history
+            await self._persist_job(job, with_results=job.status == MatchStatus.COMPLETED)
+            metrics.job_finished(job.status.value)
+            self.job_history.add(job)
             if job.job_id in self.active_jobs:
                 del self.active_jobs[job.job_id]
 
+    def _job_record(self, job: ReconciliationJob) -> Dict:
+        """Job fields in reconciliation_jobs column terms."""
+        return {
+            'job_id': job.job_id,
+            'status': job.status.value,
+            'reward_transactions_count': len(job.reward_transactions),
+            'pos_transactions_count': len(job.pos_transactions),
+            'total_transactions': job.total_transactions,
+            'processed_transactions': job.processed_transactions,
+            'matches_found': job.matches_found,
+            'threshold': job.threshold,
+            'created_at': job.created_at,
+            'started_at': job.started_at,
+            'completed_at': job.completed_at,
+            'error_message': '; '.join(job.errors) or None,
+            'performance_metrics': job.performance_metrics
+        }
+
+    def _result_rows(self, job: ReconciliationJob, chunk_rows: int) -> Iterator[List[ResultRow]]:
+        """Final results as job store rows, chunk_rows at a time."""
+        component_names = self.confidence_scorer.COMPONENT_NAMES
+        scorer = self.confidence_scorer
+        for start in range(0, len(job.results), chunk_rows):
+            yield [
+                (reward_idx, pos_idx, result, confidence,
+                 scorer._get_confidence_level(confidence), scorer._get_recommendation(confidence),
+                 None if unmatched or result == ReconciliationResult.ERROR.value
+                 else dict(zip(component_names, components.tolist())),
+                 pair_time)
+                for _, reward_idx, pos_idx, confidence, result, unmatched, pair_time, components
+                in job.results.rows(start, start + chunk_rows)
+            ]
+
+    async def _persist_job(self, job: ReconciliationJob, with_results: bool = False):
+        """Write a job (and optionally its results) to the job store; failures are logged, not raised."""
+        if self.job_store is None:
+            return
+        
+        try:
+            await self.job_store.save_job(self._job_record(job))
+            if with_results:
+                rows = await self.job_store.save_results(
+                    job.job_id, job.reward_transactions, job.pos_transactions,
+                    self._result_rows(job, self.job_store.copy_batch_rows), job.threshold
+                )
+                self.logger.info(f"Persisted {rows} results for job {job.job_id}")
+        except Exception as e:
+            self.logger.error(f"Could not persist job {job.job_id}: {e}")
+
+    def get_job(self, job_id: str, load_results: bool = True) -> Optional[ReconciliationJob]:
+        """Find a job among active jobs, then job history.
+
+        Finished jobs whose results were spilled to disk are read back unless
+        load_results is False.
+        """
+        return self.active_jobs.get(job_id) or self.job_history.get(job_id, load_results)
+
     def get_job_status(self, job_id: str) -> Optional[Dict]:
         """Get status of a reconciliation job."""
-        # Check active jobs
-        if job_id in self.active_jobs:
-            job = self.active_jobs[job_id]
-            return self._job_to_dict(job)
-        
-        # Check job history
-        for job in self.job_history:
-            if job.job_id == job_id:
-                return self._job_to_dict(job)
-        
-        return None
+        job = self.get_job(job_id, load_results=False)
+        return self._job_to_dict(job) if job else None
 
     def _job_to_dict(self, job: ReconciliationJob) -> Dict:
         """Convert job to dictionary for API response."""
         return {
             'job_id': job.job_id,
             'status': job.status.value,
+            'practice_id': job.practice_id,
             'created_at': job.created_at.isoformat(),
             'started_at': job.started_at.isoformat() if job.started_at else None,
             'completed_at': job.completed_at.isoformat() if job.completed_at else None,
@@ -350,44 +1016,91 @@ class ReconciliationEngine:
 
     def get_job_results(self, job_id: str) -> Optional[Dict]:
         """Get results of a completed reconciliation job."""
-        job = None
+        return self._job_results(self.get_job(job_id))
+
+    def _job_results(self, job: Optional[ReconciliationJob]) -> Optional[Dict]:
+        """Result rows and summary of a job, or None unless it completed."""
+        if not job or job.status != MatchStatus.COMPLETED:
+            return None
         
-        # Check active jobs
-        if job_id in self.active_jobs:
-            job = self.active_jobs[job_id]
+        return {
+            'job_id': job.job_id,
+            'status': job.status.value,
+            'assignment_mode': job.assignment_mode,
+            'results': self._store_to_dicts(job, job.results),
+            'summary': self._results_summary(job),
+            'performance_metrics': job.performance_metrics
+        }
+
+    def get_job_summary(self, job_id: str) -> Optional[Dict]:
+        """Summary counts of a completed job, without building its result rows."""
+        job = self.get_job(job_id)
+        if not job or job.status != MatchStatus.COMPLETED:
+            return None
+        return self._results_summary(job)
+
+    def _results_summary(self, job: ReconciliationJob) -> Dict:
+        """Summary counts kept by the job's columnar result store."""
+        result_counts = job.results.result_counts()
+        unmatched_counts = job.results.unmatched_counts()
         
-        # Check job history
+        return {
+            'total_transactions': job.total_transactions,
+            'candidate_pairs': len(job.candidates),
+            'candidate_counts': job.performance_metrics.get('retention', {}),
+            'matches_found': job.matches_found,
+            'review_required': result_counts[ReconciliationResult.REVIEW_REQUIRED.value],
+            'no_matches': result_counts[ReconciliationResult.NO_MATCH.value],
+            'unmatched_rewards': unmatched_counts['reward'],
+            'unmatched_pos': unmatched_counts['pos'],
+            'errors': result_counts[ReconciliationResult.ERROR.value]
+        }
+
+    def get_job_results_page(self, job_id: str, cursor: int = 0, limit: Optional[int] = None,
+                             phase: Optional[str] = None) -> Optional[Dict]:
+        """Page through a job's results from cursor.
+
+        The 'provisional' phase holds match/review candidates appended while the
+        job runs; the 'final' phase holds the job's results once it completes.
+        Without an explicit phase, completed jobs page final results and all
+        other jobs page provisional ones.
+        """
+        job = self.get_job(job_id)
         if not job:
-            for j in self.job_history:
-                if j.job_id == job_id:
-                    job = j
-                    break
-        
-        if not job or job.status != MatchStatus.COMPLETED:
             return None
         
+        completed = job.status == MatchStatus.COMPLETED
+        phase = phase or ('final' if completed else 'provisional')
+        store = job.results if phase == 'final' else job.provisional
+        available = len(store) if phase == 'provisional' or completed else 0
+        
+        stop = available if limit is None else min(available, cursor + limit)
+        if phase == 'final':
+            page = self._store_to_dicts(job, store, cursor, stop)
+        else:
+            page = self._provisional_to_dicts(job, cursor, stop)
+        
         return {
             'job_id': job_id,
             'status': job.status.value,
-            'results': job.results,
-            'summary': {
-                'total_transactions': job.total_transactions,
-                'matches_found': job.matches_found,
-                'review_required': sum(1 for r in job.results if r['result'] == ReconciliationResult.REVIEW_REQUIRED.value),
-                'no_matches': sum(1 for r in job.results if r['result'] == ReconciliationResult.NO_MATCH.value),
-                'errors': sum(1 for r in job.results if r['result'] == ReconciliationResult.ERROR.value)
-            },
-            'performance_metrics': job.performance_metrics
+            'phase': phase,
+            'results': page,
+            'next_cursor': cursor + len(page),
+            # No more rows will ever be appended to this phase
+            'exhausted': stop >= available and job.status not in (MatchStatus.PENDING, MatchStatus.PROCESSING)
         }
 
     def cancel_job(self, job_id: str) -> bool:
-        """Cancel an active reconciliation job."""
-        if job_id in self.active_jobs:
-            job = self.active_jobs[job_id]
-            if job.status == MatchStatus.PROCESSING:
-                job.status = MatchStatus.CANCELLED
+        """Cancel a pending or processing job; processing stops at the next stage or batch boundary.
+
+        Returns False if the job is unknown or has already finished.
+        """
+        job = self.active_jobs.get(job_id)
+        if job is None or job.status not in (MatchStatus.PENDING, MatchStatus.PROCESSING):
+            return False
+        
+        job.status = MatchStatus.CANCELLED
         return True
-        return False
 
     def get_active_jobs(self) -> List[Dict]:
         """Get list of active reconciliation jobs."""
@@ -395,8 +1108,101 @@ class ReconciliationEngine:
 
     def get_job_history(self, limit: int = 50) -> List[Dict]:
         """Get recent job history."""
-        recent_jobs = sorted(self.job_history, key=lambda x: x.created_at, reverse=True)[:limit]
-        return [self._job_to_dict(job) for job in recent_jobs]
+        return [self._job_to_dict(job) for job in self.job_history.recent(limit)]
+
+    def _stored_job_to_dict(self, record: Dict) -> Dict:
+        """Job status in _job_to_dict form, from a job store row."""
+        total = record['total_transactions'] or 0
+        return {
+            'job_id': record['job_id'],
+            'status': record['status'],
+            'created_at': record['created_at'].isoformat() if record['created_at'] else None,
+            'started_at': record['started_at'].isoformat() if record['started_at'] else None,
+            'completed_at': record['completed_at'].isoformat() if record['completed_at'] else None,
+            'total_transactions': total,
+            'processed_transactions': record['processed_transactions'],
+            'matches_found': record['matches_found'],
+            'errors': [record['error_message']] if record['error_message'] else [],
+            'performance_metrics': record['performance_metrics'],
+            'progress_percent': (record['processed_transactions'] / total * 100) if total > 0 else 0
+        }
+
+    async def lookup_job_status(self, job_id: str) -> Optional[Dict]:
+        """Job status from memory, falling back to the job store for jobs from earlier processes."""
+        status = self.get_job_status(job_id)
+        if status is None and self.job_store is not None:
+            record = await self.job_store.get_job(job_id)
+            status = self._stored_job_to_dict(record) if record else None
+        return status
+
+    async def lookup_job_results(self, job_id: str) -> Optional[Dict]:
+        """Results of a completed job from memory, falling back to the job store."""
+        job = self.get_job(job_id) or await self._load_stored_job(job_id)
+        return self._job_results(job)
+
+    async def lookup_export_results(self, job_id: str, format: str = 'json',
+                                    chunk_rows: int = 10000) -> Optional[Iterator]:
+        """export_results, falling back to the job store for jobs no longer held in memory."""
+        format = self._export_format(format)
+        job = self.get_job(job_id) or await self._load_stored_job(job_id)
+        return self._export_job(job, format, chunk_rows)
+
+    async def _load_stored_job(self, job_id: str) -> Optional[ReconciliationJob]:
+        """A completed job rebuilt from its job store rows, or None."""
+        if self.job_store is None:
+            return None
+        record = await self.job_store.get_job(job_id)
+        if record is None or record['status'] != MatchStatus.COMPLETED.value:
+            return None
+        stored = await self.job_store.load_results(job_id)
+        if stored is None:
+            return None
+        
+        reward_transactions, pos_transactions, rows = stored
+        performance_metrics = record['performance_metrics'] or {}
+        return ReconciliationJob(
+            job_id=job_id,
+            status=MatchStatus.COMPLETED,
+            created_at=record['created_at'],
+            started_at=record['started_at'],
+            completed_at=record['completed_at'],
+            total_transactions=record['total_transactions'] or 0,
+            processed_transactions=record['processed_transactions'] or 0,
+            matches_found=record['matches_found'] or 0,
+            results=await asyncio.to_thread(self._rows_to_store, rows),
+            performance_metrics=performance_metrics,
+            # Only one-to-one jobs record assignment metrics
+            assignment_mode='one_to_one' if performance_metrics.get('assignment') else 'all',
+            threshold=record['threshold'],
+            reward_transactions=reward_transactions,
+            pos_transactions=pos_transactions
+        )
+
+    def _rows_to_store(self, rows: List[ResultRow]) -> ResultStore:
+        """A result store holding job store rows; the inverse of _result_rows."""
+        component_names = self.confidence_scorer.COMPONENT_NAMES
+        store = ResultStore(len(component_names), capacity=len(rows))
+        if not rows:
+            return store
+        
+        reward_index, pos_index, results, confidence, _, _, components, processing_time = zip(*rows)
+        reward_index = np.array(reward_index, dtype=np.int32)
+        pos_index = np.array(pos_index, dtype=np.int32)
+        unmatched = np.where(pos_index < 0, UNMATCHED_REWARD, np.where(reward_index < 0, UNMATCHED_POS, PAIRED))
+        component_matrix = np.array([
+            [scores.get(name, 0.0) for name in component_names] if scores else [0.0] * len(component_names)
+            for scores in components
+        ], dtype=np.float32).reshape(len(rows), len(component_names))
+        
+        store.append(reward_index, pos_index, confidence, [RESULT_CODES.index(result) for result in results],
+                     component_matrix, processing_time, unmatched)
+        return store
+
+    async def lookup_job_history(self, limit: int = 50) -> List[Dict]:
+        """Recent job history, read from the job store when one is configured."""
+        if self.job_store is None:
+            return self.get_job_history(limit)
+        return [self._stored_job_to_dict(record) for record in await self.job_store.list_jobs(limit)]
 
     def _estimate_processing_time(self, total_transactions: int) -> float:
         """Estimate processing time based on historical data."""
@@ -431,6 +1237,7 @@ class ReconciliationEngine:
                     'success': True,
                     'message': f"Model retrained with {result['training_samples']} samples",
                     'accuracy': result['accuracy'],
+                    'training_samples': result['training_samples'],
                     'model_version': '2.0.0'
                 }
             else:
@@ -446,38 +1253,122 @@ class ReconciliationEngine:
                 'error': str(e)
             }
 
-    def export_results(self, job_id: str, format: str = 'json') -> Optional[str]:
-        """Export reconciliation results in specified format."""
-        results = self.get_job_results(job_id)
-        if not results:
+    def export_results(self, job_id: str, format: str = 'json',
+                       chunk_rows: int = 10000) -> Optional[Iterator]:
+        """Stream a completed job's results in the specified format.
+
+        Returns a generator of text (json, csv) or bytes (parquet, arrow)
+        chunks, so memory stays flat regardless of the job size.
+        """
+        format = self._export_format(format)
+        return self._export_job(self.get_job(job_id), format, chunk_rows)
+
+    def _export_format(self, format: str) -> str:
+        """The lower-cased export format, rejected before any job is looked up."""
+        format = format.lower()
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported format: {format}")
+        if format in ('parquet', 'arrow'):
+            require_pyarrow()
+        return format
+
+    def _export_job(self, job: Optional[ReconciliationJob], format: str, chunk_rows: int) -> Optional[Iterator]:
+        """Export chunks of a job's results, or None unless it completed."""
+        if not job or job.status != MatchStatus.COMPLETED:
             return None
         
-        try:
-            if format.lower() == 'json':
-                return json.dumps(results, indent=2, default=str)
-            elif format.lower() == 'csv':
-                # Convert results to CSV format
-                df_data = []
-                for result in results['results']:
-                    df_data.append({
-                        'result': result['result'],
-                        'confidence': result.get('confidence', 0),
-                        'confidence_level': result.get('confidence_level', ''),
-                        'recommendation': result.get('recommendation', ''),
-                        'processing_time_ms': result.get('processing_time_ms', 0),
-                        'reward_customer': result.get('reward_transaction', {}).get('customer_name', ''),
-                        'pos_customer': result.get('pos_transaction', {}).get('customer_name', ''),
-                        'reward_amount': result.get('reward_transaction', {}).get('amount', 0),
-                        'pos_amount': result.get('pos_transaction', {}).get('amount', 0),
-                        'reward_date': result.get('reward_transaction', {}).get('date', ''),
-                        'pos_date': result.get('pos_transaction', {}).get('date', '')
-                    })
-                
-                df = pd.DataFrame(df_data)
-                return df.to_csv(index=False)
-            else:
-                raise ValueError(f"Unsupported format: {format}")
-                
-        except Exception as e:
-            self.logger.error(f"Export failed: {e}")
-            return None
+        if format == 'json':
+            header = {
+                'job_id': job.job_id,
+                'status': job.status.value,
+                'assignment_mode': job.assignment_mode,
+                'summary': self._results_summary(job),
+                'performance_metrics': job.performance_metrics
+            }
+            # Hold the store itself: the history may spill the job while the export streams
+            store = job.results
+            return iter_json(header, len(store),
+                             lambda start, stop: self._store_to_dicts(job, store, start, stop), chunk_rows)
+        
+        detailed = format != 'csv'
+        chunks = self._export_chunks(job, job.results, chunk_rows, detailed)
+        columns = self._export_columns(detailed)
+        if format == 'csv':
+            return iter_csv(chunks, list(columns))
+        return iter_arrow_format(chunks, format, columns)
+
+    def _export_columns(self, detailed: bool = False) -> Dict[str, str]:
+        """Export column names, in _export_chunks order, mapped to their pyarrow type aliases."""
+        columns = {
+            'result': 'string',
+            'confidence': 'float64',
+            'confidence_level': 'string',
+            'recommendation': 'string',
+            'processing_time_ms': 'float64',
+            'reward_customer': 'string',
+            'pos_customer': 'string',
+            'reward_amount': 'float64',
+            'pos_amount': 'float64',
+            'reward_date': 'string',
+            'pos_date': 'string'
+        }
+        if detailed:
+            columns.update({
+                'reward_index': 'int32',
+                'pos_index': 'int32',
+                'unmatched': 'string',
+                'reward_transaction_id': 'string',
+                'pos_transaction_id': 'string'
+            })
+            columns.update((name, 'float32') for name in self.confidence_scorer.COMPONENT_NAMES)
+        return columns
+
+    def _export_chunks(self, job: ReconciliationJob, store: ResultStore, chunk_rows: int,
+                       detailed: bool = False) -> Iterator[Dict[str, list]]:
+        """Flat export columns for a job's results, chunk_rows rows at a time.
+
+        The detailed variant adds indices, transaction ids and component scores
+        for the columnar (Parquet/Arrow) formats.
+        """
+        scorer = self.confidence_scorer
+        
+        for start in range(0, len(store), chunk_rows):
+            stop = min(start + chunk_rows, len(store))
+            reward_index = store.column('reward_index')[start:stop]
+            pos_index = store.column('pos_index')[start:stop]
+            confidence = store.column('confidence')[start:stop].astype(np.float64)
+            results = [RESULT_CODES[code] for code in store.column('result')[start:stop]]
+            unmatched = store.column('unmatched')[start:stop]
+            # Levels and recommendations only apply to scored pairs
+            scored = (unmatched == PAIRED) & (store.column('result')[start:stop] != ERROR)
+            
+            reward_txns = [job.reward_transactions[i] if i >= 0 else {} for i in reward_index]
+            pos_txns = [job.pos_transactions[i] if i >= 0 else {} for i in pos_index]
+            
+            chunk = {
+                'result': results,
+                'confidence': confidence,
+                'confidence_level': [scorer._get_confidence_level(c) if ok else '' for c, ok in zip(confidence, scored)],
+                'recommendation': [scorer._get_recommendation(c) if ok else '' for c, ok in zip(confidence, scored)],
+                'processing_time_ms': store.column('processing_time_ms')[start:stop].astype(np.float64),
+                'reward_customer': [txn.get('customer_name') or '' for txn in reward_txns],
+                'pos_customer': [txn.get('customer_name') or '' for txn in pos_txns],
+                'reward_amount': [float(txn.get('amount') or 0) for txn in reward_txns],
+                'pos_amount': [float(txn.get('amount') or 0) for txn in pos_txns],
+                'reward_date': [str(txn.get('date') or '') for txn in reward_txns],
+                'pos_date': [str(txn.get('date') or '') for txn in pos_txns]
+            }
+            
+            if detailed:
+                chunk.update({
+                    'reward_index': reward_index,
+                    'pos_index': pos_index,
+                    'unmatched': [UNMATCHED_SIDES[code] or '' for code in unmatched],
+                    'reward_transaction_id': [str(txn.get('transaction_id') or '') for txn in reward_txns],
+                    'pos_transaction_id': [str(txn.get('transaction_id') or '') for txn in pos_txns]
+                })
+                components = store.column('components')[start:stop]
+                for position, name in enumerate(scorer.COMPONENT_NAMES):
+                    chunk[name] = components[:, position]
+            
+            yield chunk
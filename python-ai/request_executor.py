@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+class ExecutorBusy(Exception):
+    """Raised when an endpoint already has its maximum number of requests queued or running."""
+
+    def __init__(self, endpoint: str, limit: int):
+        super().__init__(f"Too many concurrent {endpoint} requests (limit {limit})")
+        self.endpoint = endpoint
+        self.limit = limit
+
+
+class RequestExecutor:
+    """Dedicated thread pool for CPU-heavy request handlers, with per-endpoint admission limits.
+
+    Handlers await run() instead of scoring on the event loop, so cheap
+    endpoints such as /health stay responsive while scoring runs. Each
+    endpoint may have at most its limit of calls queued or running; further
+    calls fail fast with ExecutorBusy rather than growing the queue.
+    """
+
+    def __init__(self, max_workers: int = 4, limits: Optional[Dict[str, int]] = None, default_limit: int = 16):
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='request-scoring')
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, int] = {}
+        self._rejected: Dict[str, int] = {}
+        self._busy_workers = 0
+
+    def admit(self, endpoint: str):
+        """Take one of endpoint's slots, or raise ExecutorBusy; pair with release()."""
+        limit = self.limits.get(endpoint, self.default_limit)
+        with self._lock:
+            if self._in_flight.get(endpoint, 0) >= limit:
+                self._rejected[endpoint] = self._rejected.get(endpoint, 0) + 1
+                raise ExecutorBusy(endpoint, limit)
+            self._in_flight[endpoint] = self._in_flight.get(endpoint, 0) + 1
+
+    def release(self, endpoint: str):
+        """Give back a slot taken by admit()."""
+        with self._lock:
+            self._in_flight[endpoint] -= 1
+
+    def _call(self, function: Callable, *args):
+        """Run function(*args) on a pool thread, counting the thread as busy meanwhile."""
+        with self._lock:
+            self._busy_workers += 1
+        try:
+            return function(*args)
+        finally:
+            with self._lock:
+                self._busy_workers -= 1
+
+    async def run(self, endpoint: str, function: Callable, *args):
+        """Run function(*args) on the pool on behalf of endpoint, or raise ExecutorBusy."""
+        self.admit(endpoint)
+        try:
+            future = self._executor.submit(self._call, function, *args)
+        except Exception:
+            self.release(endpoint)
+            raise
+        # Release the slot when the work itself ends, even if the awaiting request was abandoned
+        future.add_done_callback(lambda _: self.release(endpoint))
+        return await asyncio.wrap_future(future)
+
+    def submit(self, function: Callable, *args) -> asyncio.Future:
+        """Run function(*args) on the pool without admission; callers manage slots themselves."""
+        return asyncio.wrap_future(self._executor.submit(self._call, function, *args))
+
+    def get_stats(self) -> Dict:
+        """Busy workers and per-endpoint in-flight and rejected counts."""
+        with self._lock:
+            endpoints = set(self.limits) | set(self._in_flight) | set(self._rejected)
+            return {
+                'max_workers': self.max_workers,
+                'busy_workers': self._busy_workers,
+                'endpoints': {
+                    endpoint: {
+                        'in_flight': self._in_flight.get(endpoint, 0),
+                        'limit': self.limits.get(endpoint, self.default_limit),
+                        'rejected': self._rejected.get(endpoint, 0)
+                    }
+                    for endpoint in sorted(endpoints)
+                }
+            }
+
+    def shutdown(self):
+        """Stop accepting work; queued calls are cancelled."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+from typing import Callable, Dict, Iterator, List
+
+# Export format -> (media type, file extension)
+EXPORT_FORMATS = {
+    'json': ('application/json', 'json'),
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.file', 'arrow')
+}
+
+
+def require_pyarrow():
+    """Import pyarrow lazily; it is only needed for the Parquet and Arrow formats."""
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise RuntimeError("Parquet and Arrow export require the pyarrow package") from e
+    return pyarrow
+
+
+def iter_json(header: Dict, num_rows: int, to_dicts: Callable[[int, int], List[Dict]],
+              chunk_rows: int) -> Iterator[str]:
+    """Stream {header..., "results": [...]} as JSON text, converting chunk_rows rows at a time."""
+    opening = json.dumps(header, default=str)
+    yield (opening[:-1] + ', ' if header else '{') + '"results": ['
+
+    for start in range(0, num_rows, chunk_rows):
+        rows = to_dicts(start, min(start + chunk_rows, num_rows))
+        prefix = ', ' if start else ''
+        yield prefix + ', '.join(json.dumps(row, default=str) for row in rows)
+
+    yield ']}'
+
+
+def _csv_text(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+def iter_csv(chunks: Iterator[Dict[str, list]], columns: List[str]) -> Iterator[str]:
+    """Stream column chunks as CSV text; the header is written first, even when there are no rows."""
+    yield _csv_text([columns])
+    for chunk in chunks:
+        yield _csv_text(zip(*(chunk[name] for name in columns)))
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_arrow_format(chunks: Iterator[Dict[str, list]], format: str, columns: Dict[str, str]) -> Iterator[bytes]:
+    """Stream column chunks as Parquet (one row group per chunk) or an Arrow IPC file.
+
+    ``columns`` maps each column to a pyarrow type alias ('string', 'float64',
+    ...). The writer opens with that fixed schema before the first chunk, so
+    a job without rows still yields a valid, empty file.
+    """
+    pa = require_pyarrow()
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, pa.type_for_alias(alias)) for name, alias in columns.items()])
+    sink = _ChunkSink()
+    if format == 'parquet':
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_file(sink, schema)
+    try:
+        for chunk in chunks:
+            writer.write_table(pa.table({name: chunk[name] for name in columns}, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+
+    yield sink.drain()
@@ -0,0 +1,142 @@
+import bisect
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# uint8 result codes, in ReconciliationResult order
+RESULT_CODES = ('match', 'no_match', 'review_required', 'error')
+MATCH, NO_MATCH, REVIEW_REQUIRED, ERROR = range(len(RESULT_CODES))
+
+# uint8 codes for rows describing a transaction that was left without a partner
+UNMATCHED_SIDES = (None, 'reward', 'pos')
+PAIRED, UNMATCHED_REWARD, UNMATCHED_POS = range(len(UNMATCHED_SIDES))
+
+
+def result_codes(confidence: np.ndarray, threshold: float, review_threshold: float = 0.7) -> np.ndarray:
+    """Vectorized confidence classification into uint8 result codes."""
+    confidence = np.asarray(confidence)
+    codes = np.full(len(confidence), NO_MATCH, dtype=np.uint8)
+    codes[confidence >= review_threshold] = REVIEW_REQUIRED
+    codes[confidence >= threshold] = MATCH
+    return codes
+
+
+class ResultStore:
+    """Append-only columnar store of reconciliation results.
+
+    Each row is an int32 reward/POS index pair (-1 when a side is absent),
+    float32 confidence, uint8 result and unmatched codes, float32 processing
+    time and a float32 row of component scores. Result counts are updated
+    on every append so summaries never rescan the rows.
+    """
+
+    def __init__(self, num_components: int = 0, capacity: int = 1024):
+        self.num_components = num_components
+        self._size = 0
+        self._allocate(max(capacity, 1))
+        self._result_counts = np.zeros(len(RESULT_CODES), dtype=np.int64)
+        self._unmatched_counts = np.zeros(len(UNMATCHED_SIDES), dtype=np.int64)
+        # (start, stop, message) spans for rows from batches that failed to score
+        self._error_spans: List[Tuple[int, int, str]] = []
+
+    def _allocate(self, capacity: int):
+        """Grow every column to capacity rows, keeping existing data."""
+        old = getattr(self, '_columns', None)
+        self._columns = {
+            'reward_index': np.empty(capacity, dtype=np.int32),
+            'pos_index': np.empty(capacity, dtype=np.int32),
+            'confidence': np.empty(capacity, dtype=np.float32),
+            'result': np.empty(capacity, dtype=np.uint8),
+            'unmatched': np.empty(capacity, dtype=np.uint8),
+            'processing_time_ms': np.empty(capacity, dtype=np.float32),
+            'components': np.empty((capacity, self.num_components), dtype=np.float32)
+        }
+        if old is not None:
+            for name, column in old.items():
+                self._columns[name][:self._size] = column[:self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def column(self, name: str) -> np.ndarray:
+        """View of the filled part of a column, e.g. store.column('confidence')."""
+        return self._columns[name][:self._size]
+
+    def append(self, reward_index, pos_index, confidence, result, components: Optional[np.ndarray] = None,
+               processing_time_ms=0.0, unmatched: int = PAIRED, error: Optional[str] = None):
+        """Append rows; scalars broadcast across the rows being added."""
+        reward_index = np.atleast_1d(np.asarray(reward_index))
+        pos_index = np.atleast_1d(np.asarray(pos_index))
+        count = np.broadcast(reward_index, pos_index).shape[0]
+        if count == 0:
+            return
+
+        start, stop = self._size, self._size + count
+        if stop > len(self._columns['result']):
+            self._allocate(max(stop, 2 * len(self._columns['result'])))
+
+        columns = self._columns
+        columns['reward_index'][start:stop] = reward_index
+        columns['pos_index'][start:stop] = pos_index
+        columns['confidence'][start:stop] = confidence
+        columns['result'][start:stop] = result
+        columns['unmatched'][start:stop] = unmatched
+        columns['processing_time_ms'][start:stop] = processing_time_ms
+        columns['components'][start:stop] = 0.0 if components is None else components
+        self._size = stop
+
+        self._result_counts += np.bincount(columns['result'][start:stop], minlength=len(RESULT_CODES))
+        self._unmatched_counts += np.bincount(columns['unmatched'][start:stop], minlength=len(UNMATCHED_SIDES))
+        if error is not None:
+            self._error_spans.append((start, stop, error))
+
+    def error_message(self, row: int) -> Optional[str]:
+        """Error message recorded for a row, if it came from a failed batch."""
+        position = bisect.bisect_right(self._error_spans, (row, float('inf'), '')) - 1
+        if position >= 0:
+            start, stop, message = self._error_spans[position]
+            if start <= row < stop:
+                return message
+        return None
+
+    def result_counts(self) -> Dict[str, int]:
+        """Rows per result label."""
+        return dict(zip(RESULT_CODES, self._result_counts.tolist()))
+
+    def unmatched_counts(self) -> Dict[str, int]:
+        """Rows per unmatched side ('reward', 'pos')."""
+        return {side: int(count) for side, count in zip(UNMATCHED_SIDES, self._unmatched_counts) if side}
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple]:
+        """Yield (row, reward_index, pos_index, confidence, result, unmatched, time, components) tuples."""
+        stop = self._size if stop is None else min(stop, self._size)
+        columns = self._columns
+        for row in range(start, stop):
+            yield (row, int(columns['reward_index'][row]), int(columns['pos_index'][row]),
+                   float(columns['confidence'][row]), RESULT_CODES[columns['result'][row]],
+                   UNMATCHED_SIDES[columns['unmatched'][row]], float(columns['processing_time_ms'][row]),
+                   columns['components'][row])
+
+    def save(self, path: str):
+        """Write the filled rows and error messages to an uncompressed .npz file."""
+        starts, stops, messages = zip(*self._error_spans) if self._error_spans else ((), (), ())
+        np.savez(path, num_components=self.num_components,
+                 error_starts=np.array(starts, dtype=np.int64), error_stops=np.array(stops, dtype=np.int64),
+                 error_messages=np.array(messages, dtype=str),
+                 **{name: self.column(name) for name in self._columns})
+
+    @classmethod
+    def load(cls, path: str) -> 'ResultStore':
+        """Read a store written by save(), sized exactly to its rows."""
+        with np.load(path) as data:
+            store = cls(int(data['num_components']), capacity=len(data['result']))
+            store.append(data['reward_index'], data['pos_index'], data['confidence'], data['result'],
+                         data['components'], data['processing_time_ms'], data['unmatched'])
+            store._error_spans = list(zip(data['error_starts'].tolist(), data['error_stops'].tolist(),
+                                          data['error_messages'].tolist()))
+        return store
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers."""
+        return sum(column.nbytes for column in self._columns.values())
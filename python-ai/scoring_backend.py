@@ -0,0 +1,90 @@
+import logging
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+import numpy as np
+
+from confidence_scorer import AdvancedConfidenceScorer
+from lookup_tables import CODE_FIELDS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Columns of a canonical frame shipped to worker processes
+CANONICAL_COLUMNS = (
+    'name', 'phone', 'email', 'email_local', 'email_domain',
+    'service', 'location', 'provider', 'amount', 'timestamp'
+)
+# Lookup table codes, shipped when the job interned them
+CODE_COLUMNS = tuple(f'{field}_code' for field in CODE_FIELDS)
+
+# One scorer per worker process, loaded by the pool initializer
+_worker_scorer: Optional[AdvancedConfidenceScorer] = None
+
+
+def init_scoring_worker(model_bundle_dir: Optional[str] = None):
+    """Load the scoring models once when a worker process starts."""
+    global _worker_scorer
+    _worker_scorer = AdvancedConfidenceScorer(model_bundle_dir=model_bundle_dir)
+    logging.getLogger(__name__).info("Scoring worker initialized")
+
+
+def pack_batch(reward_df: 'pd.DataFrame', pos_df: 'pd.DataFrame', batch_index: np.ndarray,
+               lookup: Optional[Dict[str, np.ndarray]] = None
+               ) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], np.ndarray, Optional[Dict[str, np.ndarray]]]:
+    """Slice the rows a batch needs into column arrays plus a batch-local pair index.
+
+    Lookup matrices are cut down to the codes the batch uses, and those
+    codes renumbered, so each batch ships only a few values' similarities.
+    """
+    reward_rows, local_reward = np.unique(batch_index[:, 0], return_inverse=True)
+    pos_rows, local_pos = np.unique(batch_index[:, 1], return_inverse=True)
+
+    columns = CANONICAL_COLUMNS + tuple(name for name in CODE_COLUMNS if name in reward_df and name in pos_df)
+    reward_columns = {name: reward_df[name].to_numpy()[reward_rows] for name in columns}
+    pos_columns = {name: pos_df[name].to_numpy()[pos_rows] for name in columns}
+    local_index = np.column_stack([local_reward.reshape(-1), local_pos.reshape(-1)]).astype(np.int32)
+
+    local_lookup = None
+    if lookup:
+        local_lookup = {}
+        for field, matrix in lookup.items():
+            column = f'{field}_code'
+            if column not in reward_columns:
+                continue
+            reward_codes, reward_columns[column] = np.unique(reward_columns[column], return_inverse=True)
+            pos_codes, pos_columns[column] = np.unique(pos_columns[column], return_inverse=True)
+            local_lookup[field] = matrix[np.ix_(reward_codes, pos_codes)]
+
+    return reward_columns, pos_columns, local_index, local_lookup
+
+
+def _frame_from_columns(columns: Dict[str, np.ndarray]) -> 'pd.DataFrame':
+    """Rebuild a canonical frame from packed column arrays."""
+    import pandas as pd
+    frame = pd.DataFrame({name: pd.Series(values, dtype=values.dtype) for name, values in columns.items()})
+    frame.attrs['canonical'] = True
+    return frame
+
+
+def score_batch(scorer: AdvancedConfidenceScorer, reward_df: 'pd.DataFrame', pos_df: 'pd.DataFrame',
+                pair_index: np.ndarray, lookup: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+    """Score a batch and attach its per-pair processing time."""
+    start_time = time.time()
+    scored = scorer.calculate_confidence_batch(reward_df, pos_df, pair_index, lookup)
+    scored['processing_time_ms'] = (time.time() - start_time) * 1000 / max(len(pair_index), 1)
+    return scored
+
+
+def score_packed_batch(reward_columns: Dict[str, np.ndarray], pos_columns: Dict[str, np.ndarray],
+                       local_index: np.ndarray,
+                       lookup: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+    """Worker entry point: score a packed batch with the process-local scorer."""
+    scored = score_batch(_worker_scorer, _frame_from_columns(reward_columns),
+                         _frame_from_columns(pos_columns), local_index, lookup)
+    return {
+        'confidence': scored['confidence'].astype(np.float32),
+        'features': scored['features'].astype(np.float32),
+        'processing_time_ms': scored['processing_time_ms'],
+        'timings': scored['timings']
+    }
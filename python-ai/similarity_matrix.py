@@ -0,0 +1,120 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from rapidfuzz import fuzz, process, utils
+
+logger = logging.getLogger(__name__)
+
+# Feature scores come from rapidfuzz only: fuzzywuzzy's result depends on whether python-Levenshtein
+# is installed, and its pure-Python backend scores differently. Token scorers lowercase and strip
+# punctuation first, as fuzzywuzzy's do.
+SCORERS = ('ratio', 'partial_ratio', 'token_sort_ratio', 'token_set_ratio')
+_PROCESSED = ('token_sort_ratio', 'token_set_ratio')
+
+# Compute the full distinct-value matrix once the pairs fill at least this share of it
+DENSE_FILL = 0.5
+# Below this many comparisons, thread start-up costs more than it saves
+PARALLEL_MIN_PAIRS = 2048
+
+
+def _scorer_args(scorer: str) -> Dict:
+    if scorer not in SCORERS:
+        raise ValueError(f"Unsupported scorer: {scorer}")
+    args = {'scorer': getattr(fuzz, scorer)}
+    if scorer in _PROCESSED:
+        args['processor'] = utils.default_process
+    return args
+
+
+def similarity(scorer: str, value1: str, value2: str) -> float:
+    """One pair's score in [0, 1], rounded to whole percent."""
+    args = _scorer_args(scorer)
+    kwargs = {'processor': args['processor']} if 'processor' in args else {}
+    return round(args['scorer'](value1, value2, **kwargs)) / 100.0
+
+
+def score_matrix(scorer: str, left: Sequence[str], right: Sequence[str], workers: int = -1) -> np.ndarray:
+    """Score of every left value against every right value in [0, 1], rounded to whole percent."""
+    args = _scorer_args(scorer)
+    if not len(left) or not len(right):
+        return np.zeros((len(left), len(right)), dtype=np.float64)
+
+    workers = workers if len(left) * len(right) >= PARALLEL_MIN_PAIRS else 1
+    matrix = process.cdist(list(left), list(right), workers=workers, **args)
+    return np.rint(np.asarray(matrix, dtype=np.float64)) / 100.0
+
+
+def _distinct(values: Sequence[str], rows: np.ndarray):
+    """Intern the values at rows; returns the distinct strings and each row's code."""
+    used, inverse = np.unique(rows, return_inverse=True)
+    lookup: Dict[str, int] = {}
+    used_codes = np.fromiter((lookup.setdefault(values[row], len(lookup)) for row in used),
+                             dtype=np.int64, count=len(used))
+    return list(lookup), used_codes[inverse.reshape(-1)]
+
+
+@dataclass
+class DistinctPairs:
+    """The distinct (left, right) string combinations behind a list of row pairs.
+
+    Scores are computed once per distinct combination, as a full matrix
+    (rapidfuzz cdist) when the combinations fill most of it and element-wise
+    (cpdist) otherwise, both on native threads, then expanded back to the
+    original pairs with expand().
+    """
+    left: List[str]
+    right: List[str]
+    left_codes: np.ndarray
+    right_codes: np.ndarray
+    inverse: np.ndarray
+    workers: int = -1
+
+    @classmethod
+    def build(cls, left_values: Sequence[str], right_values: Sequence[str],
+              left_rows: np.ndarray, right_rows: np.ndarray, workers: int = -1) -> 'DistinctPairs':
+        """Pairs left_values[left_rows[k]] with right_values[right_rows[k]] for every k."""
+        left, left_codes = _distinct(left_values, np.asarray(left_rows, dtype=np.int64))
+        right, right_codes = _distinct(right_values, np.asarray(right_rows, dtype=np.int64))
+        pair_codes = left_codes * max(len(right), 1) + right_codes
+        unique_codes, inverse = np.unique(pair_codes, return_inverse=True)
+        return cls(
+            left=left,
+            right=right,
+            left_codes=unique_codes // max(len(right), 1),
+            right_codes=unique_codes % max(len(right), 1),
+            inverse=inverse.reshape(-1),
+            workers=workers
+        )
+
+    def __len__(self) -> int:
+        return len(self.left_codes)
+
+    def scores(self, scorer: str) -> np.ndarray:
+        """Score of every distinct combination in [0, 1], rounded to whole percent."""
+        args = _scorer_args(scorer)
+        if len(self) == 0:
+            return np.zeros(0, dtype=np.float64)
+
+        if len(self) >= DENSE_FILL * len(self.left) * len(self.right):
+            return score_matrix(scorer, self.left, self.right, self.workers)[self.left_codes, self.right_codes]
+
+        workers = self.workers if len(self) >= PARALLEL_MIN_PAIRS else 1
+        values = process.cpdist([self.left[code] for code in self.left_codes],
+                                [self.right[code] for code in self.right_codes],
+                                workers=workers, **args)
+        return np.rint(np.asarray(values, dtype=np.float64)) / 100.0
+
+    def expand(self, values: np.ndarray) -> np.ndarray:
+        """Per-combination values laid out per original pair."""
+        return values[self.inverse]
+
+    def left_values(self) -> np.ndarray:
+        """Left string of every distinct combination, as an object array."""
+        return np.asarray(self.left, dtype=object)[self.left_codes]
+
+    def right_values(self) -> np.ndarray:
+        """Right string of every distinct combination, as an object array."""
+        return np.asarray(self.right, dtype=object)[self.right_codes]
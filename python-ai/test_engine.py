@@ -4,20 +4,176 @@ Comprehensive test suite for the MedSpa AI Reconciliation Engine
 """
 
 import asyncio
+import csv
+import io
 import json
+import os
+import tempfile
 import time
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict
+import numpy as np
 import pandas as pd
 
-from reconciliation_engine import ReconciliationEngine
+from reconciliation_engine import ReconciliationEngine, ReconciliationJob, MatchStatus
 from confidence_scorer import AdvancedConfidenceScorer
+from embedding_cache import EmbeddingCache
+from assignment import OneToOneAssigner
+from candidate_retention import TopKCandidates
+from result_store import ResultStore, ERROR, result_codes
+from ingestion import read_transactions_csv
+from dataset_store import DatasetStore
+from job_store import SQLiteJobStore
+from job_history import JobHistory
+from request_executor import RequestExecutor, ExecutorBusy
+from micro_batcher import MicroBatcher
+import metrics
+from model_bundle import ModelBundle, ModelBundleError
+import similarity_matrix
+from similarity_matrix import DistinctPairs, similarity
+from lookup_tables import LookupTableCache
+from scoring_backend import _frame_from_columns, pack_batch
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def generate_sample_data() -> tuple[List[Dict], List[Dict]]:
+    """Generate realistic sample transaction data."""
+    
+    # Sample reward transactions (Alle Rewards)
+    reward_transactions = [
+        {
+            'customer_name': 'Sarah Johnson',
+            'customer_phone': '(555) 123-4567',
+            'customer_email': 'sarah.johnson@email.com',
+            'service': 'Botox Treatment',
+            'amount': 450.00,
+            'date': '2024-01-15',
+            'provider': 'Alle Rewards',
+            'location': 'Downtown MedSpa',
+            'transaction_id': 'AR_001'
+        },
+        {
+            'customer_name': 'Michael Chen',
+            'customer_phone': '(555) 234-5678',
+            'customer_email': 'mchen@email.com',
+            'service': 'Chemical Peel',
+            'amount': 325.00,
+            'date': '2024-01-16',
+            'provider': 'Alle Rewards',
+            'location': 'Downtown MedSpa',
+            'transaction_id': 'AR_002'
+        },
+        {
+            'customer_name': 'Dr. Emily Rodriguez',
+            'customer_phone': '(555) 345-6789',
+            'customer_email': 'emily.rodriguez@email.com',
+            'service': 'Laser Hair Removal',
+            'amount': 600.00,
+            'date': '2024-01-17',
+            'provider': 'Alle Rewards',
+            'location': 'Downtown MedSpa',
+            'transaction_id': 'AR_003'
+        },
+        {
+            'customer_name': 'James Wilson',
+            'customer_phone': '(555) 456-7890',
+            'customer_email': 'jwilson@email.com',
+            'service': 'Dermal Fillers',
+            'amount': 750.00,
+            'date': '2024-01-18',
+            'provider': 'Alle Rewards',
+            'location': 'Downtown MedSpa',
+            'transaction_id': 'AR_004'
+        },
+        {
+            'customer_name': 'Lisa Thompson',
+            'customer_phone': '(555) 567-8901',
+            'customer_email': 'lisa.t@email.com',
+            'service': 'Microdermabrasion',
+            'amount': 200.00,
+            'date': '2024-01-19',
+            'provider': 'Alle Rewards',
+            'location': 'Downtown MedSpa',
+            'transaction_id': 'AR_005'
+        }
+    ]
+    
+    # Sample POS transactions (with some variations)
+    pos_transactions = [
+        {
+            'customer_name': 'Sarah Johnson',
+            'customer_phone': '(555) 123-4567',
+            'customer_email': 'sarah.johnson@email.com',
+            'service': 'Botox Treatment',
+            'amount': 450.00,
+            'date': '2024-01-15',
+            'provider': 'POS System',
+            'location': 'Downtown MedSpa',
+            'transaction_id': 'POS_001'
+        },
+        {
+            'customer_name': 'Mike Chen',  # Slight name variation
+            'customer_phone': '(555) 234-5678',
+            'customer_email': 'mchen@email.com',
+            'service': 'Chemical Peel',
+            'amount': 325.00,
+            'date': '2024-01-16',
+            'provider': 'POS System',
+            'location': 'Downtown MedSpa',
+            'transaction_id': 'POS_002'
+        },
+        {
+            'customer_name': 'Emily Rodriguez',  # No Dr. title
+            'customer_phone': '(555) 345-6789',
+            'customer_email': 'emily.rodriguez@email.com',
+            'service': 'Laser Hair Removal',
+            'amount': 600.00,
+            'date': '2024-01-17',
+            'provider': 'POS System',
+            'location': 'Downtown MedSpa',
+            'transaction_id': 'POS_003'
+        },
+        {
+            'customer_name': 'James Wilson',
+            'customer_phone': '(555) 456-7890',
+            'customer_email': 'jwilson@email.com',
+            'service': 'Dermal Fillers',
+            'amount': 750.00,
+            'date': '2024-01-18',
+            'provider': 'POS System',
+            'location': 'Downtown MedSpa',
+            'transaction_id': 'POS_004'
+        },
+        {
+            'customer_name': 'Lisa Thompson',
+            'customer_phone': '(555) 567-8901',
+            'customer_email': 'lisa.t@email.com',
+            'service': 'Microdermabrasion',
+            'amount': 200.00,
+            'date': '2024-01-19',
+            'provider': 'POS System',
+            'location': 'Downtown MedSpa',
+            'transaction_id': 'POS_005'
+        },
+        # Add some non-matching transactions
+        {
+            'customer_name': 'Unknown Customer',
+            'customer_phone': '(555) 999-9999',
+            'customer_email': 'unknown@email.com',
+            'service': 'Unknown Service',
+            'amount': 100.00,
+            'date': '2024-01-20',
+            'provider': 'POS System',
+            'location': 'Downtown MedSpa',
+            'transaction_id': 'POS_006'
+        }
+    ]
+    
+    return reward_transactions, pos_transactions
+
 class ReconciliationEngineTester:
     """Test suite for the reconciliation engine."""
     
@@ -27,138 +183,7 @@ class ReconciliationEngineTester:
         
     def generate_sample_data(self) -> tuple[List[Dict], List[Dict]]:
         """Generate realistic sample transaction data."""
-        
-        # Sample reward transactions (Alle Rewards)
-        reward_transactions = [
-            {
-                'customer_name': 'Sarah Johnson',
-                'customer_phone': '(555) 123-4567',
-                'customer_email': 'sarah.johnson@email.com',
-                'service': 'Botox Treatment',
-                'amount': 450.00,
-                'date': '2024-01-15',
-                'provider': 'Alle Rewards',
-                'location': 'Downtown MedSpa',
-                'transaction_id': 'AR_001'
-            },
-            {
-                'customer_name': 'Michael Chen',
-                'customer_phone': '(555) 234-5678',
-                'customer_email': 'mchen@email.com',
-                'service': 'Chemical Peel',
-                'amount': 325.00,
-                'date': '2024-01-16',
-                'provider': 'Alle Rewards',
-                'location': 'Downtown MedSpa',
-                'transaction_id': 'AR_002'
-            },
-            {
-                'customer_name': 'Dr. Emily Rodriguez',
-                'customer_phone': '(555) 345-6789',
-                'customer_email': 'emily.rodriguez@email.com',
-                'service': 'Laser Hair Removal',
-                'amount': 600.00,
-                'date': '2024-01-17',
-                'provider': 'Alle Rewards',
-                'location': 'Downtown MedSpa',
-                'transaction_id': 'AR_003'
-            },
-            {
-                'customer_name': 'James Wilson',
-                'customer_phone': '(555) 456-7890',
-                'customer_email': 'jwilson@email.com',
-                'service': 'Dermal Fillers',
-                'amount': 750.00,
-                'date': '2024-01-18',
-                'provider': 'Alle Rewards',
-                'location': 'Downtown MedSpa',
-                'transaction_id': 'AR_004'
-            },
-            {
-                'customer_name': 'Lisa Thompson',
-                'customer_phone': '(555) 567-8901',
-                'customer_email': 'lisa.t@email.com',
-                'service': 'Microdermabrasion',
-                'amount': 200.00,
-                'date': '2024-01-19',
-                'provider': 'Alle Rewards',
-                'location': 'Downtown MedSpa',
-                'transaction_id': 'AR_005'
-            }
-        ]
-        
-        # Sample POS transactions (with some variations)
-        pos_transactions = [
-            {
-                'customer_name': 'Sarah Johnson',
-                'customer_phone': '(555) 123-4567',
-                'customer_email': 'sarah.johnson@email.com',
-                'service': 'Botox Treatment',
-                'amount': 450.00,
-                'date': '2024-01-15',
-                'provider': 'POS System',
-                'location': 'Downtown MedSpa',
-                'transaction_id': 'POS_001'
-            },
-            {
-                'customer_name': 'Mike Chen',  # Slight name variation
-                'customer_phone': '(555) 234-5678',
-                'customer_email': 'mchen@email.com',
-                'service': 'Chemical Peel',
-                'amount': 325.00,
-                'date': '2024-01-16',
-                'provider': 'POS System',
-                'location': 'Downtown MedSpa',
-                'transaction_id': 'POS_002'
-            },
-            {
-                'customer_name': 'Emily Rodriguez',  # No Dr. title
-                'customer_phone': '(555) 345-6789',
-                'customer_email': 'emily.rodriguez@email.com',
-                'service': 'Laser Hair Removal',
-                'amount': 600.00,
-                'date': '2024-01-17',
-                'provider': 'POS System',
-                'location': 'Downtown MedSpa',
-                'transaction_id': 'POS_003'
-            },
-            {
-                'customer_name': 'James Wilson',
-                'customer_phone': '(555) 456-7890',
-                'customer_email': 'jwilson@email.com',
-                'service': 'Dermal Fillers',
-                'amount': 750.00,
-                'date': '2024-01-18',
-                'provider': 'POS System',
-                'location': 'Downtown MedSpa',
-                'transaction_id': 'POS_004'
-            },
-            {
-                'customer_name': 'Lisa Thompson',
-                'customer_phone': '(555) 567-8901',
-                'customer_email': 'lisa.t@email.com',
-                'service': 'Microdermabrasion',
-                'amount': 200.00,
-                'date': '2024-01-19',
-                'provider': 'POS System',
-                'location': 'Downtown MedSpa',
-                'transaction_id': 'POS_005'
-            },
-            # Add some non-matching transactions
-            {
-                'customer_name': 'Unknown Customer',
-                'customer_phone': '(555) 999-9999',
-                'customer_email': 'unknown@email.com',
-                'service': 'Unknown Service',
-                'amount': 100.00,
-                'date': '2024-01-20',
-                'provider': 'POS System',
-                'location': 'Downtown MedSpa',
-                'transaction_id': 'POS_006'
-            }
-        ]
-        
-        return reward_transactions, pos_transactions
+        return generate_sample_data()
     
     def test_confidence_scorer(self):
         """Test the confidence scorer functionality."""
@@ -245,6 +270,361 @@ class ReconciliationEngineTester:
         
         return result
     
+    def test_candidate_blocking(self):
+        """Test that blocking keeps true matches while pruning the cartesian product."""
+        logger.info("Testing candidate blocking...")
+        
+        reward_txns, pos_txns = self.generate_sample_data()
+        
+        scorer = self.engine.confidence_scorer
+        blocking = self.engine.blocker.generate_candidates(
+            scorer.canonicalize_many(reward_txns), scorer.canonicalize_many(pos_txns)
+        )
+        candidate_pairs = {(int(i), int(j)) for i, j in blocking.pair_index}
+        
+        # Every reward in the sample has its POS counterpart at the same position
+        for idx in range(len(reward_txns)):
+            assert (idx, idx) in candidate_pairs
+        
+        assert blocking.full_product_pairs == len(reward_txns) * len(pos_txns)
+        assert blocking.candidate_pairs <= blocking.full_product_pairs
+        
+        logger.info(f"Candidate pairs: {blocking.candidate_pairs} of {blocking.full_product_pairs}")
+        
+        self.test_results.append({
+            'test': 'candidate_blocking',
+            'status': 'PASS',
+            'candidate_pairs': blocking.candidate_pairs,
+            'full_product_pairs': blocking.full_product_pairs
+        })
+        
+        return blocking
+    
+    def test_batch_feature_extraction(self):
+        """Test that vectorized batch features agree with per-pair extraction."""
+        logger.info("Testing batch feature extraction...")
+        
+        reward_txns, pos_txns = self.generate_sample_data()
+        scorer = self.engine.confidence_scorer
+        pair_index = [(i, j) for i in range(len(reward_txns)) for j in range(len(pos_txns))]
+        
+        batch_features = scorer.extract_features_batch(
+            pd.DataFrame(reward_txns), pd.DataFrame(pos_txns), pair_index
+        )
+        
+        for row, (i, j) in enumerate(pair_index):
+            single_features = scorer._extract_features(reward_txns[i], pos_txns[j])
+            for batch_value, single_value in zip(batch_features[row], single_features):
+                assert batch_value == single_value or abs(batch_value - single_value) < 1e-6
+        
+        scored = scorer.calculate_confidence_batch(pd.DataFrame(reward_txns), pd.DataFrame(pos_txns), pair_index)
+        assert len(scored['confidence']) == len(pair_index)
+        
+        self.test_results.append({
+            'test': 'batch_feature_extraction',
+            'status': 'PASS',
+            'pairs_scored': len(pair_index)
+        })
+        
+        return scored
+    
+    def test_similarity_matrix(self):
+        """Test that batched distinct-pair scores match one-pair-at-a-time scores on both kernels."""
+        logger.info("Testing batched string similarity...")
+        
+        left = ['sarah johnson', 'johnson sarah', 'dr. sarah j.', '', 'mike chen']
+        right = ['sara jonson', 'sarah johnson', 'michael chen', '']
+        
+        # Sparse pairs (element-wise kernel), then every combination (matrix kernel)
+        sparse = np.array([[0, 0], [1, 1], [0, 0], [2, 1], [3, 3], [4, 2], [1, 1]])
+        dense = np.indices((len(left), len(right))).reshape(2, -1).T
+        for pair_index in (sparse, dense):
+            pairs = DistinctPairs.build(left, right, pair_index[:, 0], pair_index[:, 1])
+            assert len(pairs) == len({tuple(pair) for pair in pair_index.tolist()})
+            for scorer in similarity_matrix.SCORERS:
+                batch = pairs.expand(pairs.scores(scorer))
+                single = [similarity(scorer, left[i], right[j]) for i, j in pair_index]
+                assert np.array_equal(batch, single), scorer
+        
+        # Repeated values collapse before scoring
+        repeated = DistinctPairs.build(['a', 'a', 'b'], ['a', 'a'], np.array([0, 1, 2, 1]), np.array([0, 1, 0, 0]))
+        assert len(repeated) == 2 and repeated.left == ['a', 'b']
+        
+        # Scores classifiers of FEATURE_VERSION 2 were trained on (ratio, partial_ratio, token_sort_ratio,
+        # token_set_ratio); fuzzywuzzy without python-Levenshtein differs on most of the dissimilar pairs
+        expected = {
+            ('sarah johnson', 'sara jonson'): (0.92, 0.82, 0.92, 0.92),
+            ('dr. sarah j.', 'sarah johnson'): (0.56, 0.74, 0.61, 0.67),
+            ('mike chen', 'emily rodriguez'): (0.33, 0.4, 0.33, 0.33),
+            ('botox - forehead', 'forehead botox'): (0.53, 0.73, 1.0, 1.0),
+            ('jennifer lopez', 'mike chen'): (0.35, 0.44, 0.35, 0.35),
+            ('5551234567', '5557654321'): (0.4, 0.57, 0.4, 0.4),
+            ('hydrafacial deluxe', 'laser hair removal'): (0.33, 0.4, 0.33, 0.33)
+        }
+        for (value1, value2), scores in expected.items():
+            assert tuple(similarity(scorer, value1, value2) for scorer in similarity_matrix.SCORERS) == scores, value1
+        
+        self.test_results.append({
+            'test': 'similarity_matrix',
+            'status': 'PASS',
+            'golden_pairs': len(expected),
+            'dense_pairs': len(dense)
+        })
+    
+    def test_saved_classifier_version(self):
+        """Test that a saved classifier is reloaded with its scaler and ignored if fitted to other features."""
+        logger.info("Testing saved classifier versioning...")
+        
+        import joblib
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.preprocessing import StandardScaler
+        
+        features = np.random.RandomState(0).rand(20, 10)
+        labels = np.arange(20) % 2
+        scaler = StandardScaler().fit(features)
+        classifier = RandomForestClassifier(n_estimators=5, random_state=0).fit(scaler.transform(features), labels)
+        
+        scorer = AdvancedConfidenceScorer(load_models=False)
+        working_dir = os.getcwd()
+        with tempfile.TemporaryDirectory() as model_dir:
+            os.chdir(model_dir)
+            try:
+                scorer.scaler, scorer.classifier = scaler, classifier
+                scorer._save_classifier()
+                scorer.scaler = scorer.classifier = None
+                scorer._load_classifier()
+                assert scorer._model_ready()
+                
+                # A bare classifier saved before feature versions existed is not used
+                joblib.dump(classifier, 'models/transaction_classifier.joblib')
+                scorer.scaler = scorer.classifier = None
+                scorer._load_classifier()
+                assert scorer.classifier is None
+            finally:
+                os.chdir(working_dir)
+        
+        self.test_results.append({
+            'test': 'saved_classifier_version',
+            'status': 'PASS',
+            'feature_version': scorer.get_model_info()['feature_version']
+        })
+    
+    def test_lookup_tables(self):
+        """Test that lookup-table features match the per-pair path and tables carry across a practice's jobs."""
+        logger.info("Testing lookup tables...")
+        
+        reward_txns, pos_txns = self.generate_sample_data()
+        scorer = self.engine.confidence_scorer
+        reward_df = scorer.canonicalize_frame(pd.DataFrame(reward_txns))
+        pos_df = scorer.canonicalize_frame(pd.DataFrame(pos_txns))
+        pair_index = np.array([(i, j) for i in range(len(reward_txns)) for j in range(len(pos_txns))])
+        expected = scorer.extract_features_batch(reward_df, pos_df, pair_index)
+        
+        cache = LookupTableCache(max_practices=1)
+        tables = cache.get('practice-1', scorer.lookup_score_fns(), scorer.lookup_signature())
+        lookup = scorer.prepare_lookup(tables, reward_df, pos_df)
+        assert set(lookup) == {'service', 'location'}
+        features = scorer.extract_features_batch(reward_df, pos_df, pair_index, lookup=lookup)
+        assert np.allclose(features, expected, atol=1e-6)
+        
+        # Process workers get the matrices cut down to the batch's codes
+        reward_columns, pos_columns, local_index, local_lookup = pack_batch(reward_df, pos_df, pair_index[:3], lookup)
+        packed = scorer.extract_features_batch(_frame_from_columns(reward_columns), _frame_from_columns(pos_columns),
+                                               local_index, lookup=local_lookup)
+        assert np.allclose(packed, expected[:3], atol=1e-6)
+        
+        # A later job of the same practice reuses the table and only adds its new values
+        services = len(tables.tables['service'])
+        assert cache.get('practice-1', scorer.lookup_score_fns(), scorer.lookup_signature()) is tables
+        codes = tables.intern('service', [reward_df['service'].iloc[0], 'laser hair removal - full legs'])
+        assert codes[0] == reward_df['service_code'].iloc[0] and codes[1] == services
+        assert tables.tables['service'].matrix.shape == (services + 1, services + 1)
+        
+        # Another practice evicts the first past max_practices
+        cache.get('practice-2', scorer.lookup_score_fns(), scorer.lookup_signature())
+        assert cache.get('practice-1', scorer.lookup_score_fns(), scorer.lookup_signature()) is not tables
+        
+        self.test_results.append({
+            'test': 'lookup_tables',
+            'status': 'PASS',
+            'distinct_services': services,
+            'distinct_locations': len(tables.tables['location'])
+        })
+    
+    def test_embedding_cache(self):
+        """Test the name embedding cache's LRU eviction and counters."""
+        logger.info("Testing embedding cache...")
+        
+        # Room for exactly two 256-dim float32 vectors
+        cache = EmbeddingCache(max_memory_mb=2 * 256 * 4 / (1024 * 1024))
+        vector = np.ones(256, dtype=np.float32)
+        
+        cache.put('sarah johnson', vector)
+        cache.put('mike chen', vector)
+        assert cache.get('sarah johnson') is not None  # 'mike chen' is now least recently used
+        cache.put('emily rodriguez', vector)
+        
+        assert 'mike chen' not in cache
+        assert cache.get('mike chen') is None
+        stats = cache.get_stats()
+        assert stats['entries'] == 2
+        assert stats['hits'] == 1 and stats['misses'] == 1 and stats['evictions'] == 1
+        
+        # Rows of a batch are stored as copies, not views that keep the batch alive
+        batch = np.ones((2, 256), dtype=np.float32)
+        cache.put_many(['anna lee', 'ben ortiz'], batch)
+        assert not np.shares_memory(cache.get('anna lee'), batch)
+        
+        self.test_results.append({
+            'test': 'embedding_cache',
+            'status': 'PASS',
+            'hit_rate': stats['hit_rate']
+        })
+        
+        return stats
+    
+    def test_one_to_one_assignment(self):
+        """Test that assignment maximizes total confidence instead of taking the best pair first."""
+        logger.info("Testing one-to-one assignment...")
+        
+        # Greedy would take (0, 0) and leave reward 1 unmatched; the optimum swaps them
+        pair_index = np.array([[0, 0], [0, 1], [1, 0], [2, 2]])
+        confidence = np.array([0.90, 0.85, 0.88, 0.50])
+        
+        exact = OneToOneAssigner().assign(pair_index, confidence, num_rewards=3, num_pos=3)
+        greedy = OneToOneAssigner(max_component_cells=1).assign(pair_index, confidence, num_rewards=3, num_pos=3)
+        
+        assert exact.selected.tolist() == [1, 2]
+        assert exact.unmatched_rewards.tolist() == [2] and exact.unmatched_pos.tolist() == [2]
+        assert greedy.selected.tolist() == [0] and greedy.greedy_components == 1
+        
+        self.test_results.append({
+            'test': 'one_to_one_assignment',
+            'status': 'PASS',
+            'total_confidence': exact.total_confidence
+        })
+        
+        return exact.to_metrics()
+    
+    def test_top_k_retention(self):
+        """Test that top-K retention bounds stored candidates while keeping exact counts."""
+        logger.info("Testing top-K candidate retention...")
+        
+        rng = np.random.default_rng(7)
+        pair_index = np.array([(i, j) for i in range(20) for j in range(30)])
+        confidence = rng.random(len(pair_index))
+        
+        retention = TopKCandidates(reward_k=3, pos_k=2)
+        batch_components = []
+        for start in range(0, len(pair_index), 128):
+            batch = slice(start, start + 128)
+            batch_components.append(np.zeros((len(confidence[batch]), 9)))
+            retention.add_batch(pair_index[batch], {
+                'confidence': confidence[batch],
+                'components': batch_components[-1],
+                'processing_time_ms': 0.1
+            }, threshold=0.95)
+        
+        # Retained rows are copies, so the batch matrices can be freed
+        for heap in list(retention._reward_heaps.values()) + list(retention._pos_heaps.values()):
+            for entry in heap:
+                assert not any(np.shares_memory(entry[2], components) for components in batch_components)
+        
+        retained_index, retained_scores = retention.to_arrays()
+        stats = retention.get_stats()
+        
+        assert stats['scored_pairs'] == len(pair_index)
+        assert stats['match'] == int((confidence >= 0.95).sum())
+        assert stats['no_match'] == int((confidence < 0.7).sum())
+        assert len(retained_index) <= 20 * 3 + 30 * 2
+        
+        # Every reward keeps exactly its three best POS candidates
+        for reward_idx in range(20):
+            expected = np.sort(confidence[pair_index[:, 0] == reward_idx])[-3:]
+            kept = retained_scores['confidence'][retained_index[:, 0] == reward_idx]
+            assert set(expected).issubset(set(kept))
+        
+        self.test_results.append({
+            'test': 'top_k_retention',
+            'status': 'PASS',
+            'retained_pairs': stats['retained_pairs']
+        })
+        
+        return stats
+    
+    def test_result_store(self):
+        """Test columnar result storage, growth and incremental counts."""
+        logger.info("Testing columnar result store...")
+        
+        store = ResultStore(num_components=3, capacity=2)
+        confidence = np.array([0.99, 0.8, 0.3])
+        store.append([0, 1, 2], [0, 1, 2], confidence, result_codes(confidence, 0.95), np.ones((3, 3)))
+        store.append([3], [3], 0.0, ERROR, error='scoring failed')
+        
+        assert len(store) == 4
+        assert store.column('reward_index').dtype == np.int32 and store.column('confidence').dtype == np.float32
+        assert store.result_counts() == {'match': 1, 'no_match': 1, 'review_required': 1, 'error': 1}
+        assert store.error_message(3) == 'scoring failed' and store.error_message(0) is None
+        
+        self.test_results.append({
+            'test': 'result_store',
+            'status': 'PASS',
+            'bytes': store.nbytes
+        })
+        
+        return store.result_counts()
+    
+    def test_csv_ingestion(self):
+        """Test chunked CSV ingestion into a columnar transaction batch."""
+        logger.info("Testing CSV ingestion...")
+        
+        csv_data = (
+            "customer_name,customer_phone,amount,date,unused\n"
+            " Sarah Johnson ,(555) 123-4567,\"$1,450.00\",2024-01-15,x\n"
+            "Michael Chen,,not a number,2024-01-16,y\n"
+            "Emily Rodriguez,(555) 345-6789,600,2024-01-17,z\n"
+        )
+        batch = read_transactions_csv(io.BytesIO(csv_data.encode('utf-8')), chunk_rows=2)
+        records = batch.to_records()
+        
+        assert len(batch) == 3 and batch.invalid_amounts == 1
+        assert records[0]['customer_name'] == 'Sarah Johnson' and records[0]['amount'] == 1450.0
+        assert records[1]['amount'] == 0.0 and records[1]['customer_email'] == ''
+        assert 'service' in batch.missing_columns
+        
+        self.test_results.append({
+            'test': 'csv_ingestion',
+            'status': 'PASS',
+            'rows': len(batch)
+        })
+        
+        return records
+    
+    def test_dataset_store(self):
+        """Test that uploaded datasets round-trip through the on-disk cache and expire."""
+        logger.info("Testing dataset store...")
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            store = DatasetStore(cache_dir=cache_dir, ttl_seconds=60)
+            batch = read_transactions_csv(io.BytesIO(b"customer_name,amount\nSarah Johnson,450\n"))
+            dataset_id = store.put(batch, 'reward', 'rewards.csv')['dataset_id']
+            
+            # A new store over the same directory sees the dataset
+            reloaded = DatasetStore(cache_dir=cache_dir, ttl_seconds=60).get(dataset_id)
+            assert reloaded.to_records() == batch.to_records()
+            assert store.get('../../etc/passwd') is None
+            
+            store.ttl_seconds = 0
+            expired_id = store.put(batch, 'pos')['dataset_id']
+            assert store.get(expired_id) is None and store.get(dataset_id) is not None
+        
+        self.test_results.append({
+            'test': 'dataset_store',
+            'status': 'PASS'
+        })
+        
+        return dataset_id
+    
     async def test_batch_reconciliation(self):
         """Test batch reconciliation job."""
         logger.info("Testing batch reconciliation...")
@@ -287,6 +667,7 @@ class ReconciliationEngineTester:
             logger.info(f"Matches found: {results['summary']['matches_found']}")
             logger.info(f"Review required: {results['summary']['review_required']}")
             logger.info(f"No matches: {results['summary']['no_matches']}")
+            assert self.engine.get_job_summary(job_id) == results['summary']
             
             self.test_results.append({
                 'test': 'batch_reconciliation',
@@ -303,6 +684,355 @@ class ReconciliationEngineTester:
         
         return results
     
+    def test_job_history(self):
+        """Test that job history evicts past max_jobs and spills results and transactions past its byte budget."""
+        logger.info("Testing bounded job history...")
+        
+        def finished_job(job_id: str, rows: int) -> ReconciliationJob:
+            job = ReconciliationJob(job_id=job_id, status=MatchStatus.COMPLETED, created_at=datetime.now(),
+                                    reward_transactions=[{'customer_name': f'Customer {i}', 'amount': 100.0}
+                                                         for i in range(rows)])
+            job.results = ResultStore(num_components=2, capacity=rows)
+            job.results.append(np.arange(rows), np.arange(rows), np.linspace(0, 1, rows),
+                               result_codes(np.linspace(0, 1, rows), 0.95), np.ones((rows, 2)))
+            return job
+        
+        with tempfile.TemporaryDirectory() as spill_dir:
+            probe = finished_job('probe', 100)
+            job_bytes = JobHistory._result_bytes(probe)
+            # Transactions count towards the budget, not just the result arrays
+            assert job_bytes > probe.results.nbytes + probe.candidates.nbytes + probe.provisional.nbytes
+            history = JobHistory(max_jobs=3, max_result_bytes=int(job_bytes * 1.5), spill_dir=spill_dir)
+            for i in range(4):
+                history.add(finished_job(f'job_{i}', 100))
+            
+            stats = history.get_stats()
+            assert stats['jobs'] == 3 and stats['evicted_jobs'] == 1 and 'job_0' not in history
+            assert stats['in_memory_jobs'] == 1 and stats['result_bytes'] <= stats['max_result_bytes']
+            
+            # Status lookups leave spilled results on disk; result lookups read them back
+            spilled = history.get('job_1', load_results=False)
+            assert spilled.results is None and spilled.reward_transactions is None
+            reloaded = history.get('job_1')
+            assert reloaded.results.result_counts() == finished_job('check', 100).results.result_counts()
+            assert reloaded.reward_transactions == finished_job('check', 100).reward_transactions
+            assert np.allclose(reloaded.results.column('components'), 1.0)
+            assert [job.job_id for job in history.recent(2)] == ['job_3', 'job_2']
+            
+            history.clear_spill()
+            assert not os.listdir(spill_dir)
+        
+        self.test_results.append({
+            'test': 'job_history',
+            'status': 'PASS',
+            'spilled_jobs': stats['spilled_jobs']
+        })
+        
+        return stats
+    
+    async def test_request_executor(self):
+        """Test that scoring requests run off the event loop and are refused past their endpoint limit."""
+        logger.info("Testing request executor...")
+        
+        reward_txns, pos_txns = self.generate_sample_data()
+        pair_index = np.indices((len(reward_txns), len(pos_txns))).reshape(2, -1).T
+        executor = RequestExecutor(max_workers=2, limits={'/predict/batch': 1})
+        
+        try:
+            batch = asyncio.ensure_future(executor.run(
+                '/predict/batch', self.engine.predict_batch, reward_txns, pos_txns, pair_index, 0.8
+            ))
+            await asyncio.sleep(0)
+            
+            # The endpoint's single slot is taken; a second call is refused instead of queued
+            try:
+                await executor.run('/predict/batch', time.sleep, 0)
+                rejected = False
+            except ExecutorBusy:
+                rejected = True
+            
+            # The event loop keeps serving other work while the batch scores
+            ticks = 0
+            while not batch.done():
+                ticks += 1
+                await asyncio.sleep(0.001)
+            results = batch.result()
+            stats = executor.get_stats()['endpoints']['/predict/batch']
+        finally:
+            executor.shutdown()
+        
+        assert rejected and stats['rejected'] == 1 and stats['in_flight'] == 0
+        assert len(results) == len(reward_txns) * len(pos_txns)
+        
+        self.test_results.append({
+            'test': 'request_executor',
+            'status': 'PASS',
+            'event_loop_ticks': ticks
+        })
+        
+        return stats
+    
+    async def test_micro_batching(self):
+        """Test that concurrent single-pair predictions are scored in shared batches with unchanged answers."""
+        logger.info("Testing /predict micro-batching...")
+        
+        reward_txns, pos_txns = self.generate_sample_data()
+        requests = [(reward_txn, pos_txn, 0.8) for reward_txn in reward_txns for pos_txn in pos_txns]
+        executor = RequestExecutor(max_workers=2, limits={'/predict': len(requests)})
+        batcher = MicroBatcher(self.engine.predict_pairs, executor, '/predict', max_batch_size=8, max_wait_ms=5)
+        
+        try:
+            results = await asyncio.gather(*(batcher.submit(request) for request in requests))
+        finally:
+            executor.shutdown()
+        
+        stats = batcher.get_stats()
+        expected = [self.engine.predict_match(*request) for request in requests]
+        assert stats['items'] == len(requests) and stats['batches'] == -(-len(requests) // 8)
+        assert executor.get_stats()['endpoints']['/predict']['in_flight'] == 0
+        for batched, single in zip(results, expected):
+            assert batched['result'] == single['result']
+            assert abs(batched['confidence'] - single['confidence']) < 1e-6
+        
+        # A pair that cannot be scored fails alone, not the requests batched with it
+        bad_request = (dict(reward_txns[0], amount='not a number'), pos_txns[0], 0.8)
+        mixed = self.engine.predict_pairs([requests[0], bad_request, requests[1]])
+        assert [result['result'] for result in mixed] == [expected[0]['result'], 'error', expected[1]['result']]
+        assert 'not a number' in mixed[1]['error']
+        
+        self.test_results.append({
+            'test': 'micro_batching',
+            'status': 'PASS',
+            'avg_batch_size': stats['avg_batch_size']
+        })
+        
+        return stats
+    
+    async def _wait_for_job(self, job_id: str, max_wait: float = 30, engine: ReconciliationEngine = None):
+        """Poll a job until it completes or fails."""
+        engine = engine or self.engine
+        start_time = time.time()
+        while time.time() - start_time < max_wait:
+            if engine.get_job_status(job_id)['status'] in ('completed', 'failed', 'cancelled'):
+                break
+            await asyncio.sleep(0.2)
+        return engine.get_job(job_id)
+    
+    async def test_incremental_reconciliation(self):
+        """Test that extending a job with new transactions matches a full re-run."""
+        logger.info("Testing incremental reconciliation...")
+        
+        reward_txns, pos_txns = self.generate_sample_data()
+        
+        full_info = await self.engine.start_reconciliation(reward_txns, pos_txns, threshold=0.8,
+                                                           job_id='incremental_full')
+        base_info = await self.engine.start_reconciliation(reward_txns[:-1], pos_txns[:-1], threshold=0.8,
+                                                           job_id='incremental_base')
+        full = await self._wait_for_job(full_info['job_id'])
+        await self._wait_for_job(base_info['job_id'])
+        
+        delta_info = await self.engine.start_reconciliation(reward_txns[-1:], pos_txns[-1:],
+                                                            job_id='incremental_delta',
+                                                            base_job_id='incremental_base')
+        delta = await self._wait_for_job(delta_info['job_id'])
+        
+        full_retention = full.performance_metrics['retention']
+        delta_retention = delta.performance_metrics['retention']
+        assert delta.status.value == 'completed'
+        assert delta_retention['scored_pairs'] == full_retention['scored_pairs']
+        assert delta_retention['match'] == full_retention['match']
+        assert delta.results.result_counts() == full.results.result_counts()
+        assert delta.performance_metrics['incremental']['new_reward_transactions'] == 1
+        
+        self.test_results.append({
+            'test': 'incremental_reconciliation',
+            'status': 'PASS',
+            'delta_pairs': delta.performance_metrics['blocking']['candidate_pairs'],
+            'total_pairs': delta_retention['scored_pairs']
+        })
+        
+        return delta.performance_metrics['incremental']
+    
+    async def test_job_cancellation(self):
+        """Test that cancelling stops a running job between batches and reports correctly."""
+        logger.info("Testing job cancellation...")
+        
+        reward_txns, pos_txns = self.generate_sample_data()
+        engine = ReconciliationEngine(max_workers=1, batch_size=10, use_blocking=False, max_in_flight_batches=2)
+        
+        # Cancelled before it starts
+        await engine.start_reconciliation(reward_txns, pos_txns, job_id='cancel_pending')
+        assert engine.cancel_job('cancel_pending')
+        
+        # Cancelled while normalizing and blocking run off the event loop
+        await engine.start_reconciliation(reward_txns * 10, pos_txns * 10, job_id='cancel_preparing')
+        await asyncio.sleep(0)
+        assert engine.cancel_job('cancel_preparing')
+        
+        # Cancelled mid-run
+        await engine.start_reconciliation(reward_txns * 10, pos_txns * 10, job_id='cancel_running')
+        while engine.get_job('cancel_running').processed_transactions == 0:
+            await asyncio.sleep(0.01)
+        assert engine.cancel_job('cancel_running')
+        
+        pending = await self._wait_for_job('cancel_pending', engine=engine)
+        running = await self._wait_for_job('cancel_running', engine=engine)
+        while 'cancel_running' in engine.active_jobs:
+            await asyncio.sleep(0.01)
+        
+        assert pending.status.value == 'cancelled' and pending.processed_transactions == 0
+        preparing = await self._wait_for_job('cancel_preparing', engine=engine)
+        assert preparing.status.value == 'cancelled' and preparing.processed_transactions == 0
+        assert running.status.value == 'cancelled'
+        assert running.processed_transactions < running.total_transactions
+        assert not engine.cancel_job('cancel_running') and not engine.cancel_job('unknown_job')
+        
+        self.test_results.append({
+            'test': 'job_cancellation',
+            'status': 'PASS',
+            'processed_before_cancel': running.processed_transactions,
+            'total_pairs': running.total_transactions
+        })
+        
+        return running.performance_metrics
+    
+    async def test_metrics(self):
+        """Test that a finished job shows up in the Prometheus stage histograms and engine gauges."""
+        logger.info("Testing Prometheus metrics...")
+        
+        if not metrics.PROMETHEUS_AVAILABLE:
+            self.test_results.append({'test': 'metrics', 'status': 'SKIP', 'reason': 'prometheus_client not installed'})
+            return
+        
+        reward_txns, pos_txns = self.generate_sample_data()
+        engine = ReconciliationEngine(max_workers=2, batch_size=10)
+        executor = RequestExecutor(max_workers=2)
+        metrics.bind(engine, executor)
+        try:
+            await engine.start_reconciliation(reward_txns, pos_txns, job_id='metrics_job')
+            job = await self._wait_for_job('metrics_job', engine=engine)
+            while 'metrics_job' in engine.active_jobs:
+                await asyncio.sleep(0.01)
+            await executor.run('/predict', sum, [1, 2])
+            
+            content, content_type = metrics.render()
+            text = content.decode()
+        finally:
+            executor.shutdown()
+            metrics.bind(self.engine)
+        
+        assert content_type.startswith('text/plain')
+        for stage in ('normalize', 'blocking', 'feature_extraction', 'model_inference', 'assignment'):
+            assert f'reconciliation_stage_seconds_count{{stage="{stage}"}}' in text, stage
+        for component in ('numeric', 'name_embeddings', 'text_similarity'):
+            assert f'reconciliation_feature_seconds_count{{component="{component}"}}' in text, component
+        assert 'reconciliation_jobs_finished_total{status="completed"}' in text
+        assert 'reconciliation_batches_in_flight 0.0' in text
+        assert engine.in_flight_batches == 0 and engine.last_job_pairs_per_second > 0
+        assert 'reconciliation_cache_hit_rate{cache="names"}' in text
+        assert 'reconciliation_worker_utilization{pool="requests"} 0.0' in text
+        
+        self.test_results.append({
+            'test': 'metrics',
+            'status': 'PASS',
+            'job_status': job.status.value,
+            'pairs_per_second': engine.last_job_pairs_per_second,
+            'exposition_bytes': len(content)
+        })
+    
+    async def test_model_warm_up(self):
+        """Test background model loading from a verified bundle and that a tampered bundle fails readiness."""
+        logger.info("Testing model warm-up from a bundle...")
+        
+        with tempfile.TemporaryDirectory() as bundle_dir:
+            for kind in ('spacy', 'sentence_transformer'):
+                os.makedirs(f"{bundle_dir}/{kind}")
+                with open(f"{bundle_dir}/{kind}/config.json", 'w') as f:
+                    json.dump({'kind': kind}, f)
+            manifest = ModelBundle.write_manifest(bundle_dir, {'spacy': 'spacy', 'sentence_transformer': 'sentence_transformer'})
+            assert sorted(manifest['files']) == ['sentence_transformer/config.json', 'spacy/config.json']
+            
+            engine = ReconciliationEngine(load_models=False, model_bundle_dir=bundle_dir)
+            assert engine.model_state == 'not_loaded' and not engine.is_ready()
+            assert await engine.warm_up() and engine.is_ready()
+            assert engine.get_system_health()['model_status']['state'] == 'ready'
+            
+            # A file changed after the manifest was written fails verification
+            with open(f"{bundle_dir}/spacy/config.json", 'a') as f:
+                f.write(' ')
+            tampered = ReconciliationEngine(load_models=False, model_bundle_dir=bundle_dir)
+            assert not await tampered.warm_up()
+            assert tampered.model_state == 'failed' and 'spacy/config.json' in tampered.model_load_error
+            
+            os.remove(f"{bundle_dir}/manifest.json")
+            try:
+                ModelBundle(bundle_dir).verify()
+                raise AssertionError("bundle without a manifest verified")
+            except ModelBundleError:
+                pass
+        
+        self.test_results.append({
+            'test': 'model_warm_up',
+            'status': 'PASS',
+            'bundle_files': len(manifest['files']),
+            'failed_state_error': tampered.model_load_error
+        })
+    
+    async def test_job_store(self):
+        """Test that finished jobs and their results survive an engine restart via the SQLite job store."""
+        logger.info("Testing persistent job store...")
+        
+        reward_txns, pos_txns = self.generate_sample_data()
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = f"{cache_dir}/jobs.sqlite3"
+            store = SQLiteJobStore(path)
+            await store.connect()
+            engine = ReconciliationEngine(max_workers=2, batch_size=50, job_store=store)
+            
+            await engine.start_reconciliation(reward_txns, pos_txns, threshold=0.8, job_id='persisted_job')
+            await store.save_job({'job_id': 'stale_job', 'status': 'processing', 'created_at': datetime.now()})
+            job = await self._wait_for_job('persisted_job', engine=engine)
+            await store.close()
+            
+            # A fresh engine only sees the jobs through the store
+            restarted = SQLiteJobStore(path)
+            await restarted.connect()
+            assert await restarted.mark_interrupted() == 1
+            engine = ReconciliationEngine(max_workers=2, batch_size=50, job_store=restarted)
+            
+            status = await engine.lookup_job_status('persisted_job')
+            stale = await engine.lookup_job_status('stale_job')
+            history = await engine.lookup_job_history()
+            # Results are rebuilt from the store for jobs this engine never ran
+            stored_job_results = await engine.lookup_job_results('persisted_job')
+            export = ''.join(await engine.lookup_export_results('persisted_job', 'csv'))
+            stored_results = restarted._connection.execute(
+                'SELECT COUNT(*) FROM reconciliation_results r JOIN reconciliation_jobs j ON r.job_id = j.id '
+                'WHERE j.job_id = ?', ('persisted_job',)
+            ).fetchone()[0]
+            await restarted.close()
+        
+        assert status['status'] == 'completed' and status['matches_found'] == job.matches_found
+        assert stale['status'] == 'failed'
+        assert len(history) == 2
+        assert stored_results == len(job.results)
+        assert len(stored_job_results['results']) == len(job.results)
+        assert stored_job_results['summary']['matches_found'] == job.matches_found
+        assert stored_job_results['summary']['unmatched_rewards'] == job.results.unmatched_counts()['reward']
+        assert stored_job_results['assignment_mode'] == job.assignment_mode
+        assert np.allclose(np.sort([row.get('confidence', 0.0) for row in stored_job_results['results']]),
+                           np.sort(job.results.column('confidence')), atol=1e-6)
+        assert len(list(csv.reader(io.StringIO(export)))) == len(job.results) + 1
+        
+        self.test_results.append({
+            'test': 'job_store',
+            'status': 'PASS',
+            'stored_results': stored_results
+        })
+        
+        return status
+    
     def test_system_health(self):
         """Test system health monitoring."""
         logger.info("Testing system health...")
@@ -326,6 +1056,43 @@ class ReconciliationEngineTester:
         
         return health
     
+    def test_health_sampler(self):
+        """Test that health reads come from background samples kept in a bounded ring buffer."""
+        logger.info("Testing background health sampler...")
+        
+        engine = ReconciliationEngine(health_interval_seconds=0.02, health_history_size=5)
+        try:
+            start_time = time.time()
+            health = engine.get_system_health()
+            first_read = time.time() - start_time
+            
+            while engine.health_sampler.get_stats()['samples'] < 5:
+                time.sleep(0.02)
+            time.sleep(0.1)
+            
+            start_time = time.time()
+            for _ in range(100):
+                engine.get_system_health()
+            cached_read = (time.time() - start_time) / 100
+            
+            series = engine.get_system_health(history=10)['history']
+        finally:
+            engine.shutdown()
+        
+        assert health['status'] in ('healthy', 'warning') and 'cpu_percent' in health['system_metrics']
+        assert health['model_status']['state'] == 'ready'
+        assert first_read < 0.5 and cached_read < 0.01
+        assert len(series) == 5
+        assert [sample['timestamp'] for sample in series] == sorted(sample['timestamp'] for sample in series)
+        assert not engine.health_sampler.get_stats()['running']
+        
+        self.test_results.append({
+            'test': 'health_sampler',
+            'status': 'PASS',
+            'first_read_ms': first_read * 1000,
+            'cached_read_ms': cached_read * 1000
+        })
+    
     def test_model_metrics(self):
         """Test model metrics and performance stats."""
         logger.info("Testing model metrics...")
@@ -349,40 +1116,47 @@ class ReconciliationEngineTester:
         return metrics
     
     def test_export_functionality(self):
-        """Test export functionality."""
+        """Test that every export format reads back, including for a job with no result rows."""
         logger.info("Testing export functionality...")
         
-        # Create sample results
-        sample_results = {
-            'job_id': 'test_export',
-            'status': 'completed',
-            'results': [
-                {
-                    'result': 'match',
-                    'confidence': 0.95,
-                    'reward_transaction': {'customer_name': 'Test User', 'amount': 100},
-                    'pos_transaction': {'customer_name': 'Test User', 'amount': 100}
-                }
-            ]
-        }
+        num_components = len(self.engine.confidence_scorer.COMPONENT_NAMES)
+        reward_txn = {'customer_name': 'Test User', 'amount': 100, 'transaction_id': 'R1'}
+        pos_txn = {'customer_name': 'Test User', 'amount': 100, 'transaction_id': 'P1'}
+        for job_id, rows in (('test_export', 1), ('test_export_empty', 0)):
+            job = ReconciliationJob(job_id=job_id, status=MatchStatus.COMPLETED, created_at=datetime.now(),
+                                    reward_transactions=[reward_txn], pos_transactions=[pos_txn])
+            job.results = ResultStore(num_components=num_components, capacity=rows)
+            job.results.append(np.zeros(rows), np.zeros(rows), np.full(rows, 0.97),
+                               result_codes(np.full(rows, 0.97), 0.95), np.ones((rows, num_components)))
+            self.engine.job_history.add(job)
+        
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            formats = ('json', 'csv', 'parquet', 'arrow')
+        except ImportError:
+            formats = ('json', 'csv')
         
-        # Test JSON export
-        json_export = self.engine.export_results('test_export', 'json')
+        for job_id, rows in (('test_export', 1), ('test_export_empty', 0)):
+            exported = json.loads(''.join(self.engine.export_results(job_id, 'json')))
+            assert exported['job_id'] == job_id and len(exported['results']) == rows
+            
+            lines = list(csv.reader(io.StringIO(''.join(self.engine.export_results(job_id, 'csv')))))
+            assert lines[0][:2] == ['result', 'confidence'] and len(lines) == rows + 1
+            
+            if 'parquet' in formats:
+                table = pq.read_table(io.BytesIO(b''.join(self.engine.export_results(job_id, 'parquet'))))
+                assert table.num_rows == rows and 'name_match' in table.column_names
+                table = pa.ipc.open_file(b''.join(self.engine.export_results(job_id, 'arrow'))).read_all()
+                assert table.num_rows == rows and table.schema.field('reward_index').type == pa.int32()
         
-        if json_export:
-            logger.info("JSON export successful")
+        for format in ('json', 'csv', 'parquet', 'arrow'):
             self.test_results.append({
-                'test': 'export_json',
-                'status': 'PASS'
-            })
-        else:
-            logger.warning("JSON export failed (expected for test job)")
-            self.test_results.append({
-                'test': 'export_json',
-                'status': 'SKIP'
+                'test': f'export_{format}',
+                'status': 'PASS' if format in formats else 'SKIP'
             })
         
-        return json_export
+        return formats
     
     def run_all_tests(self):
         """Run all tests and generate report."""
@@ -398,15 +1172,75 @@ class ReconciliationEngineTester:
             # Test system health
             self.test_system_health()
             
+            # Test background health sampler
+            self.test_health_sampler()
+            
             # Test model metrics
             self.test_model_metrics()
             
             # Test export functionality
             self.test_export_functionality()
             
+            # Test candidate blocking
+            self.test_candidate_blocking()
+            
+            # Test vectorized batch features
+            self.test_batch_feature_extraction()
+            
+            # Test batched string similarity
+            self.test_similarity_matrix()
+            
+            # Test saved classifier feature versioning
+            self.test_saved_classifier_version()
+            
+            # Test per-practice similarity lookup tables
+            self.test_lookup_tables()
+            
+            # Test name embedding cache
+            self.test_embedding_cache()
+            
+            # Test one-to-one assignment
+            self.test_one_to_one_assignment()
+            
+            # Test top-K candidate retention
+            self.test_top_k_retention()
+            
+            # Test columnar result store
+            self.test_result_store()
+            
+            # Test CSV ingestion
+            self.test_csv_ingestion()
+            
+            # Test dataset store
+            self.test_dataset_store()
+            
+            # Test bounded job history
+            self.test_job_history()
+            
+            # Test scoring request executor (async)
+            asyncio.run(self.test_request_executor())
+            
+            # Test /predict micro-batching (async)
+            asyncio.run(self.test_micro_batching())
+            
             # Test batch reconciliation (async)
             asyncio.run(self.test_batch_reconciliation())
             
+            # Test incremental reconciliation against a full re-run (async)
+            asyncio.run(self.test_incremental_reconciliation())
+            
+            # Test cooperative job cancellation (async)
+            asyncio.run(self.test_job_cancellation())
+            
+            # Test persistent job store across a restart (async)
+            asyncio.run(self.test_job_store())
+            
+            # Test Prometheus metrics export (async)
+            asyncio.run(self.test_metrics())
+            
+            # Test background model warm-up from a bundle (async)
+            asyncio.run(self.test_model_warm_up())
+            
         except Exception as e:
             logger.error(f"Test failed: {e}")
             self.test_results.append({